@@ -0,0 +1,153 @@
+"""Maintenance commands.
+
+    python -m app.cli documents rebuild [--batch-size N] [--workers N]
+    python -m app.cli search rebuild [--batch-size N]
+    python -m app.cli import FILE [--format ndjson|csv] [--batch-size N] [--rejects FILE]
+    python -m app.cli dedupe report [--threshold T] [--batch-size N] [--workers N]
+    python -m app.cli quantities backfill [--batch-size N]
+    python -m app.cli similar refresh [--full] [--top-k N] [--batch-size N] [--chunk-size N] [--workers N]
+"""
+import argparse
+import json
+import sys
+from dataclasses import asdict
+
+from db.db import SessionLocal
+from db.bulk import BULK_BATCH_SIZE, FORMATS, RecipeImporter, read_records
+from db.dedupe import DEDUPE_BATCH_SIZE, DEDUPE_THRESHOLD, duplicate_report
+from db.documents import DOCUMENT_BATCH_SIZE, rebuild_documents
+from db.quantities import QUANTITY_BATCH_SIZE, backfill_quantities
+from db.search import SEARCH_BATCH_SIZE, rebuild_search
+from db.similar import SIMILAR_BATCH_SIZE, SIMILAR_CHUNK_SIZE, SIMILAR_TOP_K, refresh_similar
+
+
+def documents_rebuild(args):
+    count = rebuild_documents(SessionLocal, args.batch_size, args.workers)
+    print(f"Rebuilt {count} recipe documents")
+
+
+def search_rebuild(args):
+    count = rebuild_search(SessionLocal, args.batch_size)
+    print(f"Reindexed {count} recipes")
+
+
+def import_recipes(args):
+    fmt = args.format or ("csv" if args.file.name.endswith(".csv") else "ndjson")
+
+    def on_reject(rejected):
+        args.rejects.write(json.dumps(asdict(rejected)) + "\n")
+
+    def on_duplicate(duplicate):
+        print(
+            f"line {duplicate.line}: {duplicate.slug} looks like "
+            f"{duplicate.duplicate_of} ({duplicate.similarity:.2f})",
+            file=sys.stderr,
+        )
+
+    def on_progress(report):
+        print(
+            f"batch {report.batches}: {report.imported} imported, "
+            f"{report.rejected} rejected",
+            file=sys.stderr,
+        )
+
+    with SessionLocal() as db:
+        importer = RecipeImporter(db, args.batch_size, on_reject, on_progress, on_duplicate)
+        report = importer.run(read_records(args.file, fmt))
+    print(
+        f"Imported {report.imported} recipes, rejected {report.rejected}, "
+        f"{report.duplicates} possible duplicates",
+        file=sys.stderr,
+    )
+
+
+def dedupe_report(args):
+    pairs = duplicate_report(SessionLocal, args.threshold, args.batch_size, args.workers)
+    for pair in pairs:
+        print(json.dumps(asdict(pair)))
+    print(f"{len(pairs)} probable duplicate pairs", file=sys.stderr)
+
+
+def quantities_backfill(args):
+    count = backfill_quantities(SessionLocal, args.batch_size)
+    print(f"Updated {count} ingredient quantities")
+
+
+def similar_refresh(args):
+    count = refresh_similar(
+        SessionLocal, args.full, args.top_k, args.batch_size, args.chunk_size, args.workers
+    )
+    print(f"Refreshed {count} similar recipe lists")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cookbook")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    documents = commands.add_parser("documents", help="Materialized recipe documents")
+    documents_commands = documents.add_subparsers(dest="action", required=True)
+    rebuild = documents_commands.add_parser("rebuild", help="Regenerate every document")
+    rebuild.add_argument("--batch-size", type=int, default=DOCUMENT_BATCH_SIZE)
+    rebuild.add_argument("--workers", type=int, default=4)
+    rebuild.set_defaults(func=documents_rebuild)
+
+    search = commands.add_parser("search", help="Full-text search index")
+    search_commands = search.add_subparsers(dest="action", required=True)
+    reindex = search_commands.add_parser("rebuild", help="Reindex every recipe")
+    reindex.add_argument("--batch-size", type=int, default=SEARCH_BATCH_SIZE)
+    reindex.set_defaults(func=search_rebuild)
+
+    importer = commands.add_parser("import", help="Bulk import recipes with children")
+    importer.add_argument(
+        "file", type=argparse.FileType("r", encoding="utf-8"), help="NDJSON or CSV file, - for stdin"
+    )
+    importer.add_argument("--format", choices=FORMATS, help="Default: from the file extension")
+    importer.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE)
+    importer.add_argument(
+        "--rejects",
+        type=argparse.FileType("w", encoding="utf-8"),
+        default=sys.stdout,
+        help="Where to write rejected rows as NDJSON (default: stdout)",
+    )
+    importer.set_defaults(func=import_recipes)
+
+    dedupe = commands.add_parser("dedupe", help="Near-duplicate recipes")
+    dedupe_commands = dedupe.add_subparsers(dest="action", required=True)
+    report = dedupe_commands.add_parser(
+        "report", help="Print every pair of probable duplicates as NDJSON"
+    )
+    report.add_argument("--threshold", type=float, default=DEDUPE_THRESHOLD)
+    report.add_argument("--batch-size", type=int, default=DEDUPE_BATCH_SIZE)
+    report.add_argument("--workers", type=int, default=4)
+    report.set_defaults(func=dedupe_report)
+
+    quantities = commands.add_parser("quantities", help="Parsed ingredient quantities")
+    quantities_commands = quantities.add_subparsers(dest="action", required=True)
+    backfill = quantities_commands.add_parser(
+        "backfill", help="Parse the amount of every ingredient"
+    )
+    backfill.add_argument("--batch-size", type=int, default=QUANTITY_BATCH_SIZE)
+    backfill.set_defaults(func=quantities_backfill)
+
+    similar = commands.add_parser("similar", help="Similar recipe recommendations")
+    similar_commands = similar.add_subparsers(dest="action", required=True)
+    refresh = similar_commands.add_parser(
+        "refresh", help="Recompute the neighbors of recipes changed since the last run"
+    )
+    refresh.add_argument("--full", action="store_true", help="Recompute every recipe")
+    refresh.add_argument("--top-k", type=int, default=SIMILAR_TOP_K)
+    refresh.add_argument("--batch-size", type=int, default=SIMILAR_BATCH_SIZE)
+    refresh.add_argument("--chunk-size", type=int, default=SIMILAR_CHUNK_SIZE)
+    refresh.add_argument("--workers", type=int, default=4)
+    refresh.set_defaults(func=similar_refresh)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
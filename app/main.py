@@ -1,12 +1,31 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
 
-from app.routes import recipes
-from db.db import engine 
+from app.routes import recipes, recipes_async, stats
+from db.db import engine, DATABASE_MODE, SessionLocal
 from db.models import Base
+from db.events import rebuild_index
+from db.dedupe import duplicate_index
+from db.pantry import pantry_index
+from db.suggest import suggester
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Each index answers from SQL, or loads lazily, if this fails.
+    for index in (pantry_index, suggester, duplicate_index):
+        await run_in_threadpool(rebuild_index, index, SessionLocal)
+    yield
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
-app.include_router(recipes.router)
+if DATABASE_MODE == "async":
+    app.include_router(recipes_async.router)
+else:
+    app.include_router(recipes.router)
+app.include_router(stats.router)
@@ -1,9 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends
+import io
+import os
+from dataclasses import asdict
+
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from db.schemas import (
+    Page,
+    FacetedPage,
     RecipeReturn,
     RecipeCreate,
+    RecipeGraphCreate,
+    BulkImportReport,
     IngredientReturn,
     IngredientCreate,
     CategoryCreate,
@@ -12,55 +21,376 @@ from db.schemas import (
     StepCreate,
     RecipeCategoriesReturn,
     RecipeCategoriesCreate,
+    PantryMatch,
+    ShoppingListCreate,
+    ShoppingListItem,
+    SimilarRecipe,
+    TitleSuggestion,
+    IngredientSuggestion,
 )
 from db.models import Recipe, Ingredient, RecipeCategories, Step, Category
-from db.db import SessionLocal, get_db_session
+from db.db import get_db_session
 from db.repositories import IngredientRepo
+from db.cache import facet_cache, slug_cache
+from db.loaders import (
+    fetch_children_by_recipe_slug,
+    recipe_graph_query,
+    fetch_recipe_validators,
+    recipe_slug_lookup,
+    resolve_recipe_id,
+    VALIDATOR_COLUMNS,
+    RECIPE_SORT_KEYS,
+    CATEGORY_SORT_KEYS,
+    STEP_SORT_KEYS,
+    INGREDIENT_SORT_KEYS,
+    RECIPE_CATEGORY_SORT_KEYS,
+)
+from db.pagination import PageParams, keyset_page
+from db.export import iter_recipes_ndjson
+from db.writes import insert_recipe_graph, insert_unique
+from db.bulk import FORMATS, RecipeImporter, read_records
+from db.search import search_recipe_ids
+from db.pantry import find_recipes_for_pantry
+from db.dedupe import find_duplicates
+from db.shopping import shopping_list
+from db.similar import SIMILAR_TOP_K, similar_recipes
+from db.quantities import MAX_SERVINGS, ScaledRecipe, scale_ingredients, with_quantity
+from db.facets import category_filter, facet_counts
+from db.suggest import MAX_SUGGESTIONS, suggest_ingredients, suggest_titles
+from db.documents import (
+    documents_enabled,
+    fetch_document,
+    fetch_document_page,
+    is_fresh,
+)
+from app.utils.conditional import (
+    is_conditional,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+    page_etag,
+    page_last_modified,
+    validator_headers,
+    with_validators,
+)
+from app.utils.projection import RecipeProjection
+from app.utils.serialization import render
 from app.utils.recipe_utils import (
-    check_existing_recipe,
-    check_existing_ingredient,
-    check_existing_category,
-    check_existing_recipe_categories,
-    check_existing_step,
+    flag_duplicates,
+    recipe_conflict_detail,
+    INGREDIENT_EXISTS,
+    CATEGORY_EXISTS,
+    RECIPE_CATEGORY_EXISTS,
+    STEP_EXISTS,
 )
 
 
 router = APIRouter()
-db = SessionLocal()
 
+# Rejected rows listed in a POST /recipe/bulk response (all are counted).
+BULK_REJECT_LIMIT = int(os.getenv("BULK_REJECT_LIMIT", "1000"))
+MAX_PANTRY_RESULTS = int(os.getenv("MAX_PANTRY_RESULTS", "100"))
+MAX_SHOPPING_LIST_RECIPES = int(os.getenv("MAX_SHOPPING_LIST_RECIPES", "100"))
+
+
+@router.get(
+    "/recipe",
+    response_model=FacetedPage[RecipeReturn],
+    response_model_exclude_unset=True,
+    tags=["Recipe"],
+)
+def get_all_recipes(
+    request: Request,
+    response: Response,
+    sort: str = "id",
+    category: List[str] = Query([]),
+    category_match: str = "all",
+    facets: bool = False,
+    page: PageParams = Depends(),
+    projection: RecipeProjection = Depends(),
+    db: Session = Depends(get_db_session),
+):
+    """Recipes, optionally in all (or any) of the ``category`` names.
 
-@router.get("/recipe", response_model=List[RecipeReturn], tags=["Recipe"])
-def get_all_recipes(db: Session = Depends(get_db_session)):
+    Filtering by category, or ``facets=true``, adds the number of matching
+    recipes in every category to the page.
+    """
     try:
-        recipes = db.query(Recipe).all()
-        return recipes
+        sort_columns = RECIPE_SORT_KEYS.get(sort.lstrip("-"), ())
+        matching, facet_key = None, ()
+        if category:
+            matching, facet_key = category_filter(db, category, category_match)
+        counts = ()
+        if category or facets:
+            counts = (facet_counts(db, matching, facet_key),)
+
+        def filtered(query):
+            if matching is None:
+                return query
+            return query.filter(Recipe.id.in_(matching))
+
+        if is_conditional(request):
+            # Answer revalidations from the page's (id, version) pairs alone.
+            query = filtered(db.query(Recipe.id, *VALIDATOR_COLUMNS, *sort_columns))
+            versions = keyset_page(query, RECIPE_SORT_KEYS, page, sort)
+            etag = page_etag(request, versions, *counts)
+            last_modified = page_last_modified(versions)
+            if is_not_modified(request, etag, last_modified):
+                return not_modified_response(etag, last_modified)
+
+        if documents_enabled() and projection.is_full and not category and not facets:
+            body, versions = fetch_document_page(db, page, sort)
+            if body is not None:
+                headers = validator_headers(
+                    page_etag(request, versions), page_last_modified(versions)
+                )
+                return Response(body, media_type="application/json", headers=headers)
+
+        extra_columns = (*sort_columns, *VALIDATOR_COLUMNS)
+        query = filtered(db.query(Recipe).options(*projection.options(extra_columns)))
+        recipes = keyset_page(query, RECIPE_SORT_KEYS, page, sort)
+        etag = page_etag(request, recipes, *counts)
+        if counts:
+            recipes["facets"] = counts[0]
+        return with_validators(
+            projection.render(recipes, page=True),
+            response,
+            etag,
+            page_last_modified(recipes),
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         # logger.error(f"Unexpected error while retriving recipes: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.get(
+    "/recipe/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+    tags=["Recipe"],
+)
+def export_recipes(db: Session = Depends(get_db_session)):
+    return StreamingResponse(
+        iter_recipes_ndjson(db), media_type="application/x-ndjson"
+    )
+
+
+@router.get("/recipe/search", response_model=Page[RecipeReturn], tags=["Recipe"])
+def search_recipes(
+    q: str = Query(..., min_length=1),
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db_session),
+):
+    try:
+        hits = search_recipe_ids(db, q, page)
+        ids = [hit.recipe_id for hit in hits["items"]]
+        recipes = recipe_graph_query(db).filter(Recipe.id.in_(ids)).all()
+        by_id = {recipe.id: recipe for recipe in recipes}
+        items = [by_id[recipe_id] for recipe_id in ids if recipe_id in by_id]
+        return render(
+            RecipeReturn,
+            {"items": items, "next_cursor": hits["next_cursor"]},
+            page=True,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/recipe/pantry", response_model=Page[PantryMatch], tags=["Recipe"])
+def get_recipes_for_pantry(
+    ingredient: List[str] = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=MAX_PANTRY_RESULTS),
+    max_missing: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_db_session),
+):
+    """Recipes using the most of the given pantry ingredients, best first."""
+    try:
+        matches = find_recipes_for_pantry(db, ingredient, limit, max_missing)
+        return render(PantryMatch, {"items": matches, "next_cursor": None}, page=True)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @router.get("/recipe/{recipe_slug}", response_model=RecipeReturn, tags=["Recipe"])
-def get_recipe_by_slug(recipe_slug: str, db: Session = Depends(get_db_session)):
+def get_recipe_by_slug(
+    recipe_slug: str,
+    request: Request,
+    response: Response,
+    servings: Optional[int] = Query(None, gt=0, le=MAX_SERVINGS),
+    projection: RecipeProjection = Depends(),
+    db: Session = Depends(get_db_session),
+):
     try:
-        recipe = db.query(Recipe).filter(Recipe.slug == recipe_slug).first()
+        if is_conditional(request):
+            current = fetch_recipe_validators(db, recipe_slug)
+            if current is None:
+                raise HTTPException(status_code=404, detail="Recipe does not exist")
+            etag = make_etag(request, current.id, current.version)
+            if is_not_modified(request, etag, current.updated_at):
+                return not_modified_response(etag, current.updated_at)
+
+        lookup = recipe_slug_lookup(recipe_slug)
+        if lookup is None:
+            raise HTTPException(status_code=404, detail="Recipe does not exist")
+
+        if documents_enabled() and projection.is_full and servings is None:
+            document = fetch_document(db, lookup)
+            if document is None:
+                slug_cache.set_missing(recipe_slug)
+                raise HTTPException(status_code=404, detail="Recipe does not exist")
+            slug_cache.set(recipe_slug, document.id)
+            if is_fresh(document):
+                headers = validator_headers(
+                    make_etag(request, document.id, document.version),
+                    document.updated_at,
+                )
+                return Response(
+                    document.body, media_type="application/json", headers=headers
+                )
+
+        recipe = (
+            db.query(Recipe)
+            .options(*projection.options((*VALIDATOR_COLUMNS, Recipe.servings)))
+            .filter(lookup)
+            .first()
+        )
         if not recipe:
+            slug_cache.set_missing(recipe_slug)
             raise HTTPException(status_code=404, detail="Recipe does not exist")
-        return recipe
+
+        slug_cache.set(recipe_slug, recipe.id)
+        body = recipe
+        if servings is not None:
+            check_servings(recipe.servings)
+            body = ScaledRecipe(recipe, servings)
+        return with_validators(
+            projection.render(body),
+            response,
+            make_etag(request, recipe.id, recipe.version),
+            recipe.updated_at,
+        )
     except HTTPException as e:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+def check_servings(recipe_servings):
+    if recipe_servings is None:
+        raise HTTPException(status_code=400, detail="Recipe has no servings to scale")
+
+
+def children_response(
+    request, response, db, recipe_slug, child, model, sort_keys, page, sort,
+    servings=None,
+):
+    """Shared body of the child collection endpoints.
+
+    Child writes bump the parent's version, so the recipe's validators cover
+    the collection and a revalidation only reads the recipe row. ``servings``
+    (ingredients only) scales the page to that many servings.
+    """
+    if is_conditional(request):
+        current = fetch_recipe_validators(db, recipe_slug)
+        if current is None:
+            raise HTTPException(status_code=404, detail="Recipe does not exist")
+        etag = make_etag(request, current.id, current.version)
+        if is_not_modified(request, etag, current.updated_at):
+            return not_modified_response(etag, current.updated_at)
+
+    recipe, children = fetch_children_by_recipe_slug(
+        db, recipe_slug, child, sort_keys, page, sort
+    )
+    if recipe is None:
+        raise HTTPException(status_code=404, detail="Recipe does not exist")
+
+    recipe_id, version, updated_at = recipe
+    if servings is not None:
+        recipe_servings = db.query(Recipe.servings).filter(Recipe.id == recipe_id).scalar()
+        check_servings(recipe_servings)
+        children["items"] = scale_ingredients(
+            children["items"], servings / recipe_servings
+        )
+    etag = make_etag(request, recipe_id, version)
+    return with_validators(
+        render(model, children, page=True), response, etag, updated_at
+    )
+
+
+@router.get(
+    "/recipe/{recipe_slug}/similar", response_model=Page[SimilarRecipe], tags=["Recipe"]
+)
+def get_similar_recipes(
+    recipe_slug: str,
+    limit: int = Query(SIMILAR_TOP_K, ge=1, le=SIMILAR_TOP_K),
+    db: Session = Depends(get_db_session),
+):
+    """Most similar recipes, from the neighbor lists of `app.cli similar refresh`."""
+    try:
+        recipe_id = resolve_recipe_id(db, recipe_slug)
+        if recipe_id is None:
+            raise HTTPException(status_code=404, detail="Recipe does not exist")
+        neighbors = similar_recipes(db, recipe_id, limit)
+        return render(SimilarRecipe, {"items": neighbors, "next_cursor": None}, page=True)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @router.post("/recipe", response_model=RecipeReturn, status_code=201, tags=["Recipe"])
-def create_recipe(recipe_data: RecipeCreate, db: Session = Depends(get_db_session)):
-    check_existing_recipe(db, recipe_data)
+def create_recipe(
+    recipe_data: RecipeCreate,
+    response: Response,
+    db: Session = Depends(get_db_session),
+):
+    try:
+        new_recipe = insert_unique(db, Recipe, recipe_data.model_dump())
+        if new_recipe is None:
+            raise HTTPException(
+                status_code=400, detail=recipe_conflict_detail(db, recipe_data)
+            )
+        flag_duplicates(response, find_duplicates(recipe_data.title))
+        # Built before commit, which expires the object.
+        created = RecipeReturn.model_validate(new_recipe)
+        db.commit()
+        slug_cache.set(created.slug, created.id)
+        return created
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Internal server error")
 
+
+@router.post(
+    "/recipe/nested", response_model=RecipeReturn, status_code=201, tags=["Recipe"]
+)
+def create_recipe_graph(
+    recipe_data: RecipeGraphCreate,
+    response: Response,
+    db: Session = Depends(get_db_session),
+):
     try:
-        new_recipe = Recipe(**recipe_data.model_dump())
-        db.add(new_recipe)
+        new_recipe = insert_recipe_graph(db, recipe_data)
+        if new_recipe is None:
+            raise HTTPException(
+                status_code=400, detail=recipe_conflict_detail(db, recipe_data)
+            )
+        duplicates = find_duplicates(
+            recipe_data.title,
+            [ingredient.name for ingredient in recipe_data.ingredients],
+            [step.step for step in recipe_data.steps],
+        )
+        flag_duplicates(response, duplicates)
         db.commit()
-        db.refresh(new_recipe)
+        slug_cache.set(new_recipe.slug, new_recipe.id)
         return new_recipe
     except HTTPException:
         raise
@@ -69,6 +399,39 @@ def create_recipe(recipe_data: RecipeCreate, db: Session = Depends(get_db_sessio
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.post(
+    "/recipe/bulk", response_model=BulkImportReport, tags=["Recipe"]
+)
+def import_recipes(
+    file: UploadFile, format: str = "ndjson", db: Session = Depends(get_db_session)
+):
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail="Invalid format")
+
+    try:
+        rejects, duplicates = [], []
+
+        def on_reject(rejected):
+            if len(rejects) < BULK_REJECT_LIMIT:
+                rejects.append(asdict(rejected))
+
+        def on_duplicate(duplicate):
+            if len(duplicates) < BULK_REJECT_LIMIT:
+                duplicates.append(asdict(duplicate))
+
+        # The upload is spooled to disk and read line by line, one batch at
+        # a time, so memory does not grow with the size of the file.
+        lines = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+        importer = RecipeImporter(db, on_reject=on_reject, on_duplicate=on_duplicate)
+        report = importer.run(read_records(lines, format))
+        return dict(asdict(report), rejects=rejects, possible_duplicates=duplicates)
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @router.post(
     "/ingredient",
     response_model=IngredientReturn,
@@ -78,14 +441,13 @@ def create_recipe(recipe_data: RecipeCreate, db: Session = Depends(get_db_sessio
 def create_ingredient(
     ingredient_data: IngredientCreate, db: Session = Depends(get_db_session)
 ):
-    check_existing_ingredient(db, ingredient_data)
-
     try:
-        new_ingredient = Ingredient(**ingredient_data.model_dump())
-        db.add(new_ingredient)
+        new_ingredient = insert_unique(db, Ingredient, with_quantity(ingredient_data.model_dump()))
+        if new_ingredient is None:
+            raise HTTPException(status_code=400, detail=INGREDIENT_EXISTS)
+        created = IngredientReturn.model_validate(new_ingredient)
         db.commit()
-        db.refresh(new_ingredient)
-        return new_ingredient
+        return created
     except HTTPException:
         raise
     except Exception as e:
@@ -95,21 +457,30 @@ def create_ingredient(
 
 @router.get(
     "/ingredient/{recipe_slug}",
-    response_model=List[IngredientReturn],
+    response_model=Page[IngredientReturn],
     tags=["Ingredients"],
 )
 def get_ingredient_by_recipe_slug(
-    recipe_slug: str, db: Session = Depends(get_db_session)
+    recipe_slug: str,
+    request: Request,
+    response: Response,
+    servings: Optional[int] = Query(None, gt=0, le=MAX_SERVINGS),
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db_session),
 ):
     try:
-        recipe = db.query(Recipe).filter(Recipe.slug == recipe_slug).first()
-        if not recipe:
-            raise HTTPException(status_code=404, detail="Recipe does not exist")
-
-        ingredients = (
-            db.query(Ingredient).filter(Ingredient.recipe_id == recipe.id).all()
+        return children_response(
+            request,
+            response,
+            db,
+            recipe_slug,
+            Ingredient,
+            IngredientReturn,
+            INGREDIENT_SORT_KEYS,
+            page,
+            "id",
+            servings=servings,
         )
-        return ingredients
 
     except HTTPException as e:
         raise
@@ -119,21 +490,28 @@ def get_ingredient_by_recipe_slug(
 
 @router.get(
     "/category/{recipe_slug}",
-    response_model=List[RecipeCategoriesReturn],
+    response_model=Page[RecipeCategoriesReturn],
     tags=["Category"],
 )
-def get_categories_by_recipe_slug(recipe_slug, db: Session = Depends(get_db_session)):
+def get_categories_by_recipe_slug(
+    recipe_slug: str,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db_session),
+):
     try:
-        recipe = db.query(Recipe).filter(Recipe.slug == recipe_slug).first()
-        if not recipe:
-            raise HTTPException(status_code=404, detail="Recipe does not exist")
-
-        categories = (
-            db.query(RecipeCategories)
-            .filter(RecipeCategories.recipe_id == recipe.id)
-            .all()
+        return children_response(
+            request,
+            response,
+            db,
+            recipe_slug,
+            RecipeCategories,
+            RecipeCategoriesReturn,
+            RECIPE_CATEGORY_SORT_KEYS,
+            page,
+            "id",
         )
-        return categories
 
     except HTTPException as e:
         raise
@@ -151,18 +529,19 @@ def add_recipe_category(
     recipe_slug: str, category_name: str, db: Session = Depends(get_db_session)
 ):
     category_data = db.query(Category).filter(Category.name == category_name).first()
-    recipe_data = db.query(Recipe).filter(Recipe.slug == recipe_slug).first()
-    # check_existing_recipe_categories(db, recipe_category_data)
+    recipe_id = resolve_recipe_id(db, recipe_slug)
 
     try:
-        new_category = RecipeCategories(
-            recipe_id=recipe_data.id, category_id=category_data.id
+        new_category = insert_unique(
+            db,
+            RecipeCategories,
+            {"recipe_id": recipe_id, "category_id": category_data.id},
         )
-        check_existing_recipe_categories(db, new_category)
-        db.add(new_category)
+        if new_category is None:
+            raise HTTPException(status_code=400, detail=RECIPE_CATEGORY_EXISTS)
+        created = RecipeCategoriesReturn.model_validate(new_category)
         db.commit()
-        db.refresh(new_category)
-        return new_category
+        return created
     except HTTPException:
         raise
     except Exception as e:
@@ -170,11 +549,17 @@ def add_recipe_category(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.get("/category", response_model=List[CategoryReturn], tags=["Category"])
-def get_all_categories(db: Session = Depends(get_db_session)):
+@router.get("/category", response_model=Page[CategoryReturn], tags=["Category"])
+def get_all_categories(
+    sort: str = "id",
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db_session),
+):
     try:
-        categories = db.query(Category).all()
-        return categories
+        categories = keyset_page(db.query(Category), CATEGORY_SORT_KEYS, page, sort)
+        return render(CategoryReturn, categories, page=True)
+    except HTTPException:
+        raise
     except Exception as e:
         # logger.error(f"Unexpected error while retriving categories: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -186,14 +571,14 @@ def get_all_categories(db: Session = Depends(get_db_session)):
 def create_category(
     category_data: CategoryCreate, db: Session = Depends(get_db_session)
 ):
-    check_existing_category(db, category_data)
-
     try:
-        new_category = Category(**category_data.model_dump())
-        db.add(new_category)
+        new_category = insert_unique(db, Category, category_data.model_dump())
+        if new_category is None:
+            raise HTTPException(status_code=400, detail=CATEGORY_EXISTS)
+        created = CategoryReturn.model_validate(new_category)
         db.commit()
-        db.refresh(new_category)
-        return new_category
+        facet_cache.clear()
+        return created
     except HTTPException:
         raise
     except Exception as e:
@@ -203,21 +588,28 @@ def create_category(
 
 @router.get(
     "/steps/{recipe_slug}",
-    response_model=List[StepReturn],
+    response_model=Page[StepReturn],
     tags=["Steps"],
 )
 def get_steps_by_recipe_slug(
-    recipe_slug: str, db: Session = Depends(get_db_session)
+    recipe_slug: str,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db_session),
 ):
     try:
-        recipe = db.query(Recipe).filter(Recipe.slug == recipe_slug).first()
-        if not recipe:
-            raise HTTPException(status_code=404, detail="Recipe does not exist")
-
-        steps = (
-            db.query(Step).filter(Step.recipe_id == recipe.id).all()
+        return children_response(
+            request,
+            response,
+            db,
+            recipe_slug,
+            Step,
+            StepReturn,
+            STEP_SORT_KEYS,
+            page,
+            "step_number",
         )
-        return steps
 
     except HTTPException as e:
         raise
@@ -227,16 +619,73 @@ def get_steps_by_recipe_slug(
 
 @router.post("/step", response_model=StepReturn, status_code=201, tags=["Steps"])
 def create_step(step_data: StepCreate, db: Session = Depends(get_db_session)):
-    check_existing_step(db, step_data)
-
     try:
-        new_step = Step(**step_data.model_dump())
-        db.add(new_step)
+        new_step = insert_unique(db, Step, step_data.model_dump())
+        if new_step is None:
+            raise HTTPException(status_code=400, detail=STEP_EXISTS)
+        created = StepReturn.model_validate(new_step)
         db.commit()
-        db.refresh(new_step)
-        return new_step
+        return created
     except HTTPException:
         raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post(
+    "/shopping-list", response_model=Page[ShoppingListItem], tags=["Shopping list"]
+)
+def create_shopping_list(
+    shopping: ShoppingListCreate, db: Session = Depends(get_db_session)
+):
+    """Summed ingredients of a meal plan, one item per ingredient and unit."""
+    if len(shopping.recipes) > MAX_SHOPPING_LIST_RECIPES:
+        raise HTTPException(status_code=400, detail="Too many recipes")
+    try:
+        items = shopping_list(
+            db, [(entry.slug, entry.servings) for entry in shopping.recipes]
+        )
+        return render(ShoppingListItem, {"items": items, "next_cursor": None}, page=True)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get(
+    "/suggest/recipes", response_model=Page[TitleSuggestion], tags=["Suggest"]
+)
+def suggest_recipes(
+    prefix: str = Query(..., min_length=1, max_length=80),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS),
+    db: Session = Depends(get_db_session),
+):
+    try:
+        suggestions = suggest_titles(db, prefix, limit)
+        return render(TitleSuggestion, {"items": suggestions, "next_cursor": None}, page=True)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get(
+    "/suggest/ingredients",
+    response_model=Page[IngredientSuggestion],
+    tags=["Suggest"],
+)
+def suggest_ingredient_names(
+    prefix: str = Query(..., min_length=1, max_length=80),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS),
+    db: Session = Depends(get_db_session),
+):
+    try:
+        suggestions = suggest_ingredients(db, prefix, limit)
+        return render(
+            IngredientSuggestion, {"items": suggestions, "next_cursor": None}, page=True
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Internal server error")
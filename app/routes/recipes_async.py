@@ -0,0 +1,407 @@
+from fastapi import APIRouter, Depends, Query, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from db.schemas import (
+    Page,
+    FacetedPage,
+    RecipeReturn,
+    RecipeCreate,
+    RecipeGraphCreate,
+    BulkImportReport,
+    IngredientReturn,
+    IngredientCreate,
+    CategoryCreate,
+    CategoryReturn,
+    StepReturn,
+    StepCreate,
+    RecipeCategoriesReturn,
+    PantryMatch,
+    ShoppingListCreate,
+    ShoppingListItem,
+    SimilarRecipe,
+    TitleSuggestion,
+    IngredientSuggestion,
+)
+from db.db import get_async_db_session, get_db_session
+from db.pagination import PageParams
+from db.quantities import MAX_SERVINGS
+from db.export import aiter_recipes_ndjson
+from app.routes import recipes
+from app.utils.projection import RecipeProjection
+from app.utils.serialization import serialize
+
+
+# The same endpoints as app.routes.recipes, served from the event loop with an
+# AsyncSession. Each handler runs the sync implementation through
+# AsyncSession.run_sync, so the queries are issued on the async driver without
+# a threadpool hop and both stacks share a single implementation.
+# run_sync still executes the handler's Python on the event loop, so work that
+# is CPU or file bound rather than query bound (the bulk import) runs on a
+# worker thread with a sync session instead.
+router = APIRouter()
+
+
+async def run_handler(db: AsyncSession, handler, model, paged=False, **kwargs):
+    """Run a sync route handler on ``db`` and return its result.
+
+    ORM results are turned into plain data shaped like ``model`` before
+    leaving run_sync: response_model validation happens outside of it, where
+    lazy loads are not allowed.
+    """
+
+    def call(session):
+        result = handler(db=session, **kwargs)
+        if isinstance(result, Response):
+            return result
+        return serialize(model, result, paged)
+
+    return await db.run_sync(call)
+
+
+@router.get(
+    "/recipe",
+    response_model=FacetedPage[RecipeReturn],
+    response_model_exclude_unset=True,
+    tags=["Recipe"],
+)
+async def get_all_recipes(
+    request: Request,
+    response: Response,
+    sort: str = "id",
+    category: List[str] = Query([]),
+    category_match: str = "all",
+    facets: bool = False,
+    page: PageParams = Depends(),
+    projection: RecipeProjection = Depends(),
+    db: AsyncSession = Depends(get_async_db_session),
+):
+    return await run_handler(
+        db,
+        recipes.get_all_recipes,
+        projection.model,
+        paged=True,
+        request=request,
+        response=response,
+        sort=sort,
+        category=category,
+        category_match=category_match,
+        facets=facets,
+        page=page,
+        projection=projection,
+    )
+
+
+@router.get(
+    "/recipe/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+    tags=["Recipe"],
+)
+async def export_recipes(db: AsyncSession = Depends(get_async_db_session)):
+    return StreamingResponse(
+        aiter_recipes_ndjson(db), media_type="application/x-ndjson"
+    )
+
+
+@router.get("/recipe/search", response_model=Page[RecipeReturn], tags=["Recipe"])
+async def search_recipes(
+    q: str = Query(..., min_length=1),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db_session),
+):
+    return await run_handler(
+        db, recipes.search_recipes, RecipeReturn, paged=True, q=q, page=page
+    )
+
+
+@router.get("/recipe/pantry", response_model=Page[PantryMatch], tags=["Recipe"])
+async def get_recipes_for_pantry(
+    ingredient: List[str] = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=recipes.MAX_PANTRY_RESULTS),
+    max_missing: Optional[int] = Query(None, ge=0),
+    db: AsyncSession = Depends(get_async_db_session),
+):
+    return await run_handler(
+        db,
+        recipes.get_recipes_for_pantry,
+        PantryMatch,
+        paged=True,
+        ingredient=ingredient,
+        limit=limit,
+        max_missing=max_missing,
+    )
+
+
+@router.get("/recipe/{recipe_slug}", response_model=RecipeReturn, tags=["Recipe"])
+async def get_recipe_by_slug(
+    recipe_slug: str,
+    request: Request,
+    response: Response,
+    servings: Optional[int] = Query(None, gt=0, le=MAX_SERVINGS),
+    projection: RecipeProjection = Depends(),
+    db: AsyncSession = Depends(get_async_db_session),
+):
+    return await run_handler(
+        db,
+        recipes.get_recipe_by_slug,
+        projection.model,
+        recipe_slug=recipe_slug,
+        request=request,
+        response=response,
+        servings=servings,
+        projection=projection,
+    )
+
+
+@router.get(
+    "/recipe/{recipe_slug}/similar", response_model=Page[SimilarRecipe], tags=["Recipe"]
+)
+async def get_similar_recipes(
+    recipe_slug: str,
+    limit: int = Query(recipes.SIMILAR_TOP_K, ge=1, le=recipes.SIMILAR_TOP_K),
+    db: AsyncSession = Depends(get_async_db_session),
+):
+    return await run_handler(
+        db,
+        recipes.get_similar_recipes,
+        SimilarRecipe,
+        paged=True,
+        recipe_slug=recipe_slug,
+        limit=limit,
+    )
+
+
+@router.post("/recipe", response_model=RecipeReturn, status_code=201, tags=["Recipe"])
+async def create_recipe(
+    recipe_data: RecipeCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db_session),
+):
+    return await run_handler(
+        db, recipes.create_recipe, RecipeReturn, recipe_data=recipe_data, response=response
+    )
+
+
+@router.post(
+    "/recipe/nested", response_model=RecipeReturn, status_code=201, tags=["Recipe"]
+)
+async def create_recipe_graph(
+    recipe_data: RecipeGraphCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db_session),
+):
+    return await run_handler(
+        db, recipes.create_recipe_graph, RecipeReturn, recipe_data=recipe_data, response=response
+    )
+
+
+@router.post(
+    "/recipe/bulk", response_model=BulkImportReport, tags=["Recipe"]
+)
+async def import_recipes(
+    file: UploadFile,
+    format: str = "ndjson",
+    db: Session = Depends(get_db_session),
+):
+    # Reading the spooled upload, validating every record and matching it
+    # against the duplicate index would stall every other request on the loop.
+    return await run_in_threadpool(
+        recipes.import_recipes, file=file, format=format, db=db
+    )
+
+
+@router.post(
+    "/ingredient",
+    response_model=IngredientReturn,
+    status_code=201,
+    tags=["Ingredients"],
+)
+async def create_ingredient(
+    ingredient_data: IngredientCreate,
+    db: AsyncSession = Depends(get_async_db_session),
+):
+    return await run_handler(
+        db,
+        recipes.create_ingredient,
+        IngredientReturn,
+        ingredient_data=ingredient_data,
+    )
+
+
+@router.get(
+    "/ingredient/{recipe_slug}",
+    response_model=Page[IngredientReturn],
+    tags=["Ingredients"],
+)
+async def get_ingredient_by_recipe_slug(
+    recipe_slug: str,
+    request: Request,
+    response: Response,
+    servings: Optional[int] = Query(None, gt=0, le=MAX_SERVINGS),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db_session),
+):
+    return await run_handler(
+        db,
+        recipes.get_ingredient_by_recipe_slug,
+        IngredientReturn,
+        paged=True,
+        recipe_slug=recipe_slug,
+        request=request,
+        response=response,
+        servings=servings,
+        page=page,
+    )
+
+
+@router.get(
+    "/category/{recipe_slug}",
+    response_model=Page[RecipeCategoriesReturn],
+    tags=["Category"],
+)
+async def get_categories_by_recipe_slug(
+    recipe_slug: str,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db_session),
+):
+    return await run_handler(
+        db,
+        recipes.get_categories_by_recipe_slug,
+        RecipeCategoriesReturn,
+        paged=True,
+        recipe_slug=recipe_slug,
+        request=request,
+        response=response,
+        page=page,
+    )
+
+
+@router.post(
+    "/category{recipe_slug}",
+    response_model=RecipeCategoriesReturn,
+    status_code=201,
+    tags=["Category"],
+)
+async def add_recipe_category(
+    recipe_slug: str,
+    category_name: str,
+    db: AsyncSession = Depends(get_async_db_session),
+):
+    return await run_handler(
+        db,
+        recipes.add_recipe_category,
+        RecipeCategoriesReturn,
+        recipe_slug=recipe_slug,
+        category_name=category_name,
+    )
+
+
+@router.get("/category", response_model=Page[CategoryReturn], tags=["Category"])
+async def get_all_categories(
+    sort: str = "id",
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db_session),
+):
+    return await run_handler(
+        db,
+        recipes.get_all_categories,
+        CategoryReturn,
+        paged=True,
+        sort=sort,
+        page=page,
+    )
+
+
+@router.post(
+    "/category", response_model=CategoryReturn, status_code=201, tags=["Category"]
+)
+async def create_category(
+    category_data: CategoryCreate, db: AsyncSession = Depends(get_async_db_session)
+):
+    return await run_handler(
+        db, recipes.create_category, CategoryReturn, category_data=category_data
+    )
+
+
+@router.get(
+    "/steps/{recipe_slug}",
+    response_model=Page[StepReturn],
+    tags=["Steps"],
+)
+async def get_steps_by_recipe_slug(
+    recipe_slug: str,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db_session),
+):
+    return await run_handler(
+        db,
+        recipes.get_steps_by_recipe_slug,
+        StepReturn,
+        paged=True,
+        recipe_slug=recipe_slug,
+        request=request,
+        response=response,
+        page=page,
+    )
+
+
+@router.post("/step", response_model=StepReturn, status_code=201, tags=["Steps"])
+async def create_step(
+    step_data: StepCreate, db: AsyncSession = Depends(get_async_db_session)
+):
+    return await run_handler(db, recipes.create_step, StepReturn, step_data=step_data)
+
+
+@router.post(
+    "/shopping-list", response_model=Page[ShoppingListItem], tags=["Shopping list"]
+)
+async def create_shopping_list(
+    shopping: ShoppingListCreate, db: AsyncSession = Depends(get_async_db_session)
+):
+    return await run_handler(
+        db,
+        recipes.create_shopping_list,
+        ShoppingListItem,
+        paged=True,
+        shopping=shopping,
+    )
+
+
+@router.get(
+    "/suggest/recipes", response_model=Page[TitleSuggestion], tags=["Suggest"]
+)
+async def suggest_recipes(
+    prefix: str = Query(..., min_length=1, max_length=80),
+    limit: int = Query(10, ge=1, le=recipes.MAX_SUGGESTIONS),
+    db: AsyncSession = Depends(get_async_db_session),
+):
+    return await run_handler(
+        db, recipes.suggest_recipes, TitleSuggestion, paged=True, prefix=prefix, limit=limit
+    )
+
+
+@router.get(
+    "/suggest/ingredients",
+    response_model=Page[IngredientSuggestion],
+    tags=["Suggest"],
+)
+async def suggest_ingredient_names(
+    prefix: str = Query(..., min_length=1, max_length=80),
+    limit: int = Query(10, ge=1, le=recipes.MAX_SUGGESTIONS),
+    db: AsyncSession = Depends(get_async_db_session),
+):
+    return await run_handler(
+        db,
+        recipes.suggest_ingredient_names,
+        IngredientSuggestion,
+        paged=True,
+        prefix=prefix,
+        limit=limit,
+    )
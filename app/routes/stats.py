@@ -0,0 +1,42 @@
+from fastapi import APIRouter
+
+from db.cache import slug_cache
+from db.db import DATABASE_MODE, engine, get_async_engine, get_async_replicas, replicas
+from db.dedupe import duplicate_index
+from db.pantry import pantry_index
+from db.suggest import suggester
+from db.pool import async_pool_stats, pool_stats
+
+
+router = APIRouter()
+
+
+@router.get("/stats/slug-cache", tags=["Stats"])
+def get_slug_cache_stats():
+    return slug_cache.stats()
+
+
+@router.get("/stats/pool", tags=["Stats"])
+def get_pool_stats():
+    """Pool of the engine serving requests: the async one in async mode."""
+    if DATABASE_MODE == "async":
+        return dict(
+            async_pool_stats.snapshot(get_async_engine().sync_engine.pool),
+            replicas=get_async_replicas().status(),
+        )
+    return dict(pool_stats.snapshot(engine.pool), replicas=replicas.status())
+
+
+@router.get("/stats/pantry-index", tags=["Stats"])
+def get_pantry_index_stats():
+    return pantry_index.stats()
+
+
+@router.get("/stats/suggest", tags=["Stats"])
+def get_suggest_stats():
+    return suggester.stats()
+
+
+@router.get("/stats/dedupe", tags=["Stats"])
+def get_dedupe_stats():
+    return duplicate_index.stats()
@@ -0,0 +1,75 @@
+import hashlib
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+
+def make_etag(request: Request, *versions) -> str:
+    """Strong ETag for a response derived from the given recipe versions.
+
+    The query string is part of the tag because cursors and projections change
+    the representation of the same recipes.
+    """
+    key = repr((request.url.path, request.url.query, versions)).encode()
+    return '"%s"' % hashlib.blake2b(key, digest_size=12).hexdigest()
+
+
+def page_etag(request: Request, page: dict, *extra) -> str:
+    """ETag of a keyset page; ``extra`` covers other parts of the body."""
+    versions = [(item.id, item.version) for item in page["items"]]
+    return make_etag(request, versions, page["next_cursor"], *extra)
+
+
+def page_last_modified(page: dict):
+    return max((item.updated_at for item in page["items"]), default=None)
+
+
+def is_conditional(request: Request) -> bool:
+    return (
+        "if-none-match" in request.headers or "if-modified-since" in request.headers
+    )
+
+
+def is_not_modified(request: Request, etag: str, last_modified=None) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since (RFC 9110)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return _as_utc(last_modified).replace(microsecond=0) <= since
+
+
+def validator_headers(etag: str, last_modified=None) -> dict:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+def not_modified_response(etag: str, last_modified=None) -> Response:
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
+
+
+def with_validators(result, response: Response, etag: str, last_modified=None):
+    """Attach ETag / Last-Modified to ``result`` (a Response or route data)."""
+    target = result if isinstance(result, Response) else response
+    target.headers.update(validator_headers(etag, last_modified))
+    return result
+
+
+def _as_utc(value):
+    # Timestamps are stored without a zone and written by the database in UTC.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
@@ -0,0 +1,106 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+from fastapi import HTTPException, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import load_only, raiseload, selectinload
+
+from db.loaders import RECIPE_GRAPH_OPTIONS
+from db.models import Recipe
+from db.schemas import FacetedPage, recipe_projection_model
+from app.utils import serialization
+
+
+RECIPE_FIELDS = ("id", "title", "description", "slug", "servings")
+RECIPE_RELATIONSHIPS = ("ingredients", "steps", "categories")
+
+
+def _split(value: Optional[str]):
+    if value is None:
+        return None
+    return tuple(part.strip() for part in value.split(",") if part.strip())
+
+
+@dataclass
+class RecipeProjection:
+    """Sparse fieldset requested through ``fields=`` and ``include=``.
+
+    ``fields`` narrows the recipe columns (id is always kept) and ``include``
+    names the child collections to return. Giving ``fields`` without
+    ``include`` drops every child collection; giving neither returns the full
+    RecipeReturn.
+    """
+
+    fields: Optional[str] = Query(
+        None, description="Comma separated recipe fields, e.g. id,slug,title"
+    )
+    include: Optional[str] = Query(
+        None, description="Comma separated child collections, e.g. steps,ingredients"
+    )
+    columns: tuple = field(init=False)
+    relationships: tuple = field(init=False)
+
+    def __post_init__(self):
+        fields = _split(self.fields)
+        include = _split(self.include)
+
+        for name in fields or ():
+            if name not in RECIPE_FIELDS:
+                raise HTTPException(status_code=400, detail=f"Invalid field: {name}")
+        for name in include or ():
+            if name not in RECIPE_RELATIONSHIPS:
+                raise HTTPException(status_code=400, detail=f"Invalid include: {name}")
+
+        if fields is None:
+            self.columns = RECIPE_FIELDS
+        else:
+            self.columns = tuple(f for f in RECIPE_FIELDS if f in fields or f == "id")
+
+        if include is not None:
+            self.relationships = tuple(r for r in RECIPE_RELATIONSHIPS if r in include)
+        elif fields is not None:
+            self.relationships = ()
+        else:
+            self.relationships = RECIPE_RELATIONSHIPS
+
+    @property
+    def is_full(self) -> bool:
+        return (
+            self.columns == RECIPE_FIELDS
+            and self.relationships == RECIPE_RELATIONSHIPS
+        )
+
+    @property
+    def model(self):
+        return recipe_projection_model(self.columns, self.relationships)
+
+    def options(self, extra_columns=()):
+        """Loader options selecting only the requested columns and children.
+
+        ``extra_columns`` are loaded but not returned (e.g. keyset sort keys).
+        raiseload guards against a collection that was not requested being
+        loaded lazily after all.
+        """
+        if self.is_full:
+            return RECIPE_GRAPH_OPTIONS
+        columns = [getattr(Recipe, name) for name in self.columns]
+        columns += [c for c in extra_columns if c.key not in self.columns]
+        return (
+            load_only(*columns),
+            *(selectinload(getattr(Recipe, name)) for name in self.relationships),
+            raiseload("*"),
+        )
+
+    def render(self, data, page=False):
+        """Render ``data`` (a recipe, or a keyset page when ``page``).
+
+        The full projection is left to the route's response_model unless the
+        fast serialization path is on; sparse ones are validated against the
+        slimmed model.
+        """
+        if self.is_full or serialization.FAST_SERIALIZATION:
+            return serialization.render(self.model, data, page)
+        model = FacetedPage[self.model] if page else self.model
+        return JSONResponse(
+            model.model_validate(data).model_dump(mode="json", exclude_unset=True)
+        )
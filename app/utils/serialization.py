@@ -0,0 +1,91 @@
+import os
+import typing
+from functools import lru_cache
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+
+# Opt-in: serialize trusted ORM rows straight to JSON bytes instead of
+# validating them through the response_model first.
+FAST_SERIALIZATION = os.getenv("FAST_SERIALIZATION", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+
+class ORJSONBytesResponse(Response):
+    """JSON response rendered with orjson.
+
+    For the str/int/None payloads of this API the bytes are identical to
+    FastAPI's default JSONResponse (compact separators, no ASCII escaping).
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+
+def _nested_model(annotation):
+    """Return (model, many) for an ``Optional[List[Model]]`` or ``Model``
+    annotation, or (None, False) for plain values."""
+    for arg in typing.get_args(annotation) or (annotation,):
+        if typing.get_origin(arg) in (list, typing.List):
+            (item,) = typing.get_args(arg)
+            if isinstance(item, type) and issubclass(item, BaseModel):
+                return item, True
+        elif isinstance(arg, type) and issubclass(arg, BaseModel):
+            return arg, False
+    return None, False
+
+
+@lru_cache(maxsize=None)
+def serializer_for(model):
+    """Build a function turning an ORM object into a dict shaped like ``model``.
+
+    Fields are read in the model's declaration order so the JSON keys come out
+    in the same order as the validated path, and nested model fields reuse the
+    (cached) serializer of that model.
+    """
+    fields = []
+    for name, info in model.model_fields.items():
+        nested, many = _nested_model(info.annotation)
+        fields.append((name, serializer_for(nested) if nested else None, many))
+
+    def serialize(obj):
+        data = {}
+        for name, nested, many in fields:
+            value = getattr(obj, name)
+            if nested is not None and value is not None:
+                value = [nested(item) for item in value] if many else nested(value)
+            data[name] = value
+        return data
+
+    return serialize
+
+
+def render(model, data, page=False):
+    """Return ``data`` for response_model validation, or as fast JSON bytes.
+
+    ``page`` marks a keyset page dict ({"items", "next_cursor"} and optionally
+    "facets").
+    """
+    if not FAST_SERIALIZATION:
+        return data
+    return ORJSONBytesResponse(serialize(model, data, page))
+
+
+def serialize(model, data, page=False):
+    to_dict = serializer_for(model)
+    if page:
+        result = {
+            "items": [to_dict(item) for item in data["items"]],
+            "next_cursor": data["next_cursor"],
+        }
+        if "facets" in data:
+            result["facets"] = data["facets"]
+        return result
+    return to_dict(data)
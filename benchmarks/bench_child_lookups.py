@@ -0,0 +1,51 @@
+"""Slug scoped child lookups: slug query + child query vs one joined query.
+
+    python -m benchmarks.bench_child_lookups --rtt-ms 0.5 --concurrency 32
+"""
+from db.loaders import INGREDIENT_SORT_KEYS, fetch_children_by_recipe_slug
+from db.models import Ingredient, Recipe
+from db.pagination import PageParams
+
+from benchmarks.common import (
+    create_catalog,
+    make_engine,
+    parser,
+    report,
+    run_concurrently,
+)
+
+
+def two_round_trips(db, slug, page):
+    recipe = db.query(Recipe).filter(Recipe.slug == slug).first()
+    if recipe is None:
+        return None
+    ingredients = db.query(Ingredient).filter(Ingredient.recipe_id == recipe.id)
+    return ingredients.limit(page.limit + 1).all()
+
+
+def one_round_trip(db, slug, page):
+    return fetch_children_by_recipe_slug(
+        db, slug, Ingredient, INGREDIENT_SORT_KEYS, page, "id"
+    )
+
+
+def main():
+    args = parser(__doc__).parse_args()
+    engine = make_engine(args)
+    Session = create_catalog(engine, args.recipes, args.children)
+    page = PageParams(cursor=None, limit=50)
+
+    for name, lookup in (
+        ("slug + children (2 trips)", two_round_trips),
+        ("joined (1 trip)", one_round_trip),
+    ):
+
+        def request(i):
+            with Session() as db:
+                lookup(db, f"recipe-{i % args.recipes}", page)
+
+        report(name, *run_concurrently(request, args.concurrency, args.requests))
+
+
+if __name__ == "__main__":
+    main()
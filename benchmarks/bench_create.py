@@ -0,0 +1,51 @@
+"""Create latency: add + commit + refresh vs INSERT .. RETURNING.
+
+    python -m benchmarks.bench_create --requests 2000 --rtt-ms 0.5
+
+Both paths create one step and build its StepReturn; the old path pays the
+SELECT of db.refresh after commit, the new one reads everything from the
+INSERT's RETURNING clause.
+"""
+from db.models import Step
+from db.schemas import StepReturn
+from db.writes import insert_unique
+
+from benchmarks.common import create_catalog, make_engine, parser, report, run_concurrently
+
+
+def refresh_after_commit(Session, i, recipes):
+    with Session() as db:
+        step = Step(step_number=1000 + i, step="Bench", recipe_id=i % recipes + 1)
+        db.add(step)
+        db.commit()
+        db.refresh(step)
+        return StepReturn.model_validate(step)
+
+
+def insert_returning(Session, i, recipes):
+    with Session() as db:
+        step = insert_unique(
+            db, Step, {"step_number": 1000 + i, "step": "Bench", "recipe_id": i % recipes + 1}
+        )
+        created = StepReturn.model_validate(step)
+        db.commit()
+        return created
+
+
+def main():
+    args = parser(__doc__).parse_args()
+    engine = make_engine(args)
+
+    for name, create in (
+        ("commit + refresh", refresh_after_commit),
+        ("INSERT .. RETURNING", insert_returning),
+    ):
+        Session = create_catalog(engine, args.recipes, 1)
+        latencies, elapsed = run_concurrently(
+            lambda i: create(Session, i, args.recipes), args.concurrency, args.requests
+        )
+        report(name, latencies, elapsed)
+
+
+if __name__ == "__main__":
+    main()
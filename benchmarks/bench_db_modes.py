@@ -0,0 +1,81 @@
+"""Throughput of the sync (threadpool) and async (event loop) request stacks.
+
+    python -m benchmarks.bench_db_modes --recipes 1000 --concurrency 256
+
+Both apps serve the same endpoints from the same database; requests are driven
+in-process through httpx's ASGI transport so only the server side is measured.
+Use a Postgres --database-url for meaningful numbers: SQLite serializes writers
+and aiosqlite runs each connection on a thread. --rtt-ms only delays the sync
+engine (a blocking sleep would stall the event loop).
+"""
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.routes import recipes, recipes_async
+from db.db import AsyncSessionLocal, async_database_url, get_async_db_session, get_db_session
+
+from benchmarks.common import create_catalog, make_engine, parser, report
+
+
+def sync_app(Session):
+    def _get_db_session():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(recipes.router)
+    app.dependency_overrides[get_db_session] = _get_db_session
+    return app
+
+
+def async_app(async_engine):
+    async def _get_async_db_session():
+        async with AsyncSessionLocal(bind=async_engine) as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(recipes_async.router)
+    app.dependency_overrides[get_async_db_session] = _get_async_db_session
+    return app
+
+
+async def drive(app, args):
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def _timed(i):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(f"/recipe/recipe-{i % args.recipes}")
+                response.raise_for_status()
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(_timed(i) for i in range(args.requests)))
+        return latencies, time.perf_counter() - start
+
+
+def main():
+    args = parser(__doc__).parse_args()
+    engine = make_engine(args)
+    Session = create_catalog(engine, args.recipes, args.children)
+    async_engine = create_async_engine(
+        async_database_url(engine.url), pool_size=args.concurrency
+    )
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}")
+    report("sync (threadpool)", *asyncio.run(drive(sync_app(Session), args)))
+    report("async (event loop)", *asyncio.run(drive(async_app(async_engine), args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Response serialization: response_model validation vs pre-built serializers.
+
+    python -m benchmarks.bench_serialization --recipes 1000 --children 10
+"""
+import json
+import time
+
+from app.utils.serialization import serialize, ORJSONBytesResponse
+from db.loaders import recipe_graph_query
+from db.schemas import Page, RecipeReturn
+
+from benchmarks.common import create_catalog, make_engine, parser
+
+
+def validated(page):
+    # What FastAPI does for response_model=Page[RecipeReturn] + JSONResponse.
+    content = Page[RecipeReturn].model_validate(page).model_dump(mode="json")
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def fast(page):
+    return ORJSONBytesResponse(serialize(RecipeReturn, page, page=True)).body
+
+
+def best_of(fn, page, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        body = fn(page)
+        timings.append(time.perf_counter() - start)
+    return min(timings), body
+
+
+def main():
+    args = parser(__doc__).parse_args()
+    args.concurrency = 1
+    engine = make_engine(args)
+    Session = create_catalog(engine, args.recipes, args.children)
+
+    with Session() as db:
+        page = {"items": recipe_graph_query(db).all(), "next_cursor": None}
+        slow_time, slow_body = best_of(validated, page, rounds=5)
+        fast_time, fast_body = best_of(fast, page, rounds=5)
+
+    assert slow_body == fast_body, "fast path output differs"
+    print(f"{args.recipes} recipes, {len(fast_body) / 1024:.0f} KiB")
+    print(f"response_model validation  {slow_time * 1000:8.2f} ms")
+    print(f"pre-built serializers      {fast_time * 1000:8.2f} ms")
+    print(f"speed-up                   {slow_time / fast_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Suggestion latency: in-memory prefix index vs the SQL fallback.
+
+    python -m benchmarks.bench_suggest --recipes 20000 --requests 20000
+
+Prefixes are drawn from the synthetic titles and ingredient names, one to
+four characters long, so most requests hit wide prefix ranges.
+"""
+import random
+
+from db.models import Recipe
+from db.suggest import (
+    Suggester,
+    sql_suggest_ingredients,
+    sql_suggest_titles,
+)
+
+from benchmarks.common import create_catalog, make_engine, parser, report, run_concurrently
+
+
+def main():
+    args = parser(__doc__).parse_args()
+    engine = make_engine(args)
+    Session = create_catalog(engine, args.recipes, args.children)
+
+    index = Suggester()
+    with Session() as db:
+        index.load(db)
+    words = ["recipe", "ingr", "1", "12", "r", "in"]
+    prefixes = [
+        (random.choice(("titles", "ingredients")), random.choice(words)[: random.randint(1, 4)])
+        for _ in range(args.requests)
+    ]
+
+    def in_memory(i):
+        kind, prefix = prefixes[i]
+        return getattr(index, kind)(prefix, 10)
+
+    def sql(i):
+        kind, prefix = prefixes[i]
+        suggest = sql_suggest_titles if kind == "titles" else sql_suggest_ingredients
+        with Session() as db:
+            return suggest(db, prefix, 10)
+
+    for name, suggest in (("in-memory index", in_memory), ("SQL fallback", sql)):
+        latencies, elapsed = run_concurrently(suggest, args.concurrency, args.requests)
+        report(name, latencies, elapsed)
+
+    # A write between every request: each re-saves a random recipe, which
+    # drops the kept lists it was in and merges it back into the others.
+    with Session() as db:
+        recipes = [
+            (recipe.id, recipe.title, recipe.slug, [i.name for i in recipe.ingredients])
+            for recipe in db.query(Recipe)
+        ]
+
+    def after_write(i):
+        recipe_id, title, slug, names = random.choice(recipes)
+        index.apply({recipe_id: (i + 2, title, slug, names)})
+        return in_memory(i)
+
+    latencies, elapsed = run_concurrently(after_write, 1, args.requests)
+    report("in-memory, after writes", latencies, elapsed)
+
+
+if __name__ == "__main__":
+    main()
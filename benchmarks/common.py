@@ -0,0 +1,114 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from db.models import Base, Recipe, Ingredient, RecipeCategories, Step, Category
+
+
+def parser(description):
+    """Arguments shared by every benchmark script."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("BENCH_DATABASE_URL"),
+        help="Database to benchmark against (default: a temporary SQLite file)",
+    )
+    parser.add_argument("--recipes", type=int, default=1000)
+    parser.add_argument("--children", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument(
+        "--rtt-ms",
+        type=float,
+        default=0.0,
+        help="Simulated network round trip added to every statement",
+    )
+    return parser
+
+
+def make_engine(args, **kwargs):
+    url = args.database_url
+    if url is None:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        url = f"sqlite:///{path}"
+        kwargs.setdefault("connect_args", {"check_same_thread": False})
+    engine = create_engine(url, pool_size=args.concurrency, **kwargs)
+
+    if args.rtt_ms:
+        @event.listens_for(engine, "before_cursor_execute")
+        def _round_trip(*_):
+            time.sleep(args.rtt_ms / 1000)
+
+    return engine
+
+
+def create_catalog(engine, recipes, children):
+    """(Re)create the schema and bulk insert a synthetic catalog."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Category),
+            [{"id": n + 1, "name": f"category-{n}"} for n in range(children)],
+        )
+        conn.execute(
+            insert(Recipe),
+            [
+                {
+                    "id": i + 1,
+                    "title": f"Recipe {i}",
+                    "slug": f"recipe-{i}",
+                    "description": f"Description {i}",
+                }
+                for i in range(recipes)
+            ],
+        )
+        for model, row in (
+            (Step, lambda r, n: {"step_number": n, "step": f"Step {n}"}),
+            (Ingredient, lambda r, n: {"name": f"ingr-{n}", "amount": "1"}),
+            (RecipeCategories, lambda r, n: {"category_id": n + 1}),
+        ):
+            conn.execute(
+                insert(model),
+                [
+                    dict(row(r, n), recipe_id=r + 1)
+                    for r in range(recipes)
+                    for n in range(children)
+                ],
+            )
+
+    return sessionmaker(bind=engine)
+
+
+def run_concurrently(fn, concurrency, requests):
+    """Call ``fn(i)`` ``requests`` times from ``concurrency`` threads.
+
+    Returns the per-call latencies in seconds and the total wall time.
+    """
+
+    def _timed(i):
+        start = time.perf_counter()
+        fn(i)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(_timed, range(requests)))
+    return latencies, time.perf_counter() - start
+
+
+def report(name, latencies, elapsed):
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<28} {len(latencies) / elapsed:>9.0f} req/s"
+        f"  p50 {quantiles[49] * 1000:7.2f} ms"
+        f"  p95 {quantiles[94] * 1000:7.2f} ms"
+        f"  p99 {quantiles[98] * 1000:7.2f} ms"
+    )
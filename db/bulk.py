@@ -0,0 +1,334 @@
+import csv
+import io
+import itertools
+import json
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from db.cache import slug_cache
+from db.dedupe import duplicate_index, find_duplicates
+from db.dialects import dialect_insert
+from db.events import mark_recipes_created
+from db.models import Recipe, Ingredient, RecipeCategories, Step, Category
+from db.quantities import with_quantity
+from db.schemas import RecipeGraphCreate
+
+
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+FORMATS = ("ndjson", "csv")
+# CSV columns holding JSON arrays of the nested children.
+CSV_NESTED_COLUMNS = ("steps", "ingredients", "categories")
+
+
+@dataclass
+class Rejected:
+    line: int
+    slug: Optional[str]
+    reason: str
+
+
+@dataclass
+class PossibleDuplicate:
+    line: int
+    slug: str
+    duplicate_of: str
+    similarity: float
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    rejected: int = 0
+    batches: int = 0
+    duplicates: int = 0
+
+
+def read_records(lines, fmt):
+    """Yield (line number, record dict or None, error or None) from ``lines``.
+
+    NDJSON lines are RecipeGraphCreate objects. CSV rows have the recipe
+    columns plus steps / ingredients / categories cells holding JSON arrays.
+    """
+    if fmt == "ndjson":
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line), None
+            except ValueError as e:
+                yield number, None, f"Invalid JSON: {e}"
+    elif fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            try:
+                for column in CSV_NESTED_COLUMNS:
+                    row[column] = json.loads(row.get(column) or "[]")
+            except ValueError as e:
+                yield reader.line_num, None, f"Invalid JSON in {column}: {e}"
+                continue
+            yield reader.line_num, row, None
+    else:
+        raise ValueError(f"Unknown format: {fmt}")
+
+
+def validate_record(number, data, error):
+    """Return (RecipeGraphCreate, None) or (None, Rejected)."""
+    slug = data.get("slug") if isinstance(data, dict) else None
+    if error is not None:
+        return None, Rejected(number, slug, error)
+    try:
+        recipe = RecipeGraphCreate.model_validate(data)
+    except ValidationError as e:
+        first = e.errors()[0]
+        location = ".".join(str(part) for part in first["loc"])
+        return None, Rejected(number, slug, f"{location}: {first['msg']}")
+
+    step_numbers = [step.step_number for step in recipe.steps]
+    if len(set(step_numbers)) != len(step_numbers):
+        return None, Rejected(number, slug, "Duplicate step number")
+    names = [ingredient.name for ingredient in recipe.ingredients]
+    if len(set(names)) != len(names):
+        return None, Rejected(number, slug, "Duplicate ingredient")
+    return recipe, None
+
+
+def bulk_insert(db: Session, model, rows):
+    """Insert plain ``rows`` into ``model``'s table in the current transaction.
+
+    Postgres through psycopg2 loads them with COPY; other drivers (asyncpg
+    under DATABASE_MODE=async has no copy_expert) and databases get an
+    executemany, which SQLAlchemy batches into multi-row INSERTs. Either way
+    a rejected row raises DBAPIError, which RecipeImporter retries on.
+    """
+    if not rows:
+        return
+    dialect = db.get_bind().dialect
+    if dialect.name != "postgresql" or dialect.driver != "psycopg2":
+        db.execute(insert(model), rows)
+        return
+
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["\\N" if row[c] is None else row[c] for c in columns])
+    buffer.seek(0)
+    statement = "COPY %s (%s) FROM STDIN WITH (FORMAT csv, NULL '\\N')" % (
+        model.__tablename__,
+        ", ".join(columns),
+    )
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(statement, buffer)
+    except dialect.loaded_dbapi.Error as e:
+        # The raw cursor bypasses SQLAlchemy's exception wrapping.
+        raise DBAPIError.instance(
+            statement, None, e, dialect.loaded_dbapi.Error, dialect=dialect
+        )
+    finally:
+        cursor.close()
+
+
+class RecipeImporter:
+    """Merge a stream of nested recipes into the catalog, batch by batch.
+
+    Each batch is one transaction: recipes are inserted with a multi-row
+    INSERT .. ON CONFLICT DO NOTHING RETURNING, so existing titles / slugs
+    are reported instead of aborting the batch, then the children of the
+    inserted recipes are bulk loaded. If the database still rejects a batch
+    (e.g. a value too long for its column) it is retried row by row to find
+    the offending records.
+
+    Imported recipes that look like an existing recipe, or like one imported
+    before them, are reported to ``on_duplicate`` (see db.dedupe); they are
+    imported all the same.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        batch_size=BULK_BATCH_SIZE,
+        on_reject=None,
+        on_progress=None,
+        on_duplicate=None,
+    ):
+        self.db = db
+        self.batch_size = batch_size
+        self.on_reject = on_reject or (lambda rejected: None)
+        self.on_progress = on_progress or (lambda report: None)
+        self.on_duplicate = on_duplicate or (lambda duplicate: None)
+        self.report = ImportReport()
+        self._category_ids = {}
+
+    def run(self, records):
+        duplicate_index.ensure_loaded(self.db)
+        records = iter(records)
+        while True:
+            batch = list(itertools.islice(records, self.batch_size))
+            if not batch:
+                return self.report
+            self._import_batch(batch)
+            self.report.batches += 1
+            self.on_progress(self.report)
+
+    def _reject(self, rejected):
+        self.report.rejected += 1
+        self.on_reject(rejected)
+
+    def _import_batch(self, batch):
+        accepted = []
+        for number, data, error in batch:
+            recipe, rejected = validate_record(number, data, error)
+            if rejected is not None:
+                self._reject(rejected)
+            else:
+                accepted.append((number, recipe))
+        accepted = self._resolve_categories(accepted)
+
+        try:
+            imported, rejected = self._merge(accepted)
+            self.db.commit()
+        except DBAPIError:
+            self.db.rollback()
+            imported, rejected = [], []
+            for number, recipe in accepted:
+                try:
+                    slugs, conflicts = self._merge([(number, recipe)])
+                    self.db.commit()
+                except DBAPIError as e:
+                    self.db.rollback()
+                    slugs, conflicts = [], [Rejected(number, recipe.slug, str(e.orig).strip())]
+                imported += slugs
+                rejected += conflicts
+
+        # Drop negative entries cached while these slugs did not exist yet.
+        for slug in imported:
+            slug_cache.invalidate(slug=slug)
+        self.report.imported += len(imported)
+        for conflict in rejected:
+            self._reject(conflict)
+        self._flag_duplicates(imported, accepted)
+
+    def _flag_duplicates(self, slugs, accepted):
+        records = {recipe.slug: (number, recipe) for number, recipe in accepted}
+        # Within a batch only earlier records count, so a pair of duplicates
+        # is flagged once, on its second recipe.
+        order = {slug: position for position, slug in enumerate(slugs)}
+        for slug in slugs:
+            number, recipe = records[slug]
+            matches = [
+                match
+                for match in find_duplicates(
+                    recipe.title,
+                    [ingredient.name for ingredient in recipe.ingredients],
+                    [step.step for step in recipe.steps],
+                    exclude_slug=slug,
+                )
+                if order.get(match.slug, -1) < order[slug]
+            ]
+            if matches:
+                self.report.duplicates += 1
+                self.on_duplicate(
+                    PossibleDuplicate(number, slug, matches[0].slug, matches[0].similarity)
+                )
+
+    def _resolve_categories(self, accepted):
+        names = {name for _, recipe in accepted for name in recipe.categories}
+        missing = names - self._category_ids.keys()
+        if missing:
+            self._category_ids.update(
+                self.db.query(Category.name, Category.id).filter(Category.name.in_(missing))
+            )
+
+        resolved = []
+        for number, recipe in accepted:
+            unknown = [name for name in recipe.categories if name not in self._category_ids]
+            if unknown:
+                self._reject(Rejected(number, recipe.slug, f"Category does not exist: {unknown[0]}"))
+            else:
+                resolved.append((number, recipe))
+        return resolved
+
+    def _merge(self, records):
+        """Insert ``records``; returns (imported slugs, rejected conflicts)."""
+        if not records:
+            return [], []
+        statement = (
+            dialect_insert(self.db, Recipe)
+            .on_conflict_do_nothing()
+            .returning(Recipe.id, Recipe.slug)
+        )
+        rows = [
+            recipe.model_dump(include={"title", "slug", "description", "servings"})
+            for _, recipe in records
+        ]
+        ids = dict(
+            (slug, recipe_id) for recipe_id, slug in self.db.execute(statement, rows)
+        )
+
+        inserted, conflicts = [], []
+        for number, recipe in records:
+            if ids.get(recipe.slug) is not None:
+                inserted.append((ids.pop(recipe.slug), recipe))
+            else:
+                conflicts.append((number, recipe))
+
+        bulk_insert(
+            self.db,
+            Step,
+            [
+                dict(step.model_dump(), recipe_id=recipe_id)
+                for recipe_id, recipe in inserted
+                for step in recipe.steps
+            ],
+        )
+        bulk_insert(
+            self.db,
+            Ingredient,
+            [
+                with_quantity(dict(ingredient.model_dump(), recipe_id=recipe_id))
+                for recipe_id, recipe in inserted
+                for ingredient in recipe.ingredients
+            ],
+        )
+        bulk_insert(
+            self.db,
+            RecipeCategories,
+            [
+                {"recipe_id": recipe_id, "category_id": self._category_ids[name]}
+                for recipe_id, recipe in inserted
+                for name in dict.fromkeys(recipe.categories)
+            ],
+        )
+        mark_recipes_created(self.db, [recipe_id for recipe_id, _ in inserted])
+        return [recipe.slug for _, recipe in inserted], self._conflict_reasons(conflicts)
+
+    def _conflict_reasons(self, conflicts):
+        if not conflicts:
+            return []
+        titles = {recipe.title for _, recipe in conflicts}
+        existing_titles = {
+            title
+            for (title,) in self.db.query(Recipe.title).filter(
+                or_(
+                    Recipe.title.in_(titles),
+                    Recipe.slug.in_({recipe.slug for _, recipe in conflicts}),
+                )
+            )
+        }
+        return [
+            Rejected(
+                number,
+                recipe.slug,
+                "Recipe with this title exists"
+                if recipe.title in existing_titles
+                else "Recipe with this Slug exists",
+            )
+            for number, recipe in conflicts
+        ]
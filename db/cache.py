@@ -0,0 +1,154 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+SLUG_CACHE_SIZE = int(os.getenv("SLUG_CACHE_SIZE", "10000"))
+SLUG_CACHE_TTL = float(os.getenv("SLUG_CACHE_TTL", "300"))
+SLUG_CACHE_NEGATIVE_TTL = float(os.getenv("SLUG_CACHE_NEGATIVE_TTL", "30"))
+FACET_CACHE_SIZE = int(os.getenv("FACET_CACHE_SIZE", "1000"))
+FACET_CACHE_TTL = float(os.getenv("FACET_CACHE_TTL", "60"))
+
+
+class SlugCache:
+    """Bounded LRU + TTL mapping of recipe slug to recipe id.
+
+    Unknown slugs are cached as None (for the shorter ``negative_ttl``) so
+    repeated 404s do not reach the database. The cache is per process: writes
+    in this process invalidate it immediately, writes made by other workers
+    become visible once the TTL expires.
+    """
+
+    def __init__(self, maxsize, ttl, negative_ttl, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._slugs_by_id = {}
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, slug):
+        """Return (found, recipe_id); a found None means the slug is unknown."""
+        with self._lock:
+            entry = self._entries.get(slug)
+            if entry is not None:
+                recipe_id, expires_at = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(slug)
+                    if recipe_id is None:
+                        self.negative_hits += 1
+                    else:
+                        self.hits += 1
+                    return True, recipe_id
+                self._pop(slug)
+            self.misses += 1
+            return False, None
+
+    def set(self, slug, recipe_id):
+        ttl = self.ttl if recipe_id is not None else self.negative_ttl
+        with self._lock:
+            self._pop(slug)
+            self._entries[slug] = (recipe_id, self._clock() + ttl)
+            if recipe_id is not None:
+                self._slugs_by_id[recipe_id] = slug
+            while len(self._entries) > self.maxsize:
+                self._pop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def set_missing(self, slug):
+        self.set(slug, None)
+
+    def invalidate(self, slug=None, recipe_id=None):
+        with self._lock:
+            if slug is not None:
+                self._pop(slug)
+            if recipe_id is not None and recipe_id in self._slugs_by_id:
+                self._pop(self._slugs_by_id[recipe_id])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._slugs_by_id.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits + self.negative_hits) / lookups
+                if lookups
+                else 0.0,
+            }
+
+    def _pop(self, slug):
+        entry = self._entries.pop(slug, None)
+        if entry is not None and entry[0] is not None:
+            self._slugs_by_id.pop(entry[0], None)
+
+
+slug_cache = SlugCache(SLUG_CACHE_SIZE, SLUG_CACHE_TTL, SLUG_CACHE_NEGATIVE_TTL)
+
+
+class FacetCache:
+    """Bounded LRU + TTL cache of category facet counts per category filter.
+
+    Commits in this process clear it (see db.facets); counts changed by other
+    workers show up once the TTL expires.
+    """
+
+    def __init__(self, maxsize, ttl, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached counts for ``key``, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                counts, expires_at = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return counts
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, counts):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (counts, self._clock() + self.ttl)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+facet_cache = FacetCache(FACET_CACHE_SIZE, FACET_CACHE_TTL)
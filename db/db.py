@@ -1,18 +1,123 @@
 import os
+from functools import lru_cache
+
+from fastapi import Request, Response
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+from db.routing import (
+    READ_REPLICA_URLS,
+    SAFE_METHODS,
+    ReplicaSet,
+    RoutingSession,
+    is_read_only,
+    stick_to_primary,
+)
+
 
 DEV_DATABASE_URL = os.getenv("DEV_DATABASE_URL")
+# "sync" serves requests from the threadpool with Session, "async" from the
+# event loop with AsyncSession (see app.routes.recipes_async).
+DATABASE_MODE = os.getenv("DATABASE_MODE", "sync")
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# Connection pool of the sync engine. Size it so that
+# workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) stays below max_connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
 
-engine = create_engine(DEV_DATABASE_URL)
+POOL_OPTIONS = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=True, bind=engine)
+engine = create_engine(
+    DEV_DATABASE_URL, poolclass=InstrumentedQueuePool, **POOL_OPTIONS
+)
+replicas = ReplicaSet([create_engine(url, **POOL_OPTIONS) for url in READ_REPLICA_URLS])
+
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    replicas=replicas,
+    autocommit=False,
+    autoflush=True,
+    bind=engine,
+)
+# Routed like SessionLocal: AsyncSession runs a RoutingSession underneath, so
+# get_async_db_session passes the replicas of get_async_replicas().
+AsyncSessionLocal = async_sessionmaker(
+    sync_session_class=RoutingSession, autoflush=True, expire_on_commit=False
+)
 Base = declarative_base()
 
-def get_db_session():
-    db = SessionLocal()
+
+def async_database_url(url):
+    """Swap the sync driver of ``url`` for its asyncio counterpart."""
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+
+
+@lru_cache(maxsize=None)
+def get_async_engine():
+    url = ASYNC_DATABASE_URL or async_database_url(DEV_DATABASE_URL)
+    return create_async_engine(url, poolclass=InstrumentedAsyncQueuePool, **POOL_OPTIONS)
+
+
+@lru_cache(maxsize=None)
+def get_async_replicas():
+    """Read replicas for the async stack.
+
+    Holds the sync_engine of each replica's AsyncEngine: that is what an
+    AsyncSession's underlying RoutingSession binds to.
+    """
+    return ReplicaSet(
+        [
+            create_async_engine(async_database_url(url), **POOL_OPTIONS).sync_engine
+            for url in READ_REPLICA_URLS
+        ]
+    )
+
+
+def get_db_session(request: Request, response: Response):
+    """One session per request, released when the response is done.
+
+    Handlers commit their own unit of work; anything left uncommitted when the
+    request fails is rolled back before the connection returns to the pool.
+    Safe requests read from a replica unless the client wrote recently; writes
+    keep the client on the primary for STICKY_PRIMARY_SECONDS.
+    """
+    read_only = is_read_only(request)
+    if replicas and request.method not in SAFE_METHODS:
+        stick_to_primary(response)
+    db = SessionLocal(info={"read_only": read_only})
     try:
-        return db
+        yield db
+    except Exception:
+        db.rollback()
+        raise
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db_session(request: Request, response: Response):
+    """Async counterpart of get_db_session, with the same replica routing."""
+    replicas = get_async_replicas()
+    if replicas and request.method not in SAFE_METHODS:
+        stick_to_primary(response)
+    async with AsyncSessionLocal(
+        bind=get_async_engine(),
+        replicas=replicas,
+        info={"read_only": is_read_only(request)},
+    ) as db:
+        yield db
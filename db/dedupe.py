@@ -0,0 +1,333 @@
+import itertools
+import os
+import re
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from db.events import on_commit_update
+from db.models import Recipe, Ingredient, Step
+from db.pantry import normalize_ingredient
+
+
+# 64 permutations in 16 bands of 4 rows: pairs above ~0.5 estimated Jaccard
+# similarity share a band with high probability, pairs below ~0.3 rarely do.
+DEDUPE_PERMUTATIONS = 64
+DEDUPE_BANDS = 16
+DEDUPE_THRESHOLD = float(os.getenv("DEDUPE_THRESHOLD", "0.6"))
+DEDUPE_BATCH_SIZE = int(os.getenv("DEDUPE_BATCH_SIZE", "2000"))
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240229)
+_A = _rng.integers(1, _PRIME, DEDUPE_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, DEDUPE_PERMUTATIONS, dtype=np.uint64)
+_ROWS = DEDUPE_PERMUTATIONS // DEDUPE_BANDS
+
+
+def title_features(title):
+    """Character trigrams of the title with punctuation and spaces removed (so
+    "Choc-chip cookies" still shares most of them with "Chocolate Chip
+    Cookies")."""
+    letters = re.sub(r"\W+", "", title.casefold())
+    return {"t:" + letters[i : i + 3] for i in range(max(len(letters) - 2, 1))}
+
+
+def recipe_features(title, ingredient_names, steps):
+    """Set of shingles describing a recipe.
+
+    The title's trigrams (see title_features), normalized ingredient names
+    and word trigrams of the steps.
+    """
+    features = title_features(title)
+    features.update("i:" + normalize_ingredient(name) for name in ingredient_names)
+    for step in steps:
+        words = re.findall(r"\w+", step.casefold())
+        features.update(
+            "s:" + " ".join(words[i : i + 3]) for i in range(max(len(words) - 2, 0))
+        )
+        if 0 < len(words) < 3:
+            features.add("s:" + " ".join(words))
+    return features
+
+
+def minhash(features):
+    """MinHash signature of ``features``: DEDUPE_PERMUTATIONS uint32 values."""
+    hashes = np.fromiter(
+        (zlib.crc32(feature.encode()) & _PRIME for feature in features),
+        dtype=np.uint64,
+        count=len(features),
+    )
+    if not len(hashes):
+        return np.full(DEDUPE_PERMUTATIONS, _PRIME, dtype=np.uint32)
+    return ((np.outer(hashes, _A) + _B) % _PRIME).min(axis=0).astype(np.uint32)
+
+
+def recipe_signature(title, ingredient_names, steps):
+    return minhash(recipe_features(title, ingredient_names, steps))
+
+
+def title_signature(title, ingredient_names=(), steps=()):
+    """Signature of the title alone, to compare recipes created without children."""
+    return minhash(title_features(title))
+
+
+# A recipe is indexed under both signatures: a create that only has a title
+# cannot reach the threshold against full recipe signatures, even for the
+# very same title, so it is matched on titles instead.
+SIGNATURES = {"recipe": recipe_signature, "title": title_signature}
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of the recipes behind two signatures."""
+    return float(np.count_nonzero(signature == other)) / DEDUPE_PERMUTATIONS
+
+
+def band_keys(signature):
+    return [
+        (band, signature[band * _ROWS : (band + 1) * _ROWS].tobytes())
+        for band in range(DEDUPE_BANDS)
+    ]
+
+
+@dataclass
+class DuplicateMatch:
+    recipe_id: int
+    slug: str
+    similarity: float
+
+
+class DuplicateIndex:
+    """In-memory LSH index of recipe MinHash signatures.
+
+    Each signature is split in DEDUPE_BANDS bands; recipes whose bands hash
+    alike land in the same bucket (one set of buckets per kind of signature,
+    see SIGNATURES), so finding the probable duplicates of a
+    recipe reads its DEDUPE_BANDS buckets instead of comparing it with the
+    whole catalog. Candidates are then scored on their full signatures. Like
+    the pantry index it is per process, loaded at startup (or lazily on first
+    use) and kept current by the commit hooks below.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        self.loaded = False
+
+    def _reset(self):
+        self._signatures = {kind: {} for kind in SIGNATURES}
+        self._slugs = {}
+        self._versions = {}
+        self._buckets = {kind: {} for kind in SIGNATURES}
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+            self.loaded = False
+
+    def load(self, db: Session):
+        recipes = load_recipe_texts(db)
+        with self._lock:
+            self._reset()
+            for recipe_id, (version, slug, title, names, steps) in recipes.items():
+                self._add(recipe_id, version, slug, title, names, steps)
+            self.loaded = True
+        return len(recipes)
+
+    def ensure_loaded(self, db: Session):
+        if not self.loaded:
+            self.load(db)
+
+    def apply(self, updates):
+        """Apply ``{recipe_id: (version, slug, title, names, steps) or None}``."""
+        with self._lock:
+            if not self.loaded:
+                return
+            for recipe_id, update in updates.items():
+                if update is not None and update[0] < self._versions.get(recipe_id, 0):
+                    continue
+                self._remove(recipe_id)
+                if update is None:
+                    self._versions.pop(recipe_id, None)
+                    continue
+                self._add(recipe_id, *update)
+
+    def _add(self, recipe_id, version, slug, title, names, steps):
+        self._slugs[recipe_id] = slug
+        self._versions[recipe_id] = version
+        for kind, compute in SIGNATURES.items():
+            signature = compute(title, names, steps)
+            self._signatures[kind][recipe_id] = signature
+            for key in band_keys(signature):
+                self._buckets[kind].setdefault(key, set()).add(recipe_id)
+
+    def _remove(self, recipe_id):
+        if self._slugs.pop(recipe_id, None) is None:
+            return
+        for kind in SIGNATURES:
+            buckets = self._buckets[kind]
+            for key in band_keys(self._signatures[kind].pop(recipe_id)):
+                bucket = buckets[key]
+                bucket.discard(recipe_id)
+                if not bucket:
+                    del buckets[key]
+
+    def matches(self, signature, threshold=DEDUPE_THRESHOLD, exclude_slug=None,
+                kind="recipe"):
+        """Recipes at least ``threshold`` similar to ``signature``, best first.
+
+        ``kind`` names the SIGNATURES function ``signature`` was built with.
+        """
+        with self._lock:
+            signatures = self._signatures[kind]
+            candidates = set()
+            for key in band_keys(signature):
+                candidates |= self._buckets[kind].get(key, set())
+            found = [
+                DuplicateMatch(recipe_id, self._slugs[recipe_id], score)
+                for recipe_id in candidates
+                if self._slugs[recipe_id] != exclude_slug
+                and (score := similarity(signature, signatures[recipe_id])) >= threshold
+            ]
+        found.sort(key=lambda match: (-match.similarity, match.recipe_id))
+        return found
+
+    def stats(self):
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "recipes": len(self._slugs),
+                "buckets": sum(len(buckets) for buckets in self._buckets.values()),
+            }
+
+
+duplicate_index = DuplicateIndex()
+
+
+def load_recipe_texts(db: Session, recipe_ids=None):
+    """{recipe_id: (version, slug, title, ingredient names, steps)}.
+
+    Every recipe when ``recipe_ids`` is None, else those of ``recipe_ids``
+    that exist.
+    """
+    recipes = db.query(Recipe.id, Recipe.version, Recipe.slug, Recipe.title)
+    ingredients = db.query(Ingredient.recipe_id, Ingredient.name)
+    steps = db.query(Step.recipe_id, Step.step).order_by(Step.recipe_id, Step.step_number)
+    if recipe_ids is not None:
+        ids = sorted(recipe_ids)
+        recipes = recipes.filter(Recipe.id.in_(ids))
+        ingredients = ingredients.filter(Ingredient.recipe_id.in_(ids))
+        steps = steps.filter(Step.recipe_id.in_(ids))
+
+    texts = {
+        recipe_id: (version, slug, title, [], [])
+        for recipe_id, version, slug, title in recipes
+    }
+    for recipe_id, name in ingredients:
+        if recipe_id in texts:
+            texts[recipe_id][3].append(name)
+    for recipe_id, step in steps:
+        if recipe_id in texts:
+            texts[recipe_id][4].append(step)
+    return texts
+
+
+def find_duplicates(title, ingredient_names=(), steps=(), exclude_slug=None):
+    """DuplicateMatches for a recipe that is being written, best first.
+
+    A recipe without ingredients or steps is compared on titles alone.
+    Nothing is flagged until the index is loaded: single creates do not pay
+    for loading the catalog, bulk imports load it up front.
+    """
+    if not duplicate_index.loaded:
+        return []
+    kind = "recipe" if ingredient_names or steps else "title"
+    signature = SIGNATURES[kind](title, ingredient_names, steps)
+    return duplicate_index.matches(signature, exclude_slug=exclude_slug, kind=kind)
+
+
+@dataclass
+class DuplicatePair:
+    slug: str
+    duplicate_of: str
+    similarity: float
+
+
+def _signature_batch(texts):
+    return [
+        (slug, recipe_signature(title, names, steps))
+        for slug, title, names, steps in texts
+    ]
+
+
+def duplicate_report(session_factory, threshold=DEDUPE_THRESHOLD,
+                     batch_size=DEDUPE_BATCH_SIZE, workers=4):
+    """Every pair of probable duplicates in the catalog, most similar first.
+
+    Recipes are read ``batch_size`` at a time on id ranges and their
+    signatures computed in ``workers`` processes (in this one if 1); candidate pairs are those
+    sharing an LSH bucket, so the scan stays far from quadratic unless the
+    catalog really is made of duplicates. In each pair ``duplicate_of`` is
+    the older recipe.
+    """
+    with session_factory() as db:
+        ids = [row.id for row in db.query(Recipe.id).order_by(Recipe.id)]
+
+    def batches():
+        for i in range(0, len(ids), batch_size):
+            with session_factory() as db:
+                texts = load_recipe_texts(db, ids[i : i + batch_size])
+            yield [
+                (slug, title, names, steps)
+                for _, (_, slug, title, names, steps) in sorted(texts.items())
+            ]
+
+    slugs, signatures = [], []
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            computed = list(pool.map(_signature_batch, batches()))
+    else:
+        computed = map(_signature_batch, batches())
+    for batch in computed:
+        for slug, signature in batch:
+            slugs.append(slug)
+            signatures.append(signature)
+    if not signatures:
+        return []
+    signatures = np.vstack(signatures)
+
+    buckets = {}
+    for position, signature in enumerate(signatures):
+        for key in band_keys(signature):
+            buckets.setdefault(key, []).append(position)
+    candidates = {
+        pair
+        for bucket in buckets.values()
+        if len(bucket) > 1
+        for pair in itertools.combinations(bucket, 2)
+    }
+    if not candidates:
+        return []
+
+    pairs = np.array(sorted(candidates))
+    scores = (
+        np.count_nonzero(signatures[pairs[:, 0]] == signatures[pairs[:, 1]], axis=1)
+        / DEDUPE_PERMUTATIONS
+    )
+    keep = np.nonzero(scores >= threshold)[0]
+    report = [
+        DuplicatePair(slugs[pairs[i, 1]], slugs[pairs[i, 0]], float(scores[i]))
+        for i in keep
+    ]
+    report.sort(key=lambda pair: (-pair.similarity, pair.duplicate_of, pair.slug))
+    return report
+
+
+@on_commit_update(duplicate_index)
+def _dedupe_updates(session, recipe_ids):
+    updates = dict.fromkeys(recipe_ids)
+    updates.update(load_recipe_texts(session, recipe_ids))
+    return updates
@@ -0,0 +1,12 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(db: Session, model):
+    """INSERT for the session's dialect, exposing ON CONFLICT clauses."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"ON CONFLICT is not supported on {dialect}")
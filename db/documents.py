@@ -0,0 +1,198 @@
+import json
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import delete, func
+from sqlalchemy.orm import Session
+
+from db.db import SessionLocal
+from db.dialects import dialect_insert
+from db.events import on_after_commit, on_before_commit
+from db.loaders import RECIPE_SORT_KEYS, VALIDATOR_COLUMNS, recipe_graph_query
+from db.models import Recipe, RecipeDocument
+from db.pagination import PageParams, keyset_page
+from db.schemas import RecipeReturn
+
+
+logger = logging.getLogger(__name__)
+
+# "off": documents are neither maintained nor read.
+# "transactional": documents are rewritten inside the transaction that
+#     changed the recipe, so they are never stale.
+# "background": documents are rewritten by a worker thread after commit;
+#     reads fall back to the live graph until the document caught up.
+RECIPE_DOCUMENTS_MODE = os.getenv("RECIPE_DOCUMENTS_MODE", "off")
+DOCUMENT_BATCH_SIZE = int(os.getenv("DOCUMENT_BATCH_SIZE", "500"))
+
+
+def documents_enabled() -> bool:
+    return RECIPE_DOCUMENTS_MODE != "off"
+
+
+def _document_query(db: Session, *columns):
+    return db.query(
+        Recipe.id,
+        *VALIDATOR_COLUMNS,
+        *columns,
+        RecipeDocument.body,
+        RecipeDocument.version.label("document_version"),
+    ).outerjoin(RecipeDocument, RecipeDocument.recipe_id == Recipe.id)
+
+
+def is_fresh(row) -> bool:
+    """Whether the row's document exists and matches the recipe's version.
+
+    Documents lag behind in background mode; stale rows are rendered from the
+    live graph instead.
+    """
+    return row.document_version == row.version
+
+
+def fetch_document(db: Session, lookup):
+    """Return the recipe's validators and stored document in one query.
+
+    Returns None when the recipe does not exist.
+    """
+    return _document_query(db).filter(lookup).first()
+
+
+def fetch_document_page(db: Session, page: PageParams, sort: str):
+    """Return (page JSON, validator rows page) for a GET /recipe page.
+
+    The response body is stitched together from the stored documents, so no
+    recipe is loaded or validated. Returns (None, page) if any document on
+    the page is missing or stale.
+    """
+    sort_columns = RECIPE_SORT_KEYS.get(sort.lstrip("-"), ())
+    query = _document_query(db, *sort_columns)
+    rows = keyset_page(query, RECIPE_SORT_KEYS, page, sort)
+    if not all(is_fresh(row) for row in rows["items"]):
+        return None, rows
+
+    body = '{"items":[%s],"next_cursor":%s}' % (
+        ",".join(row.body for row in rows["items"]),
+        json.dumps(rows["next_cursor"]),
+    )
+    return body, rows
+
+
+def render_documents(db: Session, recipe_ids):
+    """Render RecipeReturn JSON for ``recipe_ids``; returns upsert rows.
+
+    The JSON is identical to what the API serializes for the same recipe, so
+    it can be sent as is.
+    """
+    recipes = (
+        recipe_graph_query(db)
+        .populate_existing()
+        .filter(Recipe.id.in_(sorted(recipe_ids)))
+        .all()
+    )
+    return [
+        {
+            "recipe_id": recipe.id,
+            "version": recipe.version,
+            "body": RecipeReturn.model_validate(recipe).model_dump_json(),
+        }
+        for recipe in recipes
+    ]
+
+
+def refresh_documents(db: Session, recipe_ids):
+    """Rewrite the documents of ``recipe_ids`` and drop those of deleted recipes.
+
+    An existing document is only replaced by a newer version, so a slow
+    background refresh never overwrites a fresher transactional one.
+    """
+    rows = render_documents(db, recipe_ids)
+    rendered = {row["recipe_id"] for row in rows}
+    if rows:
+        statement = dialect_insert(db, RecipeDocument).values(rows)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[RecipeDocument.recipe_id],
+                set_={
+                    "version": statement.excluded.version,
+                    "body": statement.excluded.body,
+                    "updated_at": func.now(),
+                },
+                where=RecipeDocument.version < statement.excluded.version,
+            )
+        )
+
+    deleted = set(recipe_ids) - rendered
+    if deleted:
+        db.execute(
+            delete(RecipeDocument).where(RecipeDocument.recipe_id.in_(sorted(deleted)))
+        )
+    return len(rows)
+
+
+def rebuild_documents(session_factory, batch_size=DOCUMENT_BATCH_SIZE, workers=4):
+    """Regenerate every document, ``batch_size`` recipes per transaction.
+
+    Batches are split on recipe id ranges and rendered in parallel, each worker
+    using its own session. Returns the number of documents written.
+    """
+    with session_factory() as db:
+        ids = [row.id for row in db.query(Recipe.id).order_by(Recipe.id)]
+
+    def _rebuild(batch):
+        with session_factory() as db:
+            count = refresh_documents(db, batch)
+            db.commit()
+            return count
+
+    batches = [ids[i : i + batch_size] for i in range(0, len(ids), batch_size)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(_rebuild, batches))
+
+
+class DocumentRebuilder:
+    """Worker thread refreshing documents after commit in "background" mode."""
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+        self.queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, recipe_ids):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="recipe-documents", daemon=True
+                )
+                self._thread.start()
+        self.queue.put(set(recipe_ids))
+
+    def _run(self):
+        while True:
+            recipe_ids = self.queue.get()
+            # Coalesce everything queued meanwhile into one refresh.
+            while not self.queue.empty():
+                recipe_ids |= self.queue.get_nowait()
+            try:
+                with self.session_factory() as db:
+                    refresh_documents(db, recipe_ids)
+                    db.commit()
+            except Exception:
+                logger.exception("Failed to refresh recipe documents %s", recipe_ids)
+
+
+rebuilder = DocumentRebuilder(SessionLocal)
+
+
+@on_before_commit
+def _refresh_in_transaction(session, recipe_ids):
+    if RECIPE_DOCUMENTS_MODE == "transactional":
+        refresh_documents(session, recipe_ids)
+
+
+@on_after_commit
+def _refresh_in_background(recipe_ids):
+    if RECIPE_DOCUMENTS_MODE == "background":
+        rebuilder.submit(recipe_ids)
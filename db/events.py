@@ -0,0 +1,141 @@
+import logging
+
+from sqlalchemy import event, func, update
+from sqlalchemy.orm import Session
+
+from db.models import Recipe, Ingredient, RecipeCategories, Step
+
+
+logger = logging.getLogger(__name__)
+
+CHANGED_RECIPES = "changed_recipe_ids"
+CREATED_RECIPES = "created_recipe_ids"
+INDEX_UPDATES = "index_updates"
+CHILD_MODELS = (Step, Ingredient, RecipeCategories)
+
+_before_commit_hooks = []
+_after_commit_hooks = []
+_index_hooks = []
+
+
+def on_before_commit(fn):
+    """Register ``fn(session, recipe_ids)`` to run inside the committing
+    transaction, after the changed recipes' versions were bumped."""
+    _before_commit_hooks.append(fn)
+    return fn
+
+
+def on_after_commit(fn):
+    """Register ``fn(recipe_ids)`` to run once the transaction committed."""
+    _after_commit_hooks.append(fn)
+    return fn
+
+
+def on_commit_update(index):
+    """Register ``fn(session, recipe_ids)`` keeping in-memory ``index`` current.
+
+    ``index`` is a per-process index (pantry, suggestions, duplicates) with
+    ``loaded``, ``load(db)``, ``clear()`` and ``apply(updates)``. While it is
+    loaded, ``fn`` reads the changed recipes inside the committing
+    transaction and returns their updates; they are applied once the
+    transaction commits and dropped if it rolls back.
+    """
+
+    def register(fn):
+        _index_hooks.append((index, fn))
+        return fn
+
+    return register
+
+
+def rebuild_index(index, session_factory):
+    """(Re)load ``index`` at startup; on failure it loads lazily later."""
+    index.clear()
+    try:
+        with session_factory() as db:
+            return index.load(db)
+    except Exception:
+        logger.exception("Failed to load %s", type(index).__name__)
+        return None
+
+
+def mark_recipes_changed(session: Session, recipe_ids):
+    """Record recipes touched by a write the ORM flush does not see.
+
+    ORM writes are picked up automatically in after_flush; Core statements
+    (bulk inserts, upserts) must report the recipes they touched here so the
+    version bump and the commit hooks still happen.
+    """
+    session.info.setdefault(CHANGED_RECIPES, set()).update(recipe_ids)
+
+
+def mark_recipes_created(session: Session, recipe_ids):
+    """Record recipes inserted with a Core statement in this transaction.
+
+    They run the commit hooks like any changed recipe but keep version 1.
+    """
+    mark_recipes_changed(session, recipe_ids)
+    session.info.setdefault(CREATED_RECIPES, set()).update(recipe_ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_recipes(session, flush_context):
+    changed = set()
+    created = set()
+    for obj in session.new:
+        if isinstance(obj, Recipe):
+            created.add(obj.id)
+        elif isinstance(obj, CHILD_MODELS):
+            changed.add(obj.recipe_id)
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Recipe):
+            changed.add(obj.id)
+        elif isinstance(obj, CHILD_MODELS):
+            changed.add(obj.recipe_id)
+
+    mark_recipes_changed(session, changed | created)
+    session.info.setdefault(CREATED_RECIPES, set()).update(created)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_recipe_versions(session):
+    """Bump version and updated_at of every recipe changed in the transaction.
+
+    Recipes created in the same transaction already start at version 1.
+    """
+    session.flush()
+    changed = session.info.get(CHANGED_RECIPES, set())
+    bumped = changed - session.info.get(CREATED_RECIPES, set())
+    if bumped:
+        session.execute(
+            update(Recipe.__table__)
+            .where(Recipe.__table__.c.id.in_(sorted(bumped)))
+            .values(version=Recipe.__table__.c.version + 1, updated_at=func.now())
+        )
+
+    if changed:
+        for hook in _before_commit_hooks:
+            hook(session, changed)
+        pending = session.info.setdefault(INDEX_UPDATES, {})
+        for index, collect in _index_hooks:
+            if index.loaded:
+                pending.setdefault(index, {}).update(collect(session, changed))
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_changed_recipes(session):
+    changed = session.info.pop(CHANGED_RECIPES, None)
+    session.info.pop(CREATED_RECIPES, None)
+    for index, updates in session.info.pop(INDEX_UPDATES, {}).items():
+        if updates:
+            index.apply(updates)
+    if changed:
+        for hook in _after_commit_hooks:
+            hook(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_changed_recipes(session):
+    session.info.pop(CHANGED_RECIPES, None)
+    session.info.pop(CREATED_RECIPES, None)
+    session.info.pop(INDEX_UPDATES, None)
@@ -0,0 +1,52 @@
+import os
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from db.loaders import recipe_graph_select
+from db.models import Recipe
+from db.schemas import RecipeReturn
+
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+
+
+def iter_recipes_ndjson(db: Session, batch_size: int = EXPORT_BATCH_SIZE):
+    """Yield the whole catalog as NDJSON, one chunk per batch of recipes.
+
+    yield_per streams rows from a server-side cursor (stream_results on
+    Postgres) and the children of each batch are fetched with one selectin
+    query per relationship. The session is cleared after every batch so the
+    identity map, and with it worker memory, never holds more than
+    ``batch_size`` recipe graphs (expunging a recipe cascades to its children).
+    """
+    statement = recipe_graph_select().order_by(Recipe.id)
+    result = db.execute(statement.execution_options(yield_per=batch_size))
+
+    for recipes in result.scalars().partitions():
+        chunk = "".join(
+            RecipeReturn.model_validate(recipe).model_dump_json() + "\n"
+            for recipe in recipes
+        )
+        for recipe in recipes:
+            db.expunge(recipe)
+        yield chunk
+
+
+async def aiter_recipes_ndjson(db: AsyncSession, batch_size: int = EXPORT_BATCH_SIZE):
+    """Async counterpart of iter_recipes_ndjson for the AsyncSession stack.
+
+    The selectin loads of each batch run inside the greenlet that drives the
+    streamed result, so the chunks are rendered while iterating the stream.
+    """
+    statement = recipe_graph_select().order_by(Recipe.id)
+    result = await db.stream(statement.execution_options(yield_per=batch_size))
+
+    async for recipes in result.scalars().partitions():
+        chunk = "".join(
+            RecipeReturn.model_validate(recipe).model_dump_json() + "\n"
+            for recipe in recipes
+        )
+        for recipe in recipes:
+            db.expunge(recipe)
+        yield chunk
@@ -0,0 +1,71 @@
+from fastapi import HTTPException
+from sqlalchemy import func, intersect, select
+from sqlalchemy.orm import Session
+
+from db.cache import facet_cache
+from db.events import on_after_commit
+from db.models import Category, RecipeCategories
+from db.writes import resolve_category_ids
+
+
+CATEGORY_MATCHES = ("all", "any")
+
+
+def category_filter(db: Session, names, match="all"):
+    """SELECT of the ids of recipes in all (or any) of the ``names`` categories.
+
+    Served from ix_recipe_categories_category_recipe: one index range per
+    category, whatever the size of recipe_categories. Returns (select, cache
+    key); 400 for an unknown category or match mode.
+    """
+    if match not in CATEGORY_MATCHES:
+        raise HTTPException(status_code=400, detail="Invalid category_match")
+    category_ids = sorted(resolve_category_ids(db, names))
+    if match == "any" or len(category_ids) == 1:
+        matching = select(RecipeCategories.recipe_id).where(
+            RecipeCategories.category_id.in_(category_ids)
+        )
+    else:
+        # An INTERSECT of per-category ranges; a GROUP BY recipe_id .. HAVING
+        # count(*) = n gets planned as a scan of the whole recipe_id index.
+        matching = intersect(
+            *(
+                select(RecipeCategories.recipe_id).where(
+                    RecipeCategories.category_id == category_id
+                )
+                for category_id in category_ids
+            )
+        )
+    return matching, (match, tuple(category_ids))
+
+
+def facet_counts(db: Session, matching=None, key=()):
+    """[{id, name, count}] for every category, ordered by name.
+
+    ``count`` is the number of recipes selected by ``matching`` (all recipes
+    if None) in the category. Results are cached under ``key``.
+    """
+    counts = facet_cache.get(key)
+    if counts is not None:
+        return counts
+
+    per_category = select(
+        RecipeCategories.category_id, func.count().label("count")
+    ).group_by(RecipeCategories.category_id)
+    if matching is not None:
+        per_category = per_category.where(RecipeCategories.recipe_id.in_(matching))
+    per_category = per_category.subquery()
+
+    rows = db.execute(
+        select(Category.id, Category.name, func.coalesce(per_category.c.count, 0))
+        .outerjoin(per_category, per_category.c.category_id == Category.id)
+        .order_by(Category.name)
+    )
+    counts = [{"id": id, "name": name, "count": count} for id, name, count in rows]
+    facet_cache.set(key, counts)
+    return counts
+
+
+@on_after_commit
+def _clear_facet_counts(recipe_ids):
+    facet_cache.clear()
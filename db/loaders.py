@@ -0,0 +1,120 @@
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session, selectinload
+
+from db.cache import slug_cache
+from db.models import Recipe, Ingredient, RecipeCategories, Step, Category
+from db.pagination import PageParams, keyset_position, page_of
+
+
+# Every recipe-returning query goes through these options so that serializing a
+# RecipeReturn never falls back to lazy loading. selectinload issues one
+# "WHERE recipe_id IN (...)" query per relationship, which keeps the cost of a
+# full recipe graph at 1 + 3 queries regardless of how many recipes are loaded
+# (joinedload would multiply the parent rows by every child collection).
+RECIPE_GRAPH_OPTIONS = (
+    selectinload(Recipe.steps),
+    selectinload(Recipe.ingredients),
+    selectinload(Recipe.categories),
+)
+
+
+def recipe_graph_query(db: Session):
+    return db.query(Recipe).options(*RECIPE_GRAPH_OPTIONS)
+
+
+def recipe_graph_select():
+    return select(Recipe).options(*RECIPE_GRAPH_OPTIONS)
+
+
+# Sort keys accepted by the paginated list endpoints. Each ends with the primary
+# key so keyset positions are unique; the leading columns are backed by an index
+# (primary key, uq_recipe_title, ix_recipes_created_at_id, uq_category).
+RECIPE_SORT_KEYS = {
+    "id": (Recipe.id,),
+    "created_at": (Recipe.created_at, Recipe.id),
+    "title": (Recipe.title, Recipe.id),
+}
+CATEGORY_SORT_KEYS = {
+    "id": (Category.id,),
+    "name": (Category.name, Category.id),
+}
+STEP_SORT_KEYS = {"step_number": (Step.step_number, Step.id)}
+INGREDIENT_SORT_KEYS = {"id": (Ingredient.id,)}
+RECIPE_CATEGORY_SORT_KEYS = {"id": (RecipeCategories.id,)}
+
+
+# Columns every recipe read needs for its ETag / Last-Modified validators.
+VALIDATOR_COLUMNS = (Recipe.version, Recipe.updated_at)
+
+
+def recipe_slug_lookup(recipe_slug: str):
+    """Filter clause selecting the recipe with ``recipe_slug``.
+
+    Uses the primary key when the slug cache knows the id and returns None
+    when the slug is cached as missing.
+    """
+    found, recipe_id = slug_cache.get(recipe_slug)
+    if not found:
+        return Recipe.slug == recipe_slug
+    if recipe_id is None:
+        return None
+    return Recipe.id == recipe_id
+
+
+def fetch_recipe_validators(db: Session, recipe_slug: str):
+    """Return (id, version, updated_at) of a recipe, or None if it is missing."""
+    lookup = recipe_slug_lookup(recipe_slug)
+    if lookup is None:
+        return None
+
+    row = db.query(Recipe.id, *VALIDATOR_COLUMNS).filter(lookup).first()
+    slug_cache.set(recipe_slug, row.id if row else None)
+    return row
+
+
+def fetch_children_by_recipe_slug(
+    db: Session, recipe_slug: str, child, sort_keys: dict, page: PageParams, sort: str
+):
+    """Fetch one page of a recipe's children in a single round trip.
+
+    The recipe is outer joined to its children, with the keyset condition in
+    the ON clause so it never filters out the recipe row itself: no rows means
+    the recipe does not exist, a single row with a NULL child means it has no
+    (more) children. Returns ``(recipe, page)`` where ``recipe`` holds the
+    recipe's (id, version, updated_at), or ``(None, None)`` if it is missing.
+    """
+    lookup = recipe_slug_lookup(recipe_slug)
+    if lookup is None:
+        return None, None
+
+    columns, order_by, condition = keyset_position(sort_keys, page, sort)
+    on_clause = child.recipe_id == Recipe.id
+    if condition is not None:
+        on_clause = and_(on_clause, condition)
+
+    rows = (
+        db.query(Recipe.id, *VALIDATOR_COLUMNS, child)
+        .outerjoin(child, on_clause)
+        .filter(lookup)
+        .order_by(*order_by)
+        .limit(page.limit + 1)
+        .all()
+    )
+    if not rows:
+        slug_cache.set_missing(recipe_slug)
+        return None, None
+
+    recipe = rows[0][:-1]
+    slug_cache.set(recipe_slug, recipe[0])
+    children = [row[-1] for row in rows if row[-1] is not None]
+    return recipe, page_of(children, columns, page, sort)
+
+
+def resolve_recipe_id(db: Session, recipe_slug: str):
+    """Return the id of the recipe with ``recipe_slug`` (None if unknown)."""
+    found, recipe_id = slug_cache.get(recipe_slug)
+    if not found:
+        row = db.query(Recipe.id).filter(Recipe.slug == recipe_slug).first()
+        recipe_id = row.id if row else None
+        slug_cache.set(recipe_slug, recipe_id)
+    return recipe_id
@@ -1,10 +1,13 @@
 from sqlalchemy import (
     Column,
+    Float,
     Integer,
     String,
+    Text,
     ForeignKey,
     DateTime,
     CheckConstraint,
+    Index,
     UniqueConstraint,
     func,
     text,
@@ -17,7 +20,7 @@ from db.db import Base
 class Step(Base):
     __tablename__ = "steps"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     step_number = Column(Integer, nullable=False, unique=False, index=False)
     step = Column(String(200), nullable=False)
     recipe_id = Column(Integer, ForeignKey("recipes.id"), nullable=False)
@@ -25,6 +28,7 @@ class Step(Base):
     __table_args__ = (
         CheckConstraint("LENGTH(step) > 0", name="step_step_length_check"),
         UniqueConstraint("step_number", "recipe_id", name="uq_step_number_recipe"),
+        Index("ix_steps_recipe_id_step_number", "recipe_id", "step_number"),
     )
 
     def __repr__(self):
@@ -38,10 +42,14 @@ class Step(Base):
 class Ingredient(Base):
     __tablename__ = "ingredients"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(20), nullable=False)
     amount = Column(String(5), nullable=True)
     measurement = Column(String(15), nullable=True)
+    # amount / measurement parsed by db.quantities, in the canonical unit.
+    quantity = Column(Float, nullable=True)
+    quantity_max = Column(Float, nullable=True)
+    unit = Column(String(15), nullable=True)
     recipe_id = Column(Integer, ForeignKey("recipes.id"), nullable=False)
 
     __table_args__ = (
@@ -50,6 +58,8 @@ class Ingredient(Base):
         CheckConstraint(
             "LENGTH(measurement) > 0", name="ingredient_measurement_length_check"
         ),
+        UniqueConstraint("name", "recipe_id", name="uq_ingredient_name_recipe"),
+        Index("ix_ingredients_recipe_id_id", "recipe_id", "id"),
     )
 
     def __repr__(self):
@@ -63,7 +73,7 @@ class Ingredient(Base):
 
 class Category(Base):
     __tablename__ = "category"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(80), nullable=False)
 
     __table_args__ = (
@@ -77,12 +87,13 @@ class Category(Base):
 
 class RecipeCategories(Base):
     __tablename__ = "recipe_categories"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     category_id = Column(Integer, ForeignKey("category.id"), nullable=False)
     recipe_id = Column(Integer, ForeignKey("recipes.id"), nullable=False)
 
     __table_args__ = (
         UniqueConstraint("recipe_id", "category_id", name="uq_recipe_category_id"),
+        Index("ix_recipe_categories_category_recipe", "category_id", "recipe_id"),
     )
 
     def __repr__(self):
@@ -91,10 +102,13 @@ class RecipeCategories(Base):
 
 class Recipe(Base):
     __tablename__ = "recipes"
-    id = Column(Integer, primary_key=True, index=True, nullable=False)
+    id = Column(Integer, primary_key=True, nullable=False)
     title = Column(String(80), nullable=False, unique=True)
     slug = Column(String(100), nullable=False)
     description = Column(String(200))
+    # Number of servings the ingredient amounts are for; ?servings= scales
+    # from it.
+    servings = Column(Integer, nullable=True)
     steps = relationship(
         "Step",
         primaryjoin="Recipe.id == Step.recipe_id",
@@ -120,15 +134,73 @@ class Recipe(Base):
         onupdate=func.now(),
         nullable=False,
     )
+    # Bumped by db.events whenever the recipe or one of its children changes;
+    # drives the ETag of every response derived from the recipe.
+    version = Column(Integer, server_default=text("1"), nullable=False)
 
     __table_args__ = (
         CheckConstraint("LENGTH(title) > 0", name="recipe_title_length_check"),
         CheckConstraint(
             "LENGTH(description) > 0", name="recipe_description_length_check"
         ),
+        CheckConstraint("servings > 0", name="recipe_servings_check"),
         UniqueConstraint("title", name="uq_recipe_title"),
         UniqueConstraint("slug", name="uq_recipe_slug"),
+        Index("ix_recipes_created_at_id", "created_at", "id"),
     )
 
     def __repr__(self):
         return "Recipe(title=%s, description=%s)" % (self.title, self.description)
+
+
+class RecipeDocument(Base):
+    """Fully rendered RecipeReturn JSON of a recipe (see db.documents)."""
+
+    __tablename__ = "recipe_documents"
+    recipe_id = Column(
+        Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True
+    )
+    version = Column(Integer, nullable=False)
+    body = Column(Text, nullable=False)
+    updated_at = Column(
+        DateTime,
+        server_default=text("CURRENT_TIMESTAMP"),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+    def __repr__(self):
+        return "RecipeDocument(recipe_id=%s, version=%s)" % (
+            self.recipe_id,
+            self.version,
+        )
+
+
+class RecipeNeighbor(Base):
+    """One of a recipe's most similar recipes (see db.similar)."""
+
+    __tablename__ = "recipe_neighbors"
+    recipe_id = Column(
+        Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True
+    )
+    rank = Column(Integer, primary_key=True)
+    neighbor_id = Column(
+        Integer, ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False
+    )
+    score = Column(Float, nullable=False)
+    # Version of the recipe the list was computed for; the list is stale
+    # once the recipe moved past it.
+    version = Column(Integer, nullable=False)
+
+    __table_args__ = (Index("ix_recipe_neighbors_neighbor_id", "neighbor_id"),)
+
+    def __repr__(self):
+        return "RecipeNeighbor(recipe_id=%s, rank=%s, neighbor_id=%s)" % (
+            self.recipe_id,
+            self.rank,
+            self.neighbor_id,
+        )
+
+
+import db.events  # noqa: E402,F401  (registers the session listeners)
+import db.quantities  # noqa: E402,F401  (parses ingredient amounts on ORM writes)
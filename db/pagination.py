@@ -0,0 +1,89 @@
+import base64
+import binascii
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, Query
+from sqlalchemy import DateTime, tuple_
+
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "100"))
+
+
+@dataclass
+class PageParams:
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor")
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+
+
+def encode_cursor(sort: str, values) -> str:
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps([sort, values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, sort: str, columns) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, values = json.loads(base64.urlsafe_b64decode(padded))
+        if cursor_sort != sort or len(values) != len(columns):
+            raise ValueError("cursor does not match sort order")
+        return [
+            datetime.fromisoformat(v) if isinstance(c.type, DateTime) else v
+            for c, v in zip(columns, values)
+        ]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_position(sort_keys: dict, page: PageParams, sort: str = "id"):
+    """Resolve ``sort`` into (columns, ORDER BY clauses, condition after cursor).
+
+    ``sort_keys`` maps the public sort names to a tuple of columns whose last
+    element must be unique (the primary key), so every row has a distinct
+    position. A leading "-" on ``sort`` reverses the order. The condition is
+    None on the first page.
+    """
+    descending = sort.startswith("-")
+    columns = sort_keys.get(sort.lstrip("-"))
+    if columns is None:
+        raise HTTPException(status_code=400, detail="Invalid sort key")
+
+    condition = None
+    if page.cursor is not None:
+        values = decode_cursor(page.cursor, sort, columns)
+        position = tuple_(*columns)
+        after = tuple_(*values)
+        condition = position < after if descending else position > after
+
+    order_by = [c.desc() if descending else c.asc() for c in columns]
+    return columns, order_by, condition
+
+
+def page_of(rows, columns, page: PageParams, sort: str = "id"):
+    """Trim the ``limit + 1`` rows fetched for a page and build next_cursor."""
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, [getattr(last, c.key) for c in columns])
+
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+def keyset_page(query, sort_keys: dict, page: PageParams, sort: str = "id"):
+    """Return one page of ``query`` ordered by an indexed sort key.
+
+    Instead of an OFFSET the next page starts strictly after the last row
+    returned, so deep pages cost the same index seek as the first one.
+    """
+    columns, order_by, condition = keyset_position(sort_keys, page, sort)
+    if condition is not None:
+        query = query.filter(condition)
+
+    rows = query.order_by(*order_by).limit(page.limit + 1).all()
+    return page_of(rows, columns, page, sort)
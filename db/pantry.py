@@ -0,0 +1,205 @@
+import heapq
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from db.events import on_commit_update
+from db.loaders import recipe_graph_query
+from db.models import Recipe, Ingredient
+
+
+def normalize_ingredient(name: str) -> str:
+    """Key of an ingredient name: lower case, single spaces, naive singular.
+
+    "Tomatoes", "tomato" and " tomato " share a key; recipe ingredients and
+    pantry items are normalized the same way, so a wrong singular only has to
+    be consistent.
+    """
+    name = re.sub(r"\s+", " ", name.strip().lower())
+    if name.endswith("ies") and len(name) > 4:
+        return name[:-3] + "y"
+    if name.endswith("oes") and len(name) > 4:
+        return name[:-2]
+    if name.endswith("s") and not name.endswith("ss") and len(name) > 3:
+        return name[:-1]
+    return name
+
+
+@dataclass
+class PantryHit:
+    recipe_id: int
+    used: int
+    missing: int
+
+
+@dataclass
+class PantryResult:
+    recipe: Recipe
+    used: int
+    missing: int
+    missing_ingredients: list
+
+
+class PantryIndex:
+    """In-memory inverted index of ingredient key -> recipe ids.
+
+    Posting lists are sorted ``array('l')`` of recipe ids; alongside them the
+    index keeps each recipe's set of keys (to compute the missing count and
+    to remove stale postings) and the recipe version it was built from. It
+    is per process: loaded from the database at startup (or lazily on first
+    use), then kept current by the commit hooks at the bottom of this module.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}
+        self._recipes = {}
+        self._versions = {}
+        self.loaded = False
+
+    def clear(self):
+        with self._lock:
+            self._postings.clear()
+            self._recipes.clear()
+            self._versions.clear()
+            self.loaded = False
+
+    def load(self, db: Session):
+        """Replace the index with the ingredients currently in ``db``."""
+        rows = db.query(Recipe.id, Recipe.version, Ingredient.name).outerjoin(
+            Ingredient, Ingredient.recipe_id == Recipe.id
+        )
+        keys, versions = {}, {}
+        for recipe_id, version, name in rows:
+            versions[recipe_id] = version
+            recipe_keys = keys.setdefault(recipe_id, set())
+            if name is not None:
+                recipe_keys.add(normalize_ingredient(name))
+
+        postings = {}
+        for recipe_id in sorted(keys):
+            for key in keys[recipe_id]:
+                postings.setdefault(key, array("l")).append(recipe_id)
+
+        with self._lock:
+            self._postings = postings
+            self._recipes = {recipe_id: frozenset(k) for recipe_id, k in keys.items()}
+            self._versions = versions
+            self.loaded = True
+        return len(keys)
+
+    def ensure_loaded(self, db: Session):
+        if not self.loaded:
+            self.load(db)
+
+    def apply(self, updates):
+        """Apply ``{recipe_id: (version, names) or None}``; None deletes.
+
+        Updates older than the indexed version of a recipe are ignored, so
+        transactions committing out of order cannot roll the index back.
+        """
+        with self._lock:
+            if not self.loaded:
+                return
+            for recipe_id, update in updates.items():
+                if update is None:
+                    self._remove(recipe_id)
+                    self._versions.pop(recipe_id, None)
+                    continue
+                version, names = update
+                if version < self._versions.get(recipe_id, 0):
+                    continue
+                self._remove(recipe_id)
+                keys = frozenset(normalize_ingredient(name) for name in names)
+                for key in keys:
+                    posting = self._postings.setdefault(key, array("l"))
+                    posting.insert(bisect_left(posting, recipe_id), recipe_id)
+                self._recipes[recipe_id] = keys
+                self._versions[recipe_id] = version
+
+    def _remove(self, recipe_id):
+        for key in self._recipes.pop(recipe_id, ()):
+            posting = self._postings[key]
+            del posting[bisect_left(posting, recipe_id)]
+            if not posting:
+                del self._postings[key]
+
+    def search(self, names, limit, max_missing: Optional[int] = None):
+        """Top ``limit`` recipes using the most of ``names``.
+
+        Ties go to the recipe missing the fewest ingredients, then the oldest
+        recipe. Recipes using none of ``names`` are never returned.
+        """
+        keys = {normalize_ingredient(name) for name in names}
+        with self._lock:
+            used = Counter()
+            for key in keys:
+                used.update(self._postings.get(key, ()))
+            hits = (
+                PantryHit(recipe_id, count, len(self._recipes[recipe_id]) - count)
+                for recipe_id, count in used.items()
+            )
+            if max_missing is not None:
+                hits = (hit for hit in hits if hit.missing <= max_missing)
+            return heapq.nsmallest(
+                limit, hits, key=lambda hit: (-hit.used, hit.missing, hit.recipe_id)
+            )
+
+    def stats(self):
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "recipes": len(self._recipes),
+                "ingredients": len(self._postings),
+                "postings": sum(len(posting) for posting in self._postings.values()),
+            }
+
+
+pantry_index = PantryIndex()
+
+
+def find_recipes_for_pantry(db: Session, names, limit, max_missing=None):
+    """PantryResults for the best matches of ``names``, best first."""
+    pantry_index.ensure_loaded(db)
+    hits = pantry_index.search(names, limit, max_missing)
+    recipes = recipe_graph_query(db).filter(
+        Recipe.id.in_([hit.recipe_id for hit in hits])
+    )
+    by_id = {recipe.id: recipe for recipe in recipes}
+    keys = {normalize_ingredient(name) for name in names}
+    return [
+        PantryResult(
+            recipe=by_id[hit.recipe_id],
+            used=hit.used,
+            missing=hit.missing,
+            missing_ingredients=[
+                ingredient.name
+                for ingredient in by_id[hit.recipe_id].ingredients
+                if normalize_ingredient(ingredient.name) not in keys
+            ],
+        )
+        for hit in hits
+        if hit.recipe_id in by_id
+    ]
+
+
+@on_commit_update(pantry_index)
+def _pantry_updates(session, recipe_ids):
+    rows = (
+        session.query(Recipe.id, Recipe.version, Ingredient.name)
+        .outerjoin(Ingredient, Ingredient.recipe_id == Recipe.id)
+        .filter(Recipe.id.in_(sorted(recipe_ids)))
+    )
+    updates = dict.fromkeys(recipe_ids)
+    for recipe_id, version, name in rows:
+        if updates[recipe_id] is None:
+            updates[recipe_id] = (version, [])
+        if name is not None:
+            updates[recipe_id][1].append(name)
+    return updates
@@ -0,0 +1,126 @@
+import bisect
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+# Upper bounds, in milliseconds, of the latency histogram buckets.
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class Histogram:
+    """Latency histogram with fixed millisecond buckets (counts per bucket)."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds):
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def snapshot(self):
+        labels = [f"le_{bound}ms" for bound in self.bounds] + ["inf"]
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "max_ms": self.max_ms,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class PoolStats:
+    """Counters and latency histograms of an InstrumentedQueuePool.
+
+    ``wait`` is the time spent acquiring a connection (including waiting for
+    one to be checked in), ``hold`` the time a connection stayed checked out.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait = Histogram()
+            self.hold = Histogram()
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            self.wait.observe(seconds)
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+
+    def record_hold(self, seconds):
+        with self._lock:
+            self.hold.observe(seconds)
+
+    def snapshot(self, pool):
+        """Live gauges of ``pool`` plus the counters collected so far."""
+        with self._lock:
+            return {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait": self.wait.snapshot(),
+                "hold": self.hold.snapshot(),
+            }
+
+
+pool_stats = PoolStats()
+# Stats of the async engine (DATABASE_MODE=async).
+async_pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool timing every connection checkout into ``stats``."""
+
+    stats = pool_stats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except TimeoutError:
+            self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        # The checkin listener only gets the record, not the pool.
+        connection.info["pool_stats"] = self.stats
+        return connection
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """InstrumentedQueuePool for asyncio engines, into ``async_pool_stats``."""
+
+    stats = async_pool_stats
+
+
+@event.listens_for(InstrumentedQueuePool, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    connection_record.info["checked_out_at"] = time.perf_counter()
+
+
+@event.listens_for(InstrumentedQueuePool, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    checked_out_at = connection_record.info.pop("checked_out_at", None)
+    stats = connection_record.info.get("pool_stats")
+    if checked_out_at is not None and stats is not None:
+        stats.record_hold(time.perf_counter() - checked_out_at)
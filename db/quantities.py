@@ -0,0 +1,292 @@
+import math
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import bindparam, event, update
+
+# db.models imports this module while db.events may still be loading (see
+# the bottom of db.models): bind the module, look its functions up on use.
+from db import events
+from db.models import Ingredient
+
+
+QUANTITY_BATCH_SIZE = int(os.getenv("QUANTITY_BATCH_SIZE", "5000"))
+MAX_SERVINGS = int(os.getenv("MAX_SERVINGS", "1000"))
+
+# Unit spelling -> (canonical unit, factor to it). Masses are stored in grams,
+# volumes in millilitres; count-like units are kept as their own canonical
+# unit. Units not listed here are kept as written (lower cased, singular).
+UNITS = {
+    "mg": ("g", 0.001),
+    "g": ("g", 1.0),
+    "gram": ("g", 1.0),
+    "gramme": ("g", 1.0),
+    "kg": ("g", 1000.0),
+    "kilogram": ("g", 1000.0),
+    "oz": ("g", 28.349523125),
+    "ounce": ("g", 28.349523125),
+    "lb": ("g", 453.59237),
+    "pound": ("g", 453.59237),
+    "ml": ("ml", 1.0),
+    "millilitre": ("ml", 1.0),
+    "milliliter": ("ml", 1.0),
+    "cl": ("ml", 10.0),
+    "dl": ("ml", 100.0),
+    "l": ("ml", 1000.0),
+    "litre": ("ml", 1000.0),
+    "liter": ("ml", 1000.0),
+    "tsp": ("ml", 4.92892159375),
+    "teaspoon": ("ml", 4.92892159375),
+    "tbsp": ("ml", 14.78676478125),
+    "tablespoon": ("ml", 14.78676478125),
+    "fl oz": ("ml", 29.5735295625),
+    "cup": ("ml", 236.5882365),
+    "pint": ("ml", 473.176473),
+    "quart": ("ml", 946.352946),
+    "gallon": ("ml", 3785.411784),
+    "clove": ("clove", 1.0),
+    "pinch": ("pinch", 1.0),
+    "dash": ("dash", 1.0),
+    "slice": ("slice", 1.0),
+    "piece": ("piece", 1.0),
+    "can": ("can", 1.0),
+    "tin": ("tin", 1.0),
+    "bunch": ("bunch", 1.0),
+    "sprig": ("sprig", 1.0),
+    "handful": ("handful", 1.0),
+    "stick": ("stick", 1.0),
+    "leaf": ("leaf", 1.0),
+    "leaves": ("leaf", 1.0),
+}
+
+_VULGAR = "¼-¾⅐-⅞"
+# A fraction ("1/2", "½"), or a whole or decimal number optionally followed
+# by a fraction ("1 1/2", "1½", "1.5", "1,5"). Fractions come first so "1/2"
+# is not read as 1 followed by "/2".
+_NUMBER = re.compile(
+    r"(?P<num>\d+)\s*/\s*(?P<den>\d+)"
+    r"|(?P<whole>\d+(?:[.,]\d+)?)(?:\s+(?P<wnum>\d+)/(?P<wden>\d+)|\s*(?P<wvulgar>[%s]))?"
+    r"|(?P<vulgar>[%s])" % (_VULGAR, _VULGAR)
+)
+_RANGE = re.compile(r"\s*(?:-|–|—|to)\s*")
+
+
+@dataclass
+class Quantity:
+    """Parsed amount of an ingredient, in ``unit``.
+
+    ``quantity_max`` is only set for ranges ("2-3"). All three are None when
+    the amount is not a number ("to taste").
+    """
+
+    quantity: Optional[float] = None
+    quantity_max: Optional[float] = None
+    unit: Optional[str] = None
+
+
+def _parse_number(text, position=0):
+    """(value, end) of the number at ``position`` of ``text``, or (None, position)."""
+    match = _NUMBER.match(text, position)
+    if match is None:
+        return None, position
+    if match["num"] is not None:
+        den = int(match["den"])
+        value = int(match["num"]) / den if den else None
+    elif match["vulgar"] is not None:
+        value = unicodedata.numeric(match["vulgar"])
+    else:
+        value = float(match["whole"].replace(",", "."))
+        if match["wnum"] is not None and int(match["wden"]):
+            value += int(match["wnum"]) / int(match["wden"])
+        elif match["wvulgar"] is not None:
+            value += unicodedata.numeric(match["wvulgar"])
+    return value, match.end()
+
+
+def singular(word):
+    """Singular of an English unit name: boxes -> box, cups -> cup, glass."""
+    if re.search(r"(s|x|z|ch|sh)es$", word):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def canonical_unit(text):
+    """(canonical unit, factor) of a unit as written; (None, 1.0) for none."""
+    key = re.sub(r"\s+", " ", (text or "").strip().lower().replace(".", ""))
+    if not key:
+        return None, 1.0
+    for candidate in (key, singular(key)):
+        if candidate in UNITS:
+            return UNITS[candidate]
+    return singular(key), 1.0
+
+
+def parse_quantity(amount, measurement=None) -> Quantity:
+    """Parse an ingredient's amount ("1 1/2", "½", "2-3", "200g") and unit.
+
+    The unit comes from ``measurement``, or from what follows the number in
+    ``amount`` when there is no measurement. Quantities are converted to the
+    canonical unit (see UNITS).
+    """
+    text = (amount or "").strip()
+    low, end = _parse_number(text)
+    if low is None:
+        return Quantity()
+    high = None
+    separator = _RANGE.match(text, end)
+    if separator is not None:
+        high, after = _parse_number(text, separator.end())
+        if high is not None:
+            end = after
+    unit, factor = canonical_unit(measurement or text[end:])
+    return Quantity(
+        round(low * factor, 6),
+        round(high * factor, 6) if high is not None else None,
+        unit,
+    )
+
+
+def with_quantity(row: dict) -> dict:
+    """An ingredient insert row with its parsed quantity columns added."""
+    parsed = parse_quantity(row.get("amount"), row.get("measurement"))
+    return dict(
+        row,
+        quantity=parsed.quantity,
+        quantity_max=parsed.quantity_max,
+        unit=parsed.unit,
+    )
+
+
+@event.listens_for(Ingredient, "before_insert")
+@event.listens_for(Ingredient, "before_update")
+def _parse_ingredient_quantity(mapper, connection, ingredient):
+    # ORM writes; Core inserts go through with_quantity.
+    parsed = parse_quantity(ingredient.amount, ingredient.measurement)
+    ingredient.quantity = parsed.quantity
+    ingredient.quantity_max = parsed.quantity_max
+    ingredient.unit = parsed.unit
+
+
+@dataclass
+class ScaledIngredient:
+    id: int
+    name: str
+    amount: str
+    measurement: Optional[str]
+    recipe_id: int
+    quantity: Optional[float]
+    quantity_max: Optional[float]
+    unit: Optional[str]
+
+
+def scale_ingredients(ingredients, factor):
+    """Copies of ``ingredients`` with quantity and quantity_max times ``factor``.
+
+    Both columns are scaled at once as a float array; missing quantities are
+    NaN in the array and None again in the result. The amount and
+    measurement text are returned as written.
+    """
+    ingredients = list(ingredients)
+    columns = np.array(
+        [(i.quantity, i.quantity_max) for i in ingredients], dtype=float
+    ).reshape(-1, 2)
+    scaled = np.round(columns * factor, 3).tolist()
+    return [
+        ScaledIngredient(
+            id=ingredient.id,
+            name=ingredient.name,
+            amount=ingredient.amount,
+            measurement=ingredient.measurement,
+            recipe_id=ingredient.recipe_id,
+            quantity=None if math.isnan(quantity) else quantity,
+            quantity_max=None if math.isnan(quantity_max) else quantity_max,
+            unit=ingredient.unit,
+        )
+        for ingredient, (quantity, quantity_max) in zip(ingredients, scaled)
+    ]
+
+
+class ScaledRecipe:
+    """A loaded recipe read through with its ingredients scaled to ``servings``."""
+
+    def __init__(self, recipe, servings):
+        self._recipe = recipe
+        self.servings = servings
+
+    @property
+    def ingredients(self):
+        return scale_ingredients(
+            self._recipe.ingredients, self.servings / self._recipe.servings
+        )
+
+    def __getattr__(self, name):
+        return getattr(self._recipe, name)
+
+
+def backfill_quantities(session_factory, batch_size=QUANTITY_BATCH_SIZE):
+    """Parse every ingredient's amount into the quantity columns.
+
+    Ingredients are read in id order, ``batch_size`` per transaction, and
+    only rows whose parsed values changed are written (so a rerun is cheap).
+    Their recipes are marked changed, which bumps their versions and runs
+    the commit hooks. Returns the number of ingredients updated.
+    """
+    statement = (
+        update(Ingredient.__table__)
+        .where(Ingredient.__table__.c.id == bindparam("ingredient_id"))
+        .values(
+            quantity=bindparam("quantity"),
+            quantity_max=bindparam("quantity_max"),
+            unit=bindparam("unit"),
+        )
+    )
+    updated, last_id = 0, 0
+    while True:
+        with session_factory() as db:
+            rows = (
+                db.query(
+                    Ingredient.id,
+                    Ingredient.recipe_id,
+                    Ingredient.amount,
+                    Ingredient.measurement,
+                    Ingredient.quantity,
+                    Ingredient.quantity_max,
+                    Ingredient.unit,
+                )
+                .filter(Ingredient.id > last_id)
+                .order_by(Ingredient.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                return updated
+            last_id = rows[-1].id
+
+            changes, recipe_ids = [], set()
+            for row in rows:
+                parsed = parse_quantity(row.amount, row.measurement)
+                if (parsed.quantity, parsed.quantity_max, parsed.unit) != (
+                    row.quantity,
+                    row.quantity_max,
+                    row.unit,
+                ):
+                    changes.append(
+                        {
+                            "ingredient_id": row.id,
+                            "quantity": parsed.quantity,
+                            "quantity_max": parsed.quantity_max,
+                            "unit": parsed.unit,
+                        }
+                    )
+                    recipe_ids.add(row.recipe_id)
+            if changes:
+                db.connection().execute(statement, changes)
+                events.mark_recipes_changed(db, recipe_ids)
+                db.commit()
+            updated += len(changes)
@@ -1,114 +1,151 @@
-from sqlalchemy.orm import Session
-from db.models import Step, Ingredient, RecipeCategories, Recipe
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.models import Step, Ingredient, RecipeCategories, Recipe, Category
 import db.schemas as _schemas
+from db.cache import slug_cache
+from db.loaders import (
+    recipe_graph_query,
+    recipe_graph_select,
+    RECIPE_SORT_KEYS,
+    INGREDIENT_SORT_KEYS,
+    RECIPE_CATEGORY_SORT_KEYS,
+)
+from db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PageParams, keyset_page
 # from db.db import Base, engine
 
 
+# The repositories take an AsyncSession. Keyset pages reuse the sync query
+# builders through AsyncSession.run_sync, which still performs the I/O on the
+# async driver without blocking the event loop. Page sizes are clamped to
+# MAX_PAGE_SIZE, as the routes' PageParams validation does.
+
+
 class StepRepo:
-    
-    async def create_step(db: Session, step: _schemas.StepCreate):
+
+    async def create_step(db: AsyncSession, step: _schemas.StepCreate):
             db_step = Step(step_number=step.step_number,step=step.step,recipe_id=step.recipe_id)
             db.add(db_step)
-            db.commit()
-            db.refresh(db_step)
+            await db.commit()
+            await db.refresh(db_step)
             return db_step
-        
-    def fetch_steps_by_recipe_id(db: Session,_id):
-        return db.query(Step).filter_by(recipe_id=_id).all()
-    
-    async def delete_step(db: Session,step_id):
-        db_step= db.query(Step).filter_by(id=step_id).first()
-        db.delete(db_step)
-        db.commit()
-        
-        
-    async def update_step(db: Session,step_data):
-        updated_step = db.merge(step_data)
-        db.commit()
+
+    async def fetch_steps_by_recipe_id(db: AsyncSession,_id):
+        result = await db.execute(select(Step).filter_by(recipe_id=_id).order_by(Step.step_number))
+        return result.scalars().all()
+
+    async def delete_step(db: AsyncSession,step_id):
+        db_step= await db.get(Step, step_id)
+        await db.delete(db_step)
+        await db.commit()
+
+
+    async def update_step(db: AsyncSession,step_data):
+        updated_step = await db.merge(step_data)
+        await db.commit()
         return updated_step
-    
-    
-    
+
+
+
 class IngredientRepo:
-    
-    async def create_ingredient(db: Session, ingredient: _schemas.IngredientCreate):
+
+    async def create_ingredient(db: AsyncSession, ingredient: _schemas.IngredientCreate):
             db_ingredient = Ingredient(name=ingredient.name,amount=ingredient.amount,measurement=ingredient.measurement,recipe_id=ingredient.recipe_id)
             db.add(db_ingredient)
-            db.commit()
-            db.refresh(db_ingredient)
+            await db.commit()
+            await db.refresh(db_ingredient)
             return db_ingredient
-        
-    def fetch_ingredients_by_name(db: Session,_name):
-        return db.query(Ingredient).filter(Ingredient.name == _name).first()
-    
-    def fetch_all_ingredients(db: Session, skip: int = 0, limit: int = 100):
-        return db.query(Ingredient).offset(skip).limit(limit).all()
-    
-    def fetch_ingredients_by_recipe_id(db: Session,_id):
-        return db.query(Ingredient).filter_by(recipe_id=_id).all()
-    
-    async def delete_ingredient(db: Session,ingredient_id):
-        db_ingredient= db.query(Ingredient).filter_by(id=ingredient_id).first()
-        db.delete(db_ingredient)
-        db.commit()
-    
-    async def update_ingredient(db: Session,ingredient_data):
-        updated_ingredient = db.merge(ingredient_data)
-        db.commit()
+
+    async def fetch_ingredients_by_name(db: AsyncSession,_name):
+        result = await db.execute(select(Ingredient).filter(Ingredient.name == _name))
+        return result.scalars().first()
+
+    async def fetch_all_ingredients(db: AsyncSession, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE):
+        page = PageParams(cursor=cursor, limit=min(limit, MAX_PAGE_SIZE))
+        return await db.run_sync(
+            lambda s: keyset_page(s.query(Ingredient), INGREDIENT_SORT_KEYS, page)
+        )
+
+    async def fetch_ingredients_by_recipe_id(db: AsyncSession,_id):
+        result = await db.execute(select(Ingredient).filter_by(recipe_id=_id))
+        return result.scalars().all()
+
+    async def delete_ingredient(db: AsyncSession,ingredient_id):
+        db_ingredient= await db.get(Ingredient, ingredient_id)
+        await db.delete(db_ingredient)
+        await db.commit()
+
+    async def update_ingredient(db: AsyncSession,ingredient_data):
+        updated_ingredient = await db.merge(ingredient_data)
+        await db.commit()
         return updated_ingredient
-    
+
 
 class RecipeCategoriesRepo:
-    
-    async def create_category(db: Session, category: _schemas.RecipeCategoriesCreate):
-            db_category = RecipeCategories(name=category.name,recipe_id=category.recipe_id)
+
+    async def create_category(db: AsyncSession, category: _schemas.RecipeCategoriesCreate):
+            db_category = RecipeCategories(category_id=category.category_id,recipe_id=category.recipe_id)
             db.add(db_category)
-            db.commit()
-            db.refresh(db_category)
+            await db.commit()
+            await db.refresh(db_category)
             return db_category
-        
-    def fetch_category_by_name(db: Session,_name):
-        return db.query(RecipeCategories).filter(RecipeCategories.name == _name).first()
-   
-    def fetch_catagories_by_recipe_id(db: Session,_id):
-        return db.query(RecipeCategories).filter_by(recipe_id=_id).all()
-    
-    def fetch_all_categories(db: Session, skip: int = 0, limit: int = 100):
-        return db.query(RecipeCategories).offset(skip).limit(limit).all()
-    
-    async def delete_category(db: Session,_id:int):
-        db_category= db.query(RecipeCategories).filter_by(id=_id).first()
-        db.delete(db_category)
-        db.commit()
-        
-    async def update(db: Session,category_data):
-        db.merge(category_data)
-        db.commit()
+
+    async def fetch_category_by_name(db: AsyncSession,_name):
+        result = await db.execute(
+            select(RecipeCategories).join(Category, Category.id == RecipeCategories.category_id).filter(Category.name == _name)
+        )
+        return result.scalars().first()
+
+    async def fetch_catagories_by_recipe_id(db: AsyncSession,_id):
+        result = await db.execute(select(RecipeCategories).filter_by(recipe_id=_id))
+        return result.scalars().all()
+
+    async def fetch_all_categories(db: AsyncSession, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE):
+        page = PageParams(cursor=cursor, limit=min(limit, MAX_PAGE_SIZE))
+        return await db.run_sync(
+            lambda s: keyset_page(s.query(RecipeCategories), RECIPE_CATEGORY_SORT_KEYS, page)
+        )
+
+    async def delete_category(db: AsyncSession,_id:int):
+        db_category= await db.get(RecipeCategories, _id)
+        await db.delete(db_category)
+        await db.commit()
+
+    async def update(db: AsyncSession,category_data):
+        await db.merge(category_data)
+        await db.commit()
 
 
 class RecipeRepo:
-    
-    async def create_recipe(db: Session, recipe: _schemas.RecipeCreate):
-            db_recipe = Recipe(title=recipe.title,description=recipe.description)
+
+    async def create_recipe(db: AsyncSession, recipe: _schemas.RecipeCreate):
+            db_recipe = Recipe(title=recipe.title,slug=recipe.slug,description=recipe.description)
             db.add(db_recipe)
-            db.commit()
-            db.refresh(db_recipe)
+            await db.commit()
+            await db.refresh(db_recipe)
+            slug_cache.set(db_recipe.slug, db_recipe.id)
             return db_recipe
-        
-    def fetch_recipe_by_id(db: Session,_id):
-        return db.query(Recipe).filter(Recipe.id == _id).first()
-    
-    def fetch_recipe_by_slug(db: Session,_slug):
-        return db.query(Recipe).filter(Recipe.slug == _slug).first()
-    
-    def fetch_all_recipes(db: Session, skip: int = 0, limit: int = 100):
-        return db.query(Recipe).offset(skip).limit(limit).all()
-    
-    async def delete_recipe(db: Session,_id:int):
-        db_recipe= db.query(Recipe).filter_by(id=_id).first()
-        db.delete(db_recipe)
-        db.commit()
-        
-    async def update(db: Session,recipe_data):
-        db.merge(recipe_data)
-        db.commit()
+
+    async def fetch_recipe_by_id(db: AsyncSession,_id):
+        result = await db.execute(recipe_graph_select().filter(Recipe.id == _id))
+        return result.scalars().first()
+
+    async def fetch_recipe_by_slug(db: AsyncSession,_slug):
+        result = await db.execute(recipe_graph_select().filter(Recipe.slug == _slug))
+        return result.scalars().first()
+
+    async def fetch_all_recipes(db: AsyncSession, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE, sort: str = "id"):
+        page = PageParams(cursor=cursor, limit=min(limit, MAX_PAGE_SIZE))
+        return await db.run_sync(
+            lambda s: keyset_page(recipe_graph_query(s), RECIPE_SORT_KEYS, page, sort)
+        )
+
+    async def delete_recipe(db: AsyncSession,_id:int):
+        db_recipe= await db.get(Recipe, _id)
+        await db.delete(db_recipe)
+        await db.commit()
+        slug_cache.invalidate(recipe_id=_id)
+
+    async def update(db: AsyncSession,recipe_data):
+        await db.merge(recipe_data)
+        await db.commit()
+        slug_cache.invalidate(slug=recipe_data.slug, recipe_id=recipe_data.id)
@@ -0,0 +1,124 @@
+import itertools
+import logging
+import os
+import threading
+import time
+
+from fastapi import Request, Response
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated URLs of read replicas; empty sends everything to the primary.
+READ_REPLICA_URLS = [
+    url.strip() for url in os.getenv("READ_REPLICA_URLS", "").split(",") if url.strip()
+]
+# Seconds between health probes of a replica, and how long a failed one is
+# skipped before it is probed again.
+REPLICA_HEALTH_INTERVAL = float(os.getenv("REPLICA_HEALTH_INTERVAL", "10"))
+# After a write, the client's reads stay on the primary for this many seconds
+# so replication lag never hides their own writes.
+STICKY_PRIMARY_SECONDS = float(os.getenv("STICKY_PRIMARY_SECONDS", "5"))
+STICKY_PRIMARY_COOKIE = "cookbook_primary_until"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class Replica:
+    def __init__(self, engine):
+        self.engine = engine
+        self.checked_at = None
+        self.down_until = 0.0
+
+
+class ReplicaSet:
+    """Round-robin over the read replicas that passed their last health probe."""
+
+    def __init__(self, engines, health_interval=REPLICA_HEALTH_INTERVAL, clock=time.monotonic):
+        self.replicas = [Replica(engine) for engine in engines]
+        self.health_interval = health_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._cycle = itertools.cycle(self.replicas)
+
+    def __bool__(self):
+        return bool(self.replicas)
+
+    def pick(self):
+        """Return the engine of the next healthy replica, or None."""
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = next(self._cycle)
+            if self._is_healthy(replica):
+                return replica.engine
+        return None
+
+    def _is_healthy(self, replica):
+        now = self._clock()
+        if now < replica.down_until:
+            return False
+        if replica.checked_at is not None and now - replica.checked_at < self.health_interval:
+            return True
+        try:
+            with replica.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception:
+            logger.warning("Read replica %s is unavailable", replica.engine.url)
+            replica.down_until = now + self.health_interval
+            return False
+        replica.checked_at = now
+        return True
+
+    def status(self):
+        now = self._clock()
+        return [
+            {
+                "url": replica.engine.url.render_as_string(hide_password=True),
+                "healthy": now >= replica.down_until,
+            }
+            for replica in self.replicas
+        ]
+
+
+class RoutingSession(Session):
+    """Session sending the reads of read-only sessions to a replica.
+
+    A session opened with ``info={"read_only": True}`` reads from one replica
+    (the same one for its whole lifetime); everything else, and any flush,
+    goes to the primary ``bind``.
+    """
+
+    def __init__(self, replicas=None, **kwargs):
+        super().__init__(**kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.replicas and self.info.get("read_only") and not self._flushing:
+            if "replica" not in self.info:
+                self.info["replica"] = self.replicas.pick()
+            if self.info["replica"] is not None:
+                return self.info["replica"]
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+def is_read_only(request: Request) -> bool:
+    """Whether ``request`` may be served from a replica."""
+    if request.method not in SAFE_METHODS:
+        return False
+    try:
+        sticky_until = float(request.cookies.get(STICKY_PRIMARY_COOKIE, 0))
+    except ValueError:
+        return True
+    return sticky_until <= time.time()
+
+
+def stick_to_primary(response: Response):
+    response.set_cookie(
+        STICKY_PRIMARY_COOKIE,
+        str(time.time() + STICKY_PRIMARY_SECONDS),
+        max_age=int(STICKY_PRIMARY_SECONDS) + 1,
+        httponly=True,
+        samesite="lax",
+    )
@@ -1,5 +1,25 @@
-from typing import List, Optional, Annotated
-from pydantic import BaseModel, StringConstraints
+from functools import lru_cache
+from typing import Generic, List, Optional, Annotated, TypeVar
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, create_model
+
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+class CategoryFacet(BaseModel):
+    id: int
+    name: str
+    count: int
+
+
+class FacetedPage(Page[T], Generic[T]):
+    # Only present when the request filtered by category or asked for facets.
+    facets: Optional[List[CategoryFacet]] = None
 
 
 class StepBase(BaseModel):
@@ -66,6 +86,10 @@ class IngredientCreate(IngredientBase):
 
 class IngredientReturn(IngredientBase):
     id: int
+    # Parsed from amount / measurement (see db.quantities).
+    quantity: Optional[float] = None
+    quantity_max: Optional[float] = None
+    unit: Optional[str] = None
 
     class Config:
         # orm_mode = True
@@ -76,12 +100,57 @@ class RecipeBase(BaseModel):
     title: str
     description: Optional[str] = None
     slug: Annotated[str, StringConstraints(min_length=1)]
+    servings: Optional[Annotated[int, Field(gt=0)]] = None
 
 
 class RecipeCreate(RecipeBase):
     pass
 
 
+class StepNestedCreate(BaseModel):
+    step_number: int
+    step: str
+
+
+class IngredientNestedCreate(BaseModel):
+    name: str
+    amount: str
+    measurement: Optional[str] = None
+
+
+class RecipeGraphCreate(RecipeBase):
+    """A recipe with its steps, ingredients and (existing) category names."""
+
+    steps: List[StepNestedCreate] = []
+    ingredients: List[IngredientNestedCreate] = []
+    categories: List[str] = []
+
+
+class BulkRejected(BaseModel):
+    line: int
+    slug: Optional[str] = None
+    reason: str
+
+
+class BulkDuplicate(BaseModel):
+    line: int
+    slug: str
+    duplicate_of: str
+    similarity: float
+
+
+class BulkImportReport(BaseModel):
+    imported: int
+    rejected: int
+    batches: int
+    # Imported recipes that look like one already in the catalog.
+    duplicates: int
+    # The first BULK_REJECT_LIMIT rejected rows.
+    rejects: List[BulkRejected]
+    # The first BULK_REJECT_LIMIT flagged rows.
+    possible_duplicates: List[BulkDuplicate]
+
+
 class RecipeReturn(RecipeBase):
     id: int
     ingredients: Optional[List[IngredientReturn]]
@@ -91,3 +160,80 @@ class RecipeReturn(RecipeBase):
     class Config:
         # orm_mode = True
         from_attributes = True
+
+
+class PantryMatch(BaseModel):
+    recipe: RecipeReturn
+    # Number of the recipe's ingredients found in the pantry / not found.
+    used: int
+    missing: int
+    missing_ingredients: List[str]
+
+    class Config:
+        from_attributes = True
+
+
+class ShoppingListEntry(BaseModel):
+    slug: str
+    # Scale the recipe to this many servings; its own servings if omitted.
+    servings: Optional[Annotated[int, Field(gt=0)]] = None
+
+
+class ShoppingListCreate(BaseModel):
+    recipes: Annotated[List[ShoppingListEntry], Field(min_length=1)]
+
+
+class ShoppingListItem(BaseModel):
+    name: str
+    unit: Optional[str] = None
+    # Sums in the canonical unit; quantity_max only when a range was summed.
+    quantity: Optional[float] = None
+    quantity_max: Optional[float] = None
+    recipes: int
+    # Uses whose amount is not a number ("to taste"), left out of quantity.
+    unquantified: int
+
+    class Config:
+        from_attributes = True
+
+
+class SimilarRecipe(BaseModel):
+    id: int
+    slug: str
+    title: str
+    # Weighted cosine similarity of ingredients and text, in [0, 1].
+    score: float
+
+    class Config:
+        from_attributes = True
+
+
+class TitleSuggestion(BaseModel):
+    title: str
+    slug: str
+
+    class Config:
+        from_attributes = True
+
+
+class IngredientSuggestion(BaseModel):
+    name: str
+    # Number of recipes using the ingredient.
+    count: int
+
+    class Config:
+        from_attributes = True
+
+
+@lru_cache(maxsize=None)
+def recipe_projection_model(fields: tuple, include: tuple):
+    """Build (once per combination) a RecipeReturn narrowed to the given fields."""
+    return create_model(
+        "RecipeProjection",
+        __config__=ConfigDict(from_attributes=True),
+        **{
+            name: (info.annotation, info)
+            for name, info in RecipeReturn.model_fields.items()
+            if name in fields or name in include
+        },
+    )
@@ -0,0 +1,178 @@
+import os
+import re
+import weakref
+
+from fastapi import HTTPException
+from sqlalchemy import Float, Integer, bindparam, column, text
+from sqlalchemy.orm import Session
+
+from db.events import on_before_commit
+from db.models import Recipe
+from db.pagination import PageParams, decode_cursor, page_of
+
+
+# Text search configuration (Postgres) used to stem documents and queries.
+SEARCH_LANGUAGE = os.getenv("SEARCH_LANGUAGE", "english")
+SEARCH_BATCH_SIZE = int(os.getenv("SEARCH_BATCH_SIZE", "1000"))
+
+# Keyset position of a search hit: best rank first, then recipe id.
+SEARCH_COLUMNS = (column("rank", Float()), column("recipe_id", Integer()))
+
+
+class PostgresSearch:
+    """recipe_search(recipe_id, document tsvector) with a GIN index.
+
+    The table is created by migration a7c3e5d9f12b; rows of deleted recipes go
+    away with the ON DELETE CASCADE foreign key.
+    """
+
+    refresh_sql = text(
+        """
+        INSERT INTO recipe_search (recipe_id, document)
+        SELECT r.id,
+            setweight(to_tsvector(CAST(:language AS regconfig), r.title), 'A')
+            || setweight(to_tsvector(CAST(:language AS regconfig), coalesce(r.description, '')), 'B')
+            || setweight(to_tsvector(CAST(:language AS regconfig), coalesce(
+                (SELECT string_agg(i.name, ' ') FROM ingredients i WHERE i.recipe_id = r.id), '')), 'B')
+            || setweight(to_tsvector(CAST(:language AS regconfig), coalesce(
+                (SELECT string_agg(s.step, ' ') FROM steps s WHERE s.recipe_id = r.id), '')), 'C')
+        FROM recipes r
+        WHERE r.id IN :ids
+        ON CONFLICT (recipe_id) DO UPDATE SET document = EXCLUDED.document
+        """
+    ).bindparams(bindparam("ids", expanding=True))
+
+    # ts_rank_cd returns float4, which comes back as its shortest decimal and
+    # no longer equals itself in the cursor's ``rank = :rank`` comparison.
+    hits_sql = """
+        SELECT recipe_search.recipe_id AS recipe_id,
+            CAST(ts_rank_cd(recipe_search.document, query) AS double precision) AS rank
+        FROM recipe_search, to_tsquery(CAST(:language AS regconfig), :match) AS query
+        WHERE recipe_search.document @@ query
+    """
+
+    def ensure(self, db: Session):
+        pass
+
+    def refresh(self, db: Session, recipe_ids):
+        db.execute(self.refresh_sql, {"ids": recipe_ids, "language": SEARCH_LANGUAGE})
+
+    def match(self, terms):
+        return " & ".join(f"{term}:*" for term in terms)
+
+
+class SqliteSearch:
+    """FTS5 table with the recipe id as rowid, for local runs and tests."""
+
+    create_sql = text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS recipe_search USING fts5("
+        "title, description, ingredients, steps, tokenize = 'porter unicode61')"
+    )
+    delete_sql = text("DELETE FROM recipe_search WHERE rowid IN :ids").bindparams(
+        bindparam("ids", expanding=True)
+    )
+    refresh_sql = text(
+        """
+        INSERT INTO recipe_search (rowid, title, description, ingredients, steps)
+        SELECT r.id, r.title, coalesce(r.description, ''),
+            coalesce((SELECT group_concat(i.name, ' ') FROM ingredients i WHERE i.recipe_id = r.id), ''),
+            coalesce((SELECT group_concat(s.step, ' ') FROM steps s WHERE s.recipe_id = r.id), '')
+        FROM recipes r
+        WHERE r.id IN :ids
+        """
+    ).bindparams(bindparam("ids", expanding=True))
+
+    # bm25 is lower-is-better; negate it so both backends rank descending.
+    # The weights favour title over description / ingredients over steps.
+    hits_sql = """
+        SELECT rowid AS recipe_id,
+            -bm25(recipe_search, 10.0, 4.0, 4.0, 1.0) AS rank
+        FROM recipe_search
+        WHERE recipe_search MATCH :match
+    """
+
+    def __init__(self):
+        self._ready = weakref.WeakSet()
+
+    def ensure(self, db: Session):
+        engine = db.get_bind()
+        if engine not in self._ready:
+            db.execute(self.create_sql)
+            self._ready.add(engine)
+
+    def refresh(self, db: Session, recipe_ids):
+        self.ensure(db)
+        db.execute(self.delete_sql, {"ids": recipe_ids})
+        db.execute(self.refresh_sql, {"ids": recipe_ids})
+
+    def match(self, terms):
+        return " ".join(f'"{term}"*' for term in terms)
+
+
+BACKENDS = {"postgresql": PostgresSearch(), "sqlite": SqliteSearch()}
+
+
+def search_backend(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect not in BACKENDS:
+        raise NotImplementedError(f"Full-text search is not supported on {dialect}")
+    return BACKENDS[dialect]
+
+
+def refresh_search(db: Session, recipe_ids):
+    """Reindex ``recipe_ids`` (dropping deleted recipes) in the current transaction."""
+    if recipe_ids:
+        search_backend(db).refresh(db, sorted(recipe_ids))
+
+
+def search_terms(q: str):
+    """Lower-cased word tokens of ``q``; each one is matched as a prefix."""
+    return re.findall(r"\w+", q.lower())
+
+
+def search_recipe_ids(db: Session, q: str, page: PageParams):
+    """One page of (recipe_id, rank) hits for ``q``, best match first.
+
+    Every term must match (as a prefix) in the title, description, an
+    ingredient or a step.
+    """
+    terms = search_terms(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail="Invalid search query")
+
+    backend = search_backend(db)
+    backend.ensure(db)
+    sort = f"search:{' '.join(terms)}"
+    params = {
+        "match": backend.match(terms),
+        "language": SEARCH_LANGUAGE,
+        "limit": page.limit + 1,
+    }
+    condition = ""
+    if page.cursor is not None:
+        params["rank"], params["recipe_id"] = decode_cursor(page.cursor, sort, SEARCH_COLUMNS)
+        condition = "WHERE rank < :rank OR (rank = :rank AND recipe_id > :recipe_id)"
+
+    statement = text(
+        f"SELECT recipe_id, rank FROM ({backend.hits_sql}) AS hits {condition} "
+        "ORDER BY rank DESC, recipe_id LIMIT :limit"
+    )
+    rows = db.execute(statement, params).all()
+    return page_of(rows, SEARCH_COLUMNS, page, sort)
+
+
+def rebuild_search(session_factory, batch_size=SEARCH_BATCH_SIZE):
+    """Reindex every recipe, ``batch_size`` recipes per transaction."""
+    with session_factory() as db:
+        ids = [row.id for row in db.query(Recipe.id).order_by(Recipe.id)]
+
+    for start in range(0, len(ids), batch_size):
+        with session_factory() as db:
+            refresh_search(db, ids[start : start + batch_size])
+            db.commit()
+    return len(ids)
+
+
+@on_before_commit
+def _refresh_in_transaction(session, recipe_ids):
+    refresh_search(session, recipe_ids)
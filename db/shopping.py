@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from db.models import Recipe, Ingredient
+from db.pantry import normalize_ingredient
+
+
+@dataclass
+class ShoppingItem:
+    name: str
+    unit: Optional[str]
+    quantity: Optional[float]
+    quantity_max: Optional[float]
+    # Number of recipes using the ingredient / uses whose amount did not
+    # parse ("to taste") and so are not in quantity.
+    recipes: int
+    unquantified: int
+
+
+def recipe_factors(db: Session, entries):
+    """{recipe_id: factor} for (slug, servings or None) ``entries``.
+
+    ``servings`` scales a recipe from its own servings; a recipe listed
+    twice is bought for twice. 400 for an unknown slug, or for servings
+    asked of a recipe that has none.
+    """
+    slugs = {slug for slug, _ in entries}
+    recipes = {
+        row.slug: row
+        for row in db.query(Recipe.id, Recipe.slug, Recipe.servings).filter(
+            Recipe.slug.in_(sorted(slugs))
+        )
+    }
+    factors = {}
+    for slug, servings in entries:
+        recipe = recipes.get(slug)
+        if recipe is None:
+            raise HTTPException(status_code=400, detail=f"Recipe does not exist: {slug}")
+        if servings is None:
+            factor = 1.0
+        elif recipe.servings is None:
+            raise HTTPException(
+                status_code=400, detail=f"Recipe has no servings to scale: {slug}"
+            )
+        else:
+            factor = servings / recipe.servings
+        factors[recipe.id] = factors.get(recipe.id, 0.0) + factor
+    return factors
+
+
+def shopping_list(db: Session, entries):
+    """Merged ingredients of ``entries``, summed per ingredient and unit.
+
+    The sums come from one query grouped by lower(name) and canonical unit
+    over the parsed quantity columns (see db.quantities), each row weighted
+    by its recipe's factor; the groups are then merged on the same
+    normalized name as the pantry ("eggs" and "Egg" are one item, named after
+    the first spelling in alphabetical order).
+    """
+    factors = recipe_factors(db, entries)
+    factor = case(factors, value=Ingredient.recipe_id)
+    key = func.lower(func.trim(Ingredient.name))
+    rows = (
+        db.query(
+            func.min(Ingredient.name).label("name"),
+            Ingredient.unit,
+            func.sum(Ingredient.quantity * factor).label("quantity"),
+            func.sum(
+                func.coalesce(Ingredient.quantity_max, Ingredient.quantity) * factor
+            ).label("quantity_max"),
+            func.count(Ingredient.quantity_max).label("ranges"),
+            func.count(func.distinct(Ingredient.recipe_id)).label("recipes"),
+            (func.count() - func.count(Ingredient.quantity)).label("unquantified"),
+        )
+        .filter(Ingredient.recipe_id.in_(sorted(factors)))
+        .group_by(key, Ingredient.unit)
+        .order_by(key, Ingredient.unit)
+        .all()
+    )
+
+    merged = {}
+    for row in rows:
+        item_key = (normalize_ingredient(row.name), row.unit)
+        item = merged.get(item_key)
+        if item is None:
+            merged[item_key] = item = [row.name, row.unit, None, None, 0, 0, 0]
+        if row.quantity is not None:
+            item[2] = (item[2] or 0.0) + row.quantity
+            item[3] = (item[3] or 0.0) + row.quantity_max
+        item[4] += row.ranges
+        item[5] += row.recipes
+        item[6] += row.unquantified
+
+    items = [
+        ShoppingItem(
+            name=name,
+            unit=unit,
+            quantity=None if quantity is None else round(quantity, 3),
+            quantity_max=round(quantity_max, 3) if ranges else None,
+            recipes=recipes,
+            unquantified=unquantified,
+        )
+        for name, unit, quantity, quantity_max, ranges, recipes, unquantified in merged.values()
+    ]
+    items.sort(key=lambda item: (item.name.lower(), item.unit or ""))
+    return items
@@ -0,0 +1,335 @@
+import logging
+import math
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from db.models import Recipe, RecipeNeighbor, Ingredient, Step
+from db.pantry import normalize_ingredient
+
+
+logger = logging.getLogger(__name__)
+
+SIMILAR_TOP_K = int(os.getenv("SIMILAR_TOP_K", "10"))
+# Recipes read, and neighbor lists written, per transaction.
+SIMILAR_BATCH_SIZE = int(os.getenv("SIMILAR_BATCH_SIZE", "2000"))
+# Recipes scored against the catalog per NumPy step: the step holds a
+# chunk x catalog float64 score matrix (256 x 20k recipes is 40 MB).
+SIMILAR_CHUNK_SIZE = int(os.getenv("SIMILAR_CHUNK_SIZE", "256"))
+# Share of the score coming from ingredient overlap, the rest from the
+# title, description and steps.
+SIMILAR_INGREDIENT_WEIGHT = float(os.getenv("SIMILAR_INGREDIENT_WEIGHT", "0.6"))
+
+_WORD = re.compile(r"[^\W\d_]{3,}")
+
+
+def recipe_terms(title, description, ingredient_names, steps):
+    """(ingredient terms, text terms) of a recipe, as Counters.
+
+    Ingredients are normalized like the pantry's ("Eggs" is "egg"); text
+    terms are the words of three letters or more of the title, description
+    and steps.
+    """
+    ingredients = Counter(normalize_ingredient(name) for name in ingredient_names)
+    text = " ".join([title, description or "", *steps]).casefold()
+    return ingredients, Counter(_WORD.findall(text))
+
+
+@dataclass
+class RecipeVectors:
+    """L2-normalized sparse TF-IDF vectors, one row per recipe.
+
+    Rows are stored twice: by recipe (CSR: ``indptr``, ``indices``, ``data``)
+    to read a recipe's terms, and by term (CSC: ``postings_ptr``,
+    ``postings_rows``, ``postings_data``) to find every recipe using a term.
+    """
+
+    size: int
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+    postings_ptr: np.ndarray
+    postings_rows: np.ndarray
+    postings_data: np.ndarray
+
+
+def build_vectors(terms, ingredient_weight=SIMILAR_INGREDIENT_WEIGHT):
+    """RecipeVectors of ``terms``, a list of recipe_terms() results.
+
+    Term frequencies are sublinear (1 + log tf) and weighted by smoothed
+    IDF. The ingredient and text parts of a vector are normalized apart and
+    scaled so that the dot product of two vectors is ``ingredient_weight`` x
+    the cosine of their ingredients + the rest x the cosine of their text.
+    """
+    vocabulary = {}
+    columns, counts, is_text, lengths = [], [], [], []
+    for ingredients, text in terms:
+        for part, counter in enumerate((ingredients, text)):
+            for term, count in counter.items():
+                columns.append(vocabulary.setdefault((part, term), len(vocabulary)))
+                counts.append(count)
+                is_text.append(part)
+        lengths.append(len(ingredients) + len(text))
+
+    size = len(terms)
+    indices = np.array(columns, dtype=np.int64)
+    is_text = np.array(is_text, dtype=np.int64)
+    rows = np.repeat(np.arange(size), lengths)
+    document_frequency = np.bincount(indices, minlength=len(vocabulary))
+    idf = np.log((1 + size) / (1 + document_frequency)) + 1
+    data = (1 + np.log(np.array(counts, dtype=np.float64))) * idf[indices]
+
+    parts = rows * 2 + is_text
+    norms = np.sqrt(np.bincount(parts, weights=data**2, minlength=size * 2))
+    weights = np.sqrt([ingredient_weight, 1 - ingredient_weight])
+    if len(data):
+        data *= weights[is_text] / norms[parts]
+
+    indptr = np.concatenate(([0], np.cumsum(lengths, dtype=np.int64)))
+    order = np.argsort(indices, kind="stable")
+    postings_ptr = np.concatenate(
+        ([0], np.cumsum(document_frequency, dtype=np.int64))
+    )
+    return RecipeVectors(
+        size, indptr, indices, data, postings_ptr, rows[order], data[order]
+    )
+
+
+def _gather(starts, stops):
+    """Positions start..stop of every (start, stop) slice, concatenated."""
+    lengths = stops - starts
+    offsets = np.cumsum(lengths) - lengths
+    return np.repeat(starts - offsets, lengths) + np.arange(lengths.sum()), lengths
+
+
+def score_rows(vectors, rows, top_k, kth=None):
+    """Top-k neighbors of the recipes at positions ``rows``.
+
+    The rows' terms are joined to the postings of those terms and summed per
+    (row, recipe) with one bincount, so a chunk is scored against the whole
+    catalog in a few NumPy calls. Returns ``(neighbors, insertions)``:
+    neighbors holds, per row, its (position, score) pairs best first;
+    insertions the (position, row position, score) of every other recipe
+    the row now scores above ``kth``, that recipe's current k-th best score.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    entries, entry_counts = _gather(vectors.indptr[rows], vectors.indptr[rows + 1])
+    terms = vectors.indices[entries]
+    postings, posting_counts = _gather(
+        vectors.postings_ptr[terms], vectors.postings_ptr[terms + 1]
+    )
+    owners = np.repeat(np.repeat(np.arange(len(rows)), entry_counts), posting_counts)
+    weights = np.repeat(vectors.data[entries], posting_counts)
+    scores = np.bincount(
+        owners * vectors.size + vectors.postings_rows[postings],
+        weights=weights * vectors.postings_data[postings],
+        minlength=len(rows) * vectors.size,
+    ).reshape(len(rows), vectors.size)
+    scores[np.arange(len(rows)), rows] = 0
+
+    k = min(top_k, vectors.size - 1)
+    neighbors = [[] for _ in rows]
+    if k > 0:
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        for i, candidates in enumerate(best):
+            candidates = candidates[scores[i, candidates] > 0]
+            order = np.lexsort((candidates, -scores[i, candidates]))
+            neighbors[i] = [
+                (int(j), float(scores[i, j])) for j in candidates[order]
+            ]
+
+    insertions = []
+    if kth is not None:
+        for i, j in zip(*np.nonzero(scores > kth)):
+            insertions.append((int(j), int(rows[i]), float(scores[i, j])))
+    return neighbors, insertions
+
+
+# Set in each worker process by _init_worker, so the catalog's vectors are
+# sent once per worker rather than once per chunk.
+_worker = {}
+
+
+def _init_worker(vectors, kth):
+    _worker["vectors"] = vectors
+    _worker["kth"] = kth
+
+
+def _score_chunk(job):
+    rows, top_k = job
+    return score_rows(_worker["vectors"], rows, top_k, _worker["kth"])
+
+
+def load_similarity_texts(db: Session, recipe_ids):
+    """{recipe_id: (version, title, description, ingredient names, steps)}."""
+    ids = sorted(recipe_ids)
+    texts = {
+        recipe_id: (version, title, description, [], [])
+        for recipe_id, version, title, description in db.query(
+            Recipe.id, Recipe.version, Recipe.title, Recipe.description
+        ).filter(Recipe.id.in_(ids))
+    }
+    for recipe_id, name in db.query(Ingredient.recipe_id, Ingredient.name).filter(
+        Ingredient.recipe_id.in_(ids)
+    ):
+        if recipe_id in texts:
+            texts[recipe_id][3].append(name)
+    for recipe_id, step in (
+        db.query(Step.recipe_id, Step.step)
+        .filter(Step.recipe_id.in_(ids))
+        .order_by(Step.recipe_id, Step.step_number)
+    ):
+        if recipe_id in texts:
+            texts[recipe_id][4].append(step)
+    return texts
+
+
+def load_neighbor_lists(db: Session):
+    """({recipe_id: [(neighbor_id, score)] best first}, {recipe_id: version})."""
+    lists, versions = {}, {}
+    rows = db.query(
+        RecipeNeighbor.recipe_id,
+        RecipeNeighbor.neighbor_id,
+        RecipeNeighbor.score,
+        RecipeNeighbor.version,
+    ).order_by(RecipeNeighbor.recipe_id, RecipeNeighbor.rank)
+    for recipe_id, neighbor_id, score, version in rows:
+        lists.setdefault(recipe_id, []).append((neighbor_id, score))
+        versions[recipe_id] = version
+    return lists, versions
+
+
+def _merge(current, added, top_k):
+    merged = sorted(current + added, key=lambda pair: (-pair[1], pair[0]))
+    return merged[:top_k]
+
+
+def refresh_similar(session_factory, full=False, top_k=SIMILAR_TOP_K,
+                    batch_size=SIMILAR_BATCH_SIZE, chunk_size=SIMILAR_CHUNK_SIZE,
+                    workers=4):
+    """Bring the recipe_neighbors table up to date; returns the lists rewritten.
+
+    A recipe's list is stale when it was computed for another version of the
+    recipe (or never). Stale recipes are scored against the whole catalog,
+    in chunks of ``chunk_size`` spread over ``workers`` processes (this one if
+    1), and so are the recipes whose list held a changed or deleted recipe,
+    since its score may have dropped. Any other recipe that a changed one now
+    beats the k-th neighbor of just gets it merged in. Scores kept from an
+    earlier run use that run's IDF weights; ``full`` recomputes every list.
+    A recipe sharing no term with any other has no rows, so it is rescored
+    on every run.
+    """
+    with session_factory() as db:
+        ids = [row.id for row in db.query(Recipe.id).order_by(Recipe.id)]
+        stored, stored_versions = load_neighbor_lists(db)
+
+    # Recipes deleted while the job runs are left out, like deleted ones.
+    loaded, versions, terms = [], [], []
+    for i in range(0, len(ids), batch_size):
+        with session_factory() as db:
+            texts = load_similarity_texts(db, ids[i : i + batch_size])
+        for recipe_id, (version, title, description, names, steps) in sorted(
+            texts.items()
+        ):
+            loaded.append(recipe_id)
+            versions.append(version)
+            terms.append(recipe_terms(title, description, names, steps))
+    ids = loaded
+
+    positions = {recipe_id: i for i, recipe_id in enumerate(ids)}
+    deleted = set(stored) - set(positions)
+    if full:
+        changed = set(ids)
+    else:
+        changed = {
+            recipe_id
+            for recipe_id, version in zip(ids, versions)
+            if stored_versions.get(recipe_id) != version
+        }
+    recompute = changed | {
+        recipe_id
+        for recipe_id, neighbors in stored.items()
+        if recipe_id in positions
+        and any(j in changed or j not in positions for j, _ in neighbors)
+    }
+
+    lists = {}
+    if recompute:
+        kth = np.zeros(len(ids))
+        for recipe_id, neighbors in stored.items():
+            if recipe_id in positions and len(neighbors) >= top_k:
+                kth[positions[recipe_id]] = neighbors[-1][1]
+        for recipe_id in recompute:
+            kth[positions[recipe_id]] = np.inf
+
+        vectors = build_vectors(terms)
+        rows = sorted(positions[recipe_id] for recipe_id in recompute)
+        jobs = [(rows[i : i + chunk_size], top_k) for i in range(0, len(rows), chunk_size)]
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(vectors, kth)
+            ) as pool:
+                results = list(pool.map(_score_chunk, jobs))
+        else:
+            results = [score_rows(vectors, chunk, top_k, kth) for chunk, _ in jobs]
+
+        added = {}
+        for (chunk, _), (neighbors, insertions) in zip(jobs, results):
+            for row, row_neighbors in zip(chunk, neighbors):
+                lists[ids[row]] = [(ids[j], score) for j, score in row_neighbors]
+            for j, row, score in insertions:
+                added.setdefault(ids[j], []).append((ids[row], score))
+        for recipe_id, pairs in added.items():
+            lists[recipe_id] = _merge(stored.get(recipe_id, []), pairs, top_k)
+
+    write = sorted(lists)
+    for i in range(0, max(len(write), 1), batch_size):
+        batch = write[i : i + batch_size]
+        with session_factory() as db:
+            if i == 0 and deleted:
+                db.execute(
+                    delete(RecipeNeighbor).where(
+                        RecipeNeighbor.recipe_id.in_(sorted(deleted))
+                    )
+                )
+            if batch:
+                db.execute(
+                    delete(RecipeNeighbor).where(RecipeNeighbor.recipe_id.in_(batch))
+                )
+                rows = [
+                    {
+                        "recipe_id": recipe_id,
+                        "rank": rank,
+                        "neighbor_id": neighbor_id,
+                        "score": round(score, 4),
+                        "version": versions[positions[recipe_id]],
+                    }
+                    for recipe_id in batch
+                    for rank, (neighbor_id, score) in enumerate(lists[recipe_id], 1)
+                ]
+                if rows:
+                    db.execute(insert(RecipeNeighbor), rows)
+            db.commit()
+    return len(write)
+
+
+def similar_recipes(db: Session, recipe_id, limit=SIMILAR_TOP_K):
+    """(id, slug, title, score) rows of a recipe's stored neighbors, best first.
+
+    Lists are only as fresh as the last refresh_similar run; neighbors
+    deleted since are left out.
+    """
+    return (
+        db.query(Recipe.id, Recipe.slug, Recipe.title, RecipeNeighbor.score)
+        .join(RecipeNeighbor, RecipeNeighbor.neighbor_id == Recipe.id)
+        .filter(RecipeNeighbor.recipe_id == recipe_id)
+        .order_by(RecipeNeighbor.rank)
+        .limit(limit)
+        .all()
+    )
@@ -0,0 +1,344 @@
+import heapq
+import os
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from dataclasses import dataclass
+
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import Session
+
+from db.events import on_commit_update
+from db.models import Recipe, Ingredient
+
+
+MAX_SUGGESTIONS = int(os.getenv("MAX_SUGGESTIONS", "20"))
+# Prefixes whose best completions are kept, per kind; the ones up to
+# SUGGEST_WARM_PREFIX characters long are computed when the index loads.
+SUGGEST_CACHE_SIZE = int(os.getenv("SUGGEST_CACHE_SIZE", "10000"))
+SUGGEST_WARM_PREFIX = int(os.getenv("SUGGEST_WARM_PREFIX", "2"))
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", text.strip().casefold())
+
+
+def word_suffixes(key: str):
+    """``key`` from the start of each of its words: "tomato soup" -> both
+    "tomato soup" and "soup", so completions match at any word."""
+    return {key[match.start() :] for match in re.finditer(r"\b\w", key)}
+
+
+@dataclass
+class TitleCompletion:
+    title: str
+    slug: str
+
+
+@dataclass
+class IngredientCompletion:
+    name: str
+    count: int
+
+
+class PrefixIndex:
+    """Sorted array of (key, item) pairs; a prefix is one binary search away.
+
+    Every word suffix of an item's text is a key, and all keys starting with
+    a prefix are contiguous in the array.
+    """
+
+    def __init__(self):
+        self._entries = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, item, key):
+        for suffix in word_suffixes(key):
+            insort(self._entries, (suffix, item))
+
+    def remove(self, item, key):
+        for suffix in word_suffixes(key):
+            i = bisect_left(self._entries, (suffix, item))
+            if i < len(self._entries) and self._entries[i] == (suffix, item):
+                del self._entries[i]
+
+    def load(self, pairs):
+        self._entries = sorted(
+            (suffix, item) for item, key in pairs for suffix in word_suffixes(key)
+        )
+
+    def prefixes(self, length):
+        """Every distinct prefix of up to ``length`` characters of a key."""
+        return {
+            suffix[:end]
+            for suffix, _ in self._entries
+            for end in range(1, min(length, len(suffix)) + 1)
+        }
+
+    def matches(self, prefix):
+        """Distinct items with a word starting with ``prefix``."""
+        found = set()
+        i = bisect_left(self._entries, (prefix,))
+        while i < len(self._entries) and self._entries[i][0].startswith(prefix):
+            found.add(self._entries[i][1])
+            i += 1
+        return found
+
+
+class Suggester:
+    """In-memory completions for recipe titles and ingredient names.
+
+    Titles complete to the shortest matching titles (those starting with the
+    prefix first); ingredient names to the names used by most recipes. Like
+    the pantry index it is per process, loaded at startup and kept current
+    by the commit hooks below; until it is loaded, completions come from SQL
+    (see sql_suggest_titles / sql_suggest_ingredients).
+
+    The best MAX_SUGGESTIONS items of every prefix asked for (and of every
+    prefix up to SUGGEST_WARM_PREFIX characters, computed at load) are kept
+    and patched on writes instead of being recomputed: an added title or a
+    more used ingredient is merged into the lists of its prefixes, and only a
+    list losing a member is dropped, to be recomputed on its next use.
+    """
+
+    def __init__(self, cache_size=SUGGEST_CACHE_SIZE):
+        self._lock = threading.Lock()
+        self.cache_size = cache_size
+        self.loaded = False
+        self._reset()
+
+    def _reset(self):
+        self._titles = PrefixIndex()
+        self._ingredients = PrefixIndex()
+        self._recipes = {}
+        self._title_keys = {}
+        self._versions = {}
+        # normalized name -> Counter of the spellings used by recipes
+        self._names = {}
+        self._counts = Counter()
+        self._top = {"titles": {}, "ingredients": {}}
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+            self.loaded = False
+
+    def load(self, db: Session):
+        recipes = {
+            recipe_id: [version, title, slug, []]
+            for recipe_id, version, title, slug in db.query(
+                Recipe.id, Recipe.version, Recipe.title, Recipe.slug
+            )
+        }
+        for recipe_id, name in db.query(Ingredient.recipe_id, Ingredient.name):
+            if recipe_id in recipes:
+                recipes[recipe_id][3].append(name)
+
+        with self._lock:
+            self._reset()
+            for recipe_id, (version, title, slug, names) in recipes.items():
+                self._recipes[recipe_id] = (title, slug, tuple(names))
+                self._title_keys[recipe_id] = normalize_text(title)
+                self._versions[recipe_id] = version
+                for name in names:
+                    key = normalize_text(name)
+                    self._names.setdefault(key, Counter())[name] += 1
+                    self._counts[key] += 1
+            self._titles.load(self._title_keys.items())
+            self._ingredients.load((key, key) for key in self._names)
+            for kind, index in (("titles", self._titles), ("ingredients", self._ingredients)):
+                for prefix in index.prefixes(SUGGEST_WARM_PREFIX):
+                    self._top[kind][prefix] = self._compute(kind, prefix)
+            self.loaded = True
+        return len(recipes)
+
+    def apply(self, updates):
+        """Apply ``{recipe_id: (version, title, slug, names) or None}``."""
+        with self._lock:
+            if not self.loaded:
+                return
+            for recipe_id, update in updates.items():
+                if update is not None and update[0] < self._versions.get(recipe_id, 0):
+                    continue
+                self._remove(recipe_id)
+                if update is None:
+                    self._versions.pop(recipe_id, None)
+                    continue
+                version, title, slug, names = update
+                key = normalize_text(title)
+                self._recipes[recipe_id] = (title, slug, tuple(names))
+                self._title_keys[recipe_id] = key
+                self._versions[recipe_id] = version
+                self._titles.add(recipe_id, key)
+                self._patch("titles", recipe_id, key, added=True)
+                for name in names:
+                    key = normalize_text(name)
+                    if key not in self._names:
+                        self._names[key] = Counter()
+                        self._ingredients.add(key, key)
+                    self._names[key][name] += 1
+                    self._counts[key] += 1
+                    self._patch("ingredients", key, key, added=True)
+
+    def _remove(self, recipe_id):
+        if recipe_id not in self._recipes:
+            return
+        _, _, names = self._recipes.pop(recipe_id)
+        key = self._title_keys.pop(recipe_id)
+        self._titles.remove(recipe_id, key)
+        self._patch("titles", recipe_id, key, added=False)
+        for name in names:
+            key = normalize_text(name)
+            spellings = self._names[key]
+            spellings[name] -= 1
+            if spellings[name] <= 0:
+                del spellings[name]
+            self._counts[key] -= 1
+            self._patch("ingredients", key, key, added=False)
+            if not spellings:
+                del self._names[key]
+                del self._counts[key]
+                self._ingredients.remove(key, key)
+
+    def _rank(self, kind, item, prefix):
+        if kind == "titles":
+            title = self._recipes[item][0]
+            return (not self._title_keys[item].startswith(prefix), len(title), title)
+        return (-self._counts[item], item)
+
+    def _compute(self, kind, prefix):
+        index = self._titles if kind == "titles" else self._ingredients
+        return heapq.nsmallest(
+            MAX_SUGGESTIONS,
+            index.matches(prefix),
+            key=lambda item: self._rank(kind, item, prefix),
+        )
+
+    def _patch(self, kind, item, key, added):
+        """Update the kept lists of every prefix of ``key``'s words after
+        ``item`` was added or ranked higher (``added``), or was removed or
+        ranked lower."""
+        top = self._top[kind]
+        for suffix in word_suffixes(key):
+            for end in range(1, len(suffix) + 1):
+                prefix = suffix[:end]
+                best = top.get(prefix)
+                if best is None:
+                    continue
+                if not added:
+                    # A shorter list holds every match, so a non-member
+                    # cannot be a match; a member may now rank lower than
+                    # items that are not in the list.
+                    if item in best:
+                        del top[prefix]
+                    continue
+                if item not in best:
+                    best.append(item)
+                best.sort(key=lambda i: self._rank(kind, i, prefix))
+                del best[MAX_SUGGESTIONS:]
+
+    def titles(self, prefix, limit):
+        return self._complete("titles", prefix, limit)
+
+    def ingredients(self, prefix, limit):
+        return self._complete("ingredients", prefix, limit)
+
+    def _complete(self, kind, prefix, limit):
+        prefix = normalize_text(prefix)
+        with self._lock:
+            top = self._top[kind]
+            best = top.get(prefix)
+            if best is None:
+                if len(top) >= self.cache_size:
+                    for kept in [p for p in top if len(p) > SUGGEST_WARM_PREFIX]:
+                        del top[kept]
+                best = top[prefix] = self._compute(kind, prefix)
+            if kind == "titles":
+                return [
+                    TitleCompletion(*self._recipes[recipe_id][:2])
+                    for recipe_id in best[:limit]
+                ]
+            return [
+                IngredientCompletion(self._names[key].most_common(1)[0][0], self._counts[key])
+                for key in best[:limit]
+            ]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "titles": len(self._titles),
+                "ingredients": len(self._ingredients),
+                "prefixes": sum(len(top) for top in self._top.values()),
+            }
+
+
+suggester = Suggester()
+
+
+def _word_start(column, prefix):
+    # Served by the pg_trgm GIN indexes of migration f29d6b81c4e7 on Postgres.
+    escaped = re.sub(r"([\\%_])", r"\\\1", normalize_text(prefix))
+    lowered = func.lower(column)
+    return (
+        lowered.like(f"{escaped}%", escape="\\"),
+        or_(
+            lowered.like(f"{escaped}%", escape="\\"),
+            lowered.like(f"% {escaped}%", escape="\\"),
+        ),
+    )
+
+
+def sql_suggest_titles(db: Session, prefix, limit):
+    starts, matches = _word_start(Recipe.title, prefix)
+    return (
+        db.query(Recipe.title.label("title"), Recipe.slug.label("slug"))
+        .filter(matches)
+        .order_by(case((starts, 0), else_=1), func.length(Recipe.title), Recipe.title)
+        .limit(limit)
+        .all()
+    )
+
+
+def sql_suggest_ingredients(db: Session, prefix, limit):
+    _, matches = _word_start(Ingredient.name, prefix)
+    count = func.count(Ingredient.id)
+    return (
+        db.query(func.min(Ingredient.name).label("name"), count.label("count"))
+        .filter(matches)
+        .group_by(func.lower(Ingredient.name))
+        .order_by(count.desc(), func.lower(Ingredient.name))
+        .limit(limit)
+        .all()
+    )
+
+
+def suggest_titles(db: Session, prefix, limit):
+    if suggester.loaded:
+        return suggester.titles(prefix, limit)
+    return sql_suggest_titles(db, prefix, limit)
+
+
+def suggest_ingredients(db: Session, prefix, limit):
+    if suggester.loaded:
+        return suggester.ingredients(prefix, limit)
+    return sql_suggest_ingredients(db, prefix, limit)
+
+
+@on_commit_update(suggester)
+def _suggest_updates(session, recipe_ids):
+    rows = (
+        session.query(Recipe.id, Recipe.version, Recipe.title, Recipe.slug, Ingredient.name)
+        .outerjoin(Ingredient, Ingredient.recipe_id == Recipe.id)
+        .filter(Recipe.id.in_(sorted(recipe_ids)))
+    )
+    updates = dict.fromkeys(recipe_ids)
+    for recipe_id, version, title, slug, name in rows:
+        if updates[recipe_id] is None:
+            updates[recipe_id] = (version, title, slug, [])
+        if name is not None:
+            updates[recipe_id][3].append(name)
+    return updates
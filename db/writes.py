@@ -0,0 +1,108 @@
+from fastapi import HTTPException
+from sqlalchemy import insert, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from db.dialects import dialect_insert
+from db.events import mark_recipes_changed, mark_recipes_created
+from db.models import Recipe, Ingredient, RecipeCategories, Step, Category
+from db.quantities import with_quantity
+from db.schemas import RecipeGraphCreate, RecipeReturn
+
+
+def insert_returning(db: Session, model, rows, order_by="id"):
+    """Insert ``rows`` with one multi-row INSERT .. RETURNING; returns objects.
+
+    The objects are attached to the session like loaded ones, so no refresh
+    is needed. RETURNING order is unspecified (asking SQLAlchemy for parameter
+    order falls back to row-by-row inserts on SQLite), so they are sorted by
+    ``order_by``.
+    """
+    if not rows:
+        return []
+    objects = db.scalars(insert(model).returning(model), rows).all()
+    return sorted(objects, key=lambda obj: getattr(obj, order_by))
+
+
+def insert_unique(db: Session, model, values):
+    """INSERT .. ON CONFLICT DO NOTHING RETURNING; the new object or None.
+
+    None means one of the model's unique constraints already holds these
+    values. The database decides in the same statement, so concurrent
+    requests for the same key cannot both succeed. RETURNING brings back the
+    server defaults, and the collections of the new row are known to be
+    empty, so the object can be serialized without another query.
+    """
+    statement = (
+        dialect_insert(db, model).values(**values).on_conflict_do_nothing().returning(model)
+    )
+    obj = db.scalars(statement).first()
+    if obj is not None:
+        for relationship in inspect(model).relationships:
+            set_committed_value(obj, relationship.key, [] if relationship.uselist else None)
+        if isinstance(obj, Recipe):
+            mark_recipes_created(db, [obj.id])
+        elif hasattr(obj, "recipe_id"):
+            mark_recipes_changed(db, [obj.recipe_id])
+    return obj
+
+
+def resolve_category_ids(db: Session, names):
+    """Map category names to ids in one query; 400 if any does not exist."""
+    names = list(dict.fromkeys(names))
+    if not names:
+        return []
+    ids = dict(db.query(Category.name, Category.id).filter(Category.name.in_(names)))
+    for name in names:
+        if name not in ids:
+            raise HTTPException(status_code=400, detail=f"Category does not exist: {name}")
+    return [ids[name] for name in names]
+
+
+def insert_recipe_graph(db: Session, recipe_data: RecipeGraphCreate):
+    """Insert a recipe and its children in the current transaction.
+
+    One INSERT per table regardless of the number of children. Returns the
+    RecipeReturn assembled from the RETURNING rows, or None if the title or
+    slug is taken; the caller commits.
+    """
+    step_numbers = [step.step_number for step in recipe_data.steps]
+    if len(set(step_numbers)) != len(step_numbers):
+        raise HTTPException(status_code=400, detail="Duplicate step number")
+    names = [ingredient.name for ingredient in recipe_data.ingredients]
+    if len(set(names)) != len(names):
+        raise HTTPException(status_code=400, detail="Duplicate ingredient")
+    category_ids = resolve_category_ids(db, recipe_data.categories)
+
+    recipe = insert_unique(
+        db, Recipe, recipe_data.model_dump(include={"title", "slug", "description", "servings"})
+    )
+    if recipe is None:
+        return None
+    steps = insert_returning(
+        db,
+        Step,
+        [dict(step.model_dump(), recipe_id=recipe.id) for step in recipe_data.steps],
+        order_by="step_number",
+    )
+    ingredients = insert_returning(
+        db,
+        Ingredient,
+        [
+            with_quantity(dict(ingredient.model_dump(), recipe_id=recipe.id))
+            for ingredient in recipe_data.ingredients
+        ],
+    )
+    categories = insert_returning(
+        db,
+        RecipeCategories,
+        [
+            {"recipe_id": recipe.id, "category_id": category_id}
+            for category_id in category_ids
+        ],
+    )
+
+    set_committed_value(recipe, "steps", steps)
+    set_committed_value(recipe, "ingredients", ingredients)
+    set_committed_value(recipe, "categories", categories)
+    return RecipeReturn.model_validate(recipe)
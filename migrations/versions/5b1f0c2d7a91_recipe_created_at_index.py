@@ -0,0 +1,26 @@
+"""Recipe created_at keyset index
+
+Revision ID: 5b1f0c2d7a91
+Revises: 38044fecdfb9
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1f0c2d7a91'
+down_revision: Union[str, None] = '38044fecdfb9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_recipes_created_at_id', 'recipes', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recipes_created_at_id', table_name='recipes')
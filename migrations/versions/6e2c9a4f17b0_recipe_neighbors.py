@@ -0,0 +1,38 @@
+"""Recipe neighbors
+
+Revision ID: 6e2c9a4f17b0
+Revises: 3b8d1f6a92c4
+Create Date: 2026-10-18 23:52:40.118264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e2c9a4f17b0'
+down_revision: Union[str, None] = '3b8d1f6a92c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled by `python -m app.cli similar refresh`.
+    op.create_table('recipe_neighbors',
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('neighbor_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['neighbor_id'], ['recipes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('recipe_id', 'rank')
+    )
+    op.create_index('ix_recipe_neighbors_neighbor_id', 'recipe_neighbors', ['neighbor_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recipe_neighbors_neighbor_id', table_name='recipe_neighbors')
+    op.drop_table('recipe_neighbors')
@@ -0,0 +1,26 @@
+"""Recipe version
+
+Revision ID: 9c4e2a7b13d8
+Revises: 5b1f0c2d7a91
+Create Date: 2026-10-18 11:03:52.402761
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e2a7b13d8'
+down_revision: Union[str, None] = '5b1f0c2d7a91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('recipes', sa.Column('version', sa.Integer(), server_default=sa.text('1'), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('recipes', 'version')
@@ -0,0 +1,47 @@
+"""Ingredient unique name per recipe
+
+Revision ID: a4e9b2c61f07
+Revises: d27a6f0e4b35
+Create Date: 2026-10-18 16:02:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e9b2c61f07'
+down_revision: Union[str, None] = 'd27a6f0e4b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+DUPLICATES = sa.text(
+    "SELECT recipe_id, name, COUNT(*) AS copies FROM ingredients "
+    "GROUP BY recipe_id, name HAVING COUNT(*) > 1 ORDER BY recipe_id, name"
+)
+
+
+def upgrade() -> None:
+    # Duplicates that slipped past the old check would make the constraint
+    # fail. Which copy to keep is for whoever owns the recipe to decide, so
+    # list them and stop rather than delete anything.
+    if not op.get_context().as_sql:
+        duplicates = op.get_bind().execute(DUPLICATES).fetchall()
+        if duplicates:
+            listed = "\n".join(
+                f"  recipe_id={row.recipe_id} name={row.name!r} ({row.copies} rows)"
+                for row in duplicates
+            )
+            raise RuntimeError(
+                f"{len(duplicates)} ingredient names are used more than once in "
+                f"the same recipe; merge or rename them, then rerun the "
+                f"migration:\n{listed}"
+            )
+    op.create_unique_constraint('uq_ingredient_name_recipe', 'ingredients', ['name', 'recipe_id'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_ingredient_name_recipe', 'ingredients', type_='unique')
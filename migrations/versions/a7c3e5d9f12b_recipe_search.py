@@ -0,0 +1,48 @@
+"""Recipe full-text search index
+
+Revision ID: a7c3e5d9f12b
+Revises: a4e9b2c61f07
+Create Date: 2026-10-18 17:11:52.402871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e5d9f12b'
+down_revision: Union[str, None] = 'a4e9b2c61f07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('recipe_search',
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('document', postgresql.TSVECTOR(), nullable=False),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('recipe_id')
+    )
+    op.create_index('ix_recipe_search_document', 'recipe_search', ['document'], unique=False, postgresql_using='gin')
+    # Index the existing catalog; db.search keeps it up to date from now on.
+    op.execute(
+        """
+        INSERT INTO recipe_search (recipe_id, document)
+        SELECT r.id,
+            setweight(to_tsvector('english', r.title), 'A')
+            || setweight(to_tsvector('english', coalesce(r.description, '')), 'B')
+            || setweight(to_tsvector('english', coalesce(
+                (SELECT string_agg(i.name, ' ') FROM ingredients i WHERE i.recipe_id = r.id), '')), 'B')
+            || setweight(to_tsvector('english', coalesce(
+                (SELECT string_agg(s.step, ' ') FROM steps s WHERE s.recipe_id = r.id), '')), 'C')
+        FROM recipes r
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recipe_search_document', table_name='recipe_search', postgresql_using='gin')
+    op.drop_table('recipe_search')
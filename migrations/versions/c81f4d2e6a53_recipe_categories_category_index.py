@@ -0,0 +1,28 @@
+"""Recipe categories lookup index by category
+
+Revision ID: c81f4d2e6a53
+Revises: a7c3e5d9f12b
+Create Date: 2026-10-18 18:21:07.540193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81f4d2e6a53'
+down_revision: Union[str, None] = 'a7c3e5d9f12b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # uq_recipe_category_id covers lookups by recipe; category filters and
+    # facet counts need the reverse order.
+    op.create_index('ix_recipe_categories_category_recipe', 'recipe_categories', ['category_id', 'recipe_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recipe_categories_category_recipe', table_name='recipe_categories')
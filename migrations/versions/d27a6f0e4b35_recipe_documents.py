@@ -0,0 +1,33 @@
+"""Recipe documents
+
+Revision ID: d27a6f0e4b35
+Revises: 9c4e2a7b13d8
+Create Date: 2026-10-18 13:27:05.913518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd27a6f0e4b35'
+down_revision: Union[str, None] = '9c4e2a7b13d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('recipe_documents',
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('recipe_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('recipe_documents')
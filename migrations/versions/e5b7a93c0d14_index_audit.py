@@ -0,0 +1,49 @@
+"""Index audit: child lookup indexes, drop redundant primary key indexes
+
+Revision ID: e5b7a93c0d14
+Revises: c81f4d2e6a53
+Create Date: 2026-10-18 19:04:52.907315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b7a93c0d14'
+down_revision: Union[str, None] = 'c81f4d2e6a53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# ix_<table>_id duplicate the primary key index of every initial table.
+REDUNDANT_ID_INDEXES = {
+    'ix_category_id': 'category',
+    'ix_recipes_id': 'recipes',
+    'ix_ingredients_id': 'ingredients',
+    'ix_recipe_categories_id': 'recipe_categories',
+    'ix_steps_id': 'steps',
+}
+
+
+def upgrade() -> None:
+    # CREATE / DROP INDEX CONCURRENTLY cannot run inside a transaction block;
+    # building outside of it keeps the tables writable on Postgres. If a
+    # concurrent build fails it leaves an INVALID index behind: drop it and
+    # rerun the migration.
+    with op.get_context().autocommit_block():
+        # uq_step_number_recipe / uq_ingredient_name_recipe lead with the
+        # wrong column for "children of a recipe" lookups.
+        op.create_index('ix_steps_recipe_id_step_number', 'steps', ['recipe_id', 'step_number'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_ingredients_recipe_id_id', 'ingredients', ['recipe_id', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        for name, table in REDUNDANT_ID_INDEXES.items():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table in REDUNDANT_ID_INDEXES.items():
+            op.create_index(name, table, ['id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_ingredients_recipe_id_id', table_name='ingredients', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_steps_recipe_id_step_number', table_name='steps', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,39 @@
+"""Trigram indexes for title / ingredient name suggestions
+
+Revision ID: f29d6b81c4e7
+Revises: e5b7a93c0d14
+Create Date: 2026-10-18 20:11:36.274019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f29d6b81c4e7'
+down_revision: Union[str, None] = 'e5b7a93c0d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serve the LIKE 'x%' OR LIKE '% x%' fallback of db.suggest. Expression
+    # indexes with an operator class, so they are not declared in db.models.
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_recipes_title_trgm '
+            'ON recipes USING gin (lower(title) gin_trgm_ops)'
+        )
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ingredients_name_trgm '
+            'ON ingredients USING gin (lower(name) gin_trgm_ops)'
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_ingredients_name_trgm')
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_recipes_title_trgm')
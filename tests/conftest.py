@@ -1,2 +1,2 @@
-from .fixtures import db_session, client
+from .fixtures import db_session, client, sqlite_db_session, sqlite_client, sqlite_file_db_session, sqlite_file_clients
 from .utils.pytest_utils import pytest_collection_modifyitems
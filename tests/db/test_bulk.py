@@ -0,0 +1,234 @@
+import json
+from types import SimpleNamespace
+
+import psycopg2
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import cli
+from db.bulk import RecipeImporter, bulk_insert, read_records
+from db.models import Category, Ingredient, Recipe, RecipeCategories, Step
+from tests.utils.db_utils import count_queries
+
+
+def recipe_line(i, **overrides):
+    record = {
+        "title": f"Imported {i}",
+        "slug": f"imported-{i}",
+        "description": "Bulk",
+        "steps": [{"step_number": n, "step": f"Step {n}"} for n in (1, 2)],
+        "ingredients": [{"name": "flour", "amount": "1", "measurement": "cup"}],
+        "categories": ["baking"],
+    }
+    record.update(overrides)
+    return json.dumps(record)
+
+
+def seed_catalog(sqlite_db_session):
+    with sqlite_db_session() as db:
+        db.add(Category(name="baking"))
+        db.add(Recipe(title="Existing", slug="existing", description="Old"))
+        db.commit()
+
+
+def test_integration_bulk_import_batches_and_rejects(sqlite_db_session):
+    seed_catalog(sqlite_db_session)
+    lines = [recipe_line(i) for i in range(10)] + [
+        "{not json",
+        recipe_line(10, categories=["unknown"]),
+        recipe_line(11, slug="existing"),
+        recipe_line(12, title="Existing"),
+        recipe_line(13, title=None),
+        recipe_line(0, title="Imported again"),
+    ]
+    rejects, progress = [], []
+
+    with sqlite_db_session() as db:
+        importer = RecipeImporter(
+            db,
+            batch_size=4,
+            on_reject=rejects.append,
+            on_progress=lambda report: progress.append(report.imported),
+        )
+        report = importer.run(read_records(lines, "ndjson"))
+
+    assert (report.imported, report.rejected, report.batches) == (10, 6, 4)
+    assert progress == [4, 8, 10, 10]
+    assert sorted((r.line, r.reason) for r in rejects) == [
+        (11, "Invalid JSON: Expecting property name enclosed in double quotes: line 1 column 2 (char 1)"),
+        (12, "Category does not exist: unknown"),
+        (13, "Recipe with this Slug exists"),
+        (14, "Recipe with this title exists"),
+        (15, "title: Input should be a valid string"),
+        (16, "Recipe with this Slug exists"),
+    ]
+    with sqlite_db_session() as db:
+        assert db.query(Recipe).count() == 11
+        assert db.query(Step).count() == 20
+        assert db.query(Ingredient).count() == 10
+        assert db.query(RecipeCategories).count() == 10
+        assert {r.version for r in db.query(Recipe)} == {1}
+
+
+def test_integration_bulk_import_statements_per_batch(sqlite_db_session):
+    seed_catalog(sqlite_db_session)
+    lines = [recipe_line(i) for i in range(200)]
+
+    with count_queries(sqlite_db_session.kw["bind"]) as statements:
+        with sqlite_db_session() as db:
+            RecipeImporter(db, batch_size=200).run(read_records(lines, "ndjson"))
+
+    inserts = [s for s in statements if s.startswith("INSERT")]
+    assert len(inserts) == 4
+
+
+def test_integration_bulk_import_isolates_database_errors(sqlite_db_session):
+    seed_catalog(sqlite_db_session)
+    broken = recipe_line(1, steps=[{"step_number": 1, "step": ""}])
+    lines = [recipe_line(0), broken, recipe_line(2)]
+    rejects = []
+
+    with sqlite_db_session() as db:
+        report = RecipeImporter(db, on_reject=rejects.append).run(
+            read_records(lines, "ndjson")
+        )
+
+    assert report.imported == 2
+    assert [r.slug for r in rejects] == ["imported-1"]
+    assert "CHECK constraint failed" in rejects[0].reason
+    with sqlite_db_session() as db:
+        assert db.query(Recipe).filter(Recipe.slug == "imported-1").count() == 0
+
+
+class RecordingSession:
+    """Just enough of a Session for bulk_insert, without a database."""
+
+    def __init__(self, engine, copy_error=None):
+        self.engine = engine
+        self.executed = []
+        self.copied = []
+        self.copy_error = copy_error
+
+    def get_bind(self):
+        return self.engine
+
+    def execute(self, statement, rows):
+        self.executed.append(rows)
+
+    def connection(self):
+        return SimpleNamespace(connection=SimpleNamespace(cursor=self._cursor))
+
+    def _cursor(self):
+        def copy_expert(statement, buffer):
+            if self.copy_error is not None:
+                raise self.copy_error
+            self.copied.append(statement)
+
+        return SimpleNamespace(copy_expert=copy_expert, close=lambda: None)
+
+
+@pytest.mark.parametrize(
+    "engine, copies",
+    [
+        (create_engine("postgresql+psycopg2://user@localhost/db"), True),
+        (create_async_engine("postgresql+asyncpg://user@localhost/db").sync_engine, False),
+        (create_engine("sqlite://"), False),
+    ],
+)
+def test_unit_bulk_insert_copies_only_through_psycopg2(engine, copies):
+    db = RecordingSession(engine)
+    rows = [{"step_number": 1, "step": "Mix", "recipe_id": 1}]
+
+    bulk_insert(db, Step, rows)
+
+    assert bool(db.copied) == copies
+    assert db.executed == ([] if copies else [rows])
+
+
+def test_unit_bulk_insert_wraps_copy_errors():
+    engine = create_engine("postgresql+psycopg2://user@localhost/db")
+    db = RecordingSession(engine, psycopg2.DataError("value too long for type character varying(5)"))
+
+    with pytest.raises(DBAPIError) as raised:
+        bulk_insert(db, Ingredient, [{"name": "salt", "amount": "to taste", "recipe_id": 1}])
+
+    assert "value too long" in str(raised.value.orig)
+
+
+def test_integration_postgres_bulk_import_isolates_copy_errors(db_session):
+    with db_session() as db:
+        if not db.query(Category).filter(Category.name == "baking").count():
+            db.add(Category(name="baking"))
+            db.commit()
+    lines = [
+        recipe_line("pg-0"),
+        recipe_line("pg-1", ingredients=[{"name": "salt", "amount": "to taste"}]),
+        recipe_line("pg-2", steps=[{"step_number": 1, "step": ""}]),
+        recipe_line("pg-3"),
+    ]
+    rejects = []
+
+    try:
+        with db_session() as db:
+            report = RecipeImporter(db, on_reject=rejects.append).run(
+                read_records(lines, "ndjson")
+            )
+
+        assert report.imported == 2
+        assert [r.slug for r in rejects] == ["imported-pg-1", "imported-pg-2"]
+        with db_session() as db:
+            slugs = {slug for slug, in db.query(Recipe.slug).filter(Recipe.slug.like("imported-pg-%"))}
+            assert slugs == {"imported-pg-0", "imported-pg-3"}
+    finally:
+        with db_session() as db:
+            for recipe in db.query(Recipe).filter(Recipe.slug.like("imported-pg-%")):
+                db.delete(recipe)
+            db.commit()
+
+
+def test_integration_bulk_import_endpoint_csv(sqlite_client, sqlite_db_session):
+    seed_catalog(sqlite_db_session)
+    body = (
+        "title,slug,description,steps,ingredients,categories\n"
+        'Toast,toast,Crisp,"[{""step_number"": 1, ""step"": ""Toast""}]",[],"[""baking""]"\n'
+        "Jam,jam,Sweet,[],[],[oops\n"
+    )
+
+    response = sqlite_client.post(
+        "/recipe/bulk?format=csv", files={"file": ("recipes.csv", body)}
+    )
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["imported"], report["rejected"]) == (1, 1)
+    assert report["rejects"][0]["line"] == 3
+    assert report["rejects"][0]["reason"].startswith("Invalid JSON in categories")
+    assert sqlite_client.get("/steps/toast").json()["items"][0]["step"] == "Toast"
+
+
+def test_integration_bulk_import_endpoint_rejects_unknown_format(sqlite_client):
+    response = sqlite_client.post(
+        "/recipe/bulk?format=xml", files={"file": ("recipes.xml", "<recipes/>")}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid format"
+
+
+def test_integration_import_cli(sqlite_db_session, monkeypatch, tmp_path, capsys):
+    seed_catalog(sqlite_db_session)
+    source = tmp_path / "recipes.ndjson"
+    source.write_text("\n".join([recipe_line(0), recipe_line(1, slug="existing")]))
+    monkeypatch.setattr(cli, "SessionLocal", sqlite_db_session)
+
+    cli.main(["import", str(source)])
+
+    out, err = capsys.readouterr()
+    assert json.loads(out) == {
+        "line": 2,
+        "slug": "existing",
+        "reason": "Recipe with this Slug exists",
+    }
+    assert "Imported 1 recipes, rejected 1" in err
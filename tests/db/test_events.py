@@ -0,0 +1,61 @@
+import pytest
+
+from db import events
+from db.events import on_commit_update, rebuild_index
+from db.models import Recipe
+
+
+class RecordingIndex:
+    def __init__(self, loaded=True):
+        self.loaded = loaded
+        self.applied = []
+
+    def load(self, db):
+        self.loaded = True
+        return db.query(Recipe).count()
+
+    def clear(self):
+        self.loaded = False
+
+    def apply(self, updates):
+        self.applied.append(updates)
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = RecordingIndex()
+    monkeypatch.setattr(events, "_index_hooks", list(events._index_hooks))
+    on_commit_update(index)(
+        lambda session, recipe_ids: {recipe_id: "updated" for recipe_id in recipe_ids}
+    )
+    return index
+
+
+def test_integration_index_updates_apply_on_commit_only(index, sqlite_db_session):
+    with sqlite_db_session() as db:
+        db.add(Recipe(title="Toast", slug="toast"))
+        db.commit()
+        recipe_id = db.query(Recipe.id).scalar()
+        assert index.applied == [{recipe_id: "updated"}]
+
+        db.query(Recipe).one().title = "Rye toast"
+        db.flush()
+        db.rollback()
+        assert len(index.applied) == 1
+
+        index.loaded = False
+        db.query(Recipe).one().title = "Sourdough toast"
+        db.commit()
+        assert len(index.applied) == 1
+
+
+def test_integration_rebuild_index(index, sqlite_db_session):
+    index.loaded = False
+    assert rebuild_index(index, sqlite_db_session) == 0
+    assert index.loaded
+
+    def broken_factory():
+        raise RuntimeError("database is down")
+
+    assert rebuild_index(index, broken_factory) is None
+    assert not index.loaded
@@ -0,0 +1,36 @@
+import alembic.config
+import pytest
+from alembic import command
+from sqlalchemy import create_engine, text
+
+
+@pytest.fixture
+def migrated_sqlite(tmp_path, monkeypatch):
+    """(alembic config, engine) of an empty SQLite file to migrate."""
+    url = f"sqlite:///{tmp_path / 'migrations.db'}"
+    monkeypatch.setenv("TEST_DATABASE_URL", url)
+    config = alembic.config.Config("alembic.ini")
+    config.config_ini_section = "testdb"
+    engine = create_engine(url)
+    yield config, engine
+    engine.dispose()
+
+
+def test_integration_ingredient_unique_migration_keeps_duplicates(migrated_sqlite):
+    config, engine = migrated_sqlite
+    command.upgrade(config, "d27a6f0e4b35")
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO recipes (id, title, slug) VALUES (7, 'Toast', 'toast')"))
+        connection.execute(
+            text(
+                "INSERT INTO ingredients (name, amount, recipe_id) VALUES "
+                "('butter', '1', 7), ('butter', '2', 7), ('bread', '1', 7)"
+            )
+        )
+
+    with pytest.raises(RuntimeError) as raised:
+        command.upgrade(config, "a4e9b2c61f07")
+
+    assert "recipe_id=7 name='butter' (2 rows)" in str(raised.value)
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM ingredients")).scalar() == 3
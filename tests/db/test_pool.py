@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+from fastapi import Request, Response
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import db.db as _db
+from app.routes import stats as stats_routes
+from db.pool import (
+    Histogram,
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    async_pool_stats,
+    pool_stats,
+)
+
+
+@pytest.fixture
+def pooled_engine(tmp_path):
+    pool_stats.clear()
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    yield engine
+    engine.dispose()
+    pool_stats.clear()
+
+
+def test_unit_histogram_buckets():
+    histogram = Histogram(bounds=(1, 10))
+    for seconds in (0.0005, 0.001, 0.005, 0.5):
+        histogram.observe(seconds)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"le_1ms": 2, "le_10ms": 1, "inf": 1}
+    assert snapshot["count"] == 4
+    assert snapshot["max_ms"] == 500
+
+
+def test_integration_pool_stats_track_checkouts(pooled_engine):
+    with pooled_engine.connect() as conn:
+        conn.execute(text("select 1"))
+        stats = pool_stats.snapshot(pooled_engine.pool)
+        assert stats["checked_out"] == 1
+        assert stats["checkouts"] == 1
+
+        with pytest.raises(TimeoutError):
+            pooled_engine.connect()
+
+    stats = pool_stats.snapshot(pooled_engine.pool)
+    assert stats["checked_out"] == 0
+    assert stats["timeouts"] == 1
+    assert stats["wait"]["count"] == 2
+    assert stats["wait"]["max_ms"] >= 50
+    assert stats["hold"]["count"] == 1
+
+
+def test_integration_async_pool_stats_track_checkouts(tmp_path, monkeypatch):
+    pool_stats.clear()
+    async_pool_stats.clear()
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=1,
+        max_overflow=0,
+    )
+
+    async def query():
+        async with engine.connect() as conn:
+            await conn.execute(text("select 1"))
+        await engine.dispose()
+
+    asyncio.run(query())
+
+    stats = async_pool_stats.snapshot(engine.sync_engine.pool)
+    assert (stats["checkouts"], stats["hold"]["count"]) == (1, 1)
+    assert pool_stats.snapshot(engine.sync_engine.pool)["checkouts"] == 0
+
+    # In async mode the endpoint reports the engine serving the requests.
+    monkeypatch.setattr(stats_routes, "DATABASE_MODE", "async")
+    monkeypatch.setattr(stats_routes, "get_async_engine", lambda: engine)
+    assert stats_routes.get_pool_stats()["checkouts"] == 1
+    async_pool_stats.clear()
+
+
+def test_unit_get_db_session_closes_and_rolls_back(monkeypatch):
+    events = []
+
+    class FakeSession:
+        def __init__(self, info):
+            self.info = info
+
+        def rollback(self):
+            events.append("rollback")
+
+        def close(self):
+            events.append("close")
+
+    monkeypatch.setattr(_db, "SessionLocal", FakeSession)
+
+    request = Request({"type": "http", "method": "GET", "headers": []})
+    dependency = _db.get_db_session(request, Response())
+    assert isinstance(next(dependency), FakeSession)
+    assert events == []
+    with pytest.raises(StopIteration):
+        next(dependency)
+    assert events == ["close"]
+
+    events.clear()
+    dependency = _db.get_db_session(request, Response())
+    next(dependency)
+    with pytest.raises(ValueError):
+        dependency.throw(ValueError("handler failed"))
+    assert events == ["rollback", "close"]
+
+
+def test_unit_pool_stats_endpoint(client):
+    response = client.get("/stats/pool")
+
+    assert response.status_code == 200
+    assert set(response.json()) >= {"size", "checked_out", "overflow", "wait", "hold"}
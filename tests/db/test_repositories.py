@@ -0,0 +1,31 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from db import repositories
+from db.db import AsyncSessionLocal
+from db.repositories import IngredientRepo, RecipeCategoriesRepo, RecipeRepo
+from tests.utils.db_utils import seed_recipes
+
+
+def test_integration_repositories_clamp_page_size(sqlite_file_db_session, monkeypatch):
+    with sqlite_file_db_session() as db:
+        seed_recipes(db, 3)
+    monkeypatch.setattr(repositories, "MAX_PAGE_SIZE", 2)
+    url = sqlite_file_db_session.kw["bind"].url.set(drivername="sqlite+aiosqlite")
+    engine = create_async_engine(url)
+
+    async def fetch_all():
+        try:
+            async with AsyncSessionLocal(bind=engine) as db:
+                return [
+                    await IngredientRepo.fetch_all_ingredients(db, limit=1000),
+                    await RecipeCategoriesRepo.fetch_all_categories(db, limit=1000),
+                    await RecipeRepo.fetch_all_recipes(db, limit=1000),
+                ]
+        finally:
+            await engine.dispose()
+
+    for page in asyncio.run(fetch_all()):
+        assert len(page["items"]) == 2
+        assert page["next_cursor"] is not None
@@ -0,0 +1,142 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import db.db as _db
+from app.main import app
+from app.routes import recipes_async
+from db.cache import slug_cache
+from db.models import Base, Recipe
+from db.routing import STICKY_PRIMARY_COOKIE, ReplicaSet, RoutingSession
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def file_engine(path):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def add_recipe(engine, slug):
+    with sessionmaker(bind=engine)() as db:
+        db.add(Recipe(title=slug, slug=slug, description=slug))
+        db.commit()
+
+
+@pytest.fixture
+def routed_client(tmp_path, monkeypatch):
+    primary = file_engine(tmp_path / "primary.db")
+    replica = file_engine(tmp_path / "replica.db")
+    replicas = ReplicaSet([replica])
+    monkeypatch.setattr(_db, "replicas", replicas)
+    monkeypatch.setattr(
+        _db,
+        "SessionLocal",
+        sessionmaker(class_=RoutingSession, replicas=replicas, bind=primary),
+    )
+
+    slug_cache.clear()
+    with TestClient(app) as client:
+        yield client, primary, replica
+    slug_cache.clear()
+    primary.dispose()
+    replica.dispose()
+
+
+def test_integration_reads_go_to_replica(routed_client):
+    client, primary, replica = routed_client
+    add_recipe(replica, "on-replica")
+
+    assert client.get("/recipe/on-replica").status_code == 200
+
+
+def test_integration_writes_stick_to_primary(routed_client):
+    client, primary, replica = routed_client
+
+    response = client.post(
+        "/recipe", json={"title": "Soup", "slug": "soup", "description": "Hot"}
+    )
+    assert response.status_code == 201
+    assert STICKY_PRIMARY_COOKIE in response.cookies
+
+    # The replica has not caught up, but the writer reads from the primary.
+    assert client.get("/steps/soup").status_code == 200
+
+    client.cookies.clear()
+    assert client.get("/steps/soup").status_code == 404
+
+
+def test_integration_unhealthy_replica_falls_back_to_primary(routed_client, tmp_path):
+    client, primary, replica = routed_client
+    add_recipe(primary, "on-primary")
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    _db.replicas.replicas[0].engine = broken
+
+    assert client.get("/recipe/on-primary").status_code == 200
+
+
+@pytest.fixture
+def async_routed_client(tmp_path, monkeypatch):
+    primary = file_engine(tmp_path / "primary.db")
+    replica = file_engine(tmp_path / "replica.db")
+    async_primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    async_replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setattr(_db, "get_async_engine", lambda: async_primary)
+    replicas = ReplicaSet([async_replica.sync_engine])
+    monkeypatch.setattr(_db, "get_async_replicas", lambda: replicas)
+
+    async_app = FastAPI()
+    async_app.include_router(recipes_async.router)
+    slug_cache.clear()
+    with TestClient(async_app) as client:
+        yield client, primary, replica
+    slug_cache.clear()
+    primary.dispose()
+    replica.dispose()
+
+
+def test_integration_async_reads_go_to_replica(async_routed_client):
+    client, primary, replica = async_routed_client
+    add_recipe(replica, "on-replica")
+
+    assert client.get("/recipe/on-replica").status_code == 200
+
+
+def test_integration_async_writes_stick_to_primary(async_routed_client):
+    client, primary, replica = async_routed_client
+
+    response = client.post(
+        "/recipe", json={"title": "Soup", "slug": "soup", "description": "Hot"}
+    )
+    assert response.status_code == 201
+    assert STICKY_PRIMARY_COOKIE in response.cookies
+    assert client.get("/steps/soup").status_code == 200
+
+    client.cookies.clear()
+    assert client.get("/steps/soup").status_code == 404
+
+
+def test_unit_replica_set_round_robin_skips_unhealthy(tmp_path):
+    clock = FakeClock()
+    first = file_engine(tmp_path / "first.db")
+    second = file_engine(tmp_path / "second.db")
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'broken.db'}")
+    replicas = ReplicaSet([first, broken, second], health_interval=10, clock=clock)
+
+    assert [replicas.pick() for _ in range(4)] == [first, second, first, second]
+    assert [status["healthy"] for status in replicas.status()] == [True, False, True]
+
+    clock.now = 11
+    replicas.replicas[1].engine = first
+    assert first in {replicas.pick() for _ in range(3)}
+    assert all(status["healthy"] for status in replicas.status())
@@ -0,0 +1,84 @@
+from db.cache import SlugCache
+from tests.utils.db_utils import count_queries, seed_recipes
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_unit_slug_cache_hit_and_miss():
+    cache = SlugCache(maxsize=10, ttl=60, negative_ttl=5)
+
+    assert cache.get("pancakes") == (False, None)
+    cache.set("pancakes", 7)
+    assert cache.get("pancakes") == (True, 7)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_unit_slug_cache_negative_entries_expire_sooner():
+    clock = FakeClock()
+    cache = SlugCache(maxsize=10, ttl=60, negative_ttl=5, clock=clock)
+    cache.set("pancakes", 7)
+    cache.set_missing("waffles")
+
+    assert cache.get("waffles") == (True, None)
+    clock.now = 10
+    assert cache.get("waffles") == (False, None)
+    assert cache.get("pancakes") == (True, 7)
+    clock.now = 61
+    assert cache.get("pancakes") == (False, None)
+
+
+def test_unit_slug_cache_evicts_least_recently_used():
+    cache = SlugCache(maxsize=2, ttl=60, negative_ttl=5)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_unit_slug_cache_invalidate_by_recipe_id():
+    cache = SlugCache(maxsize=10, ttl=60, negative_ttl=5)
+    cache.set("pancakes", 7)
+    cache.invalidate(recipe_id=7)
+
+    assert cache.get("pancakes") == (False, None)
+    assert cache.stats()["size"] == 0
+
+
+def test_integration_cached_slug_skips_recipe_lookup(sqlite_client, sqlite_db_session):
+    with sqlite_db_session() as db:
+        seed_recipes(db, 2)
+
+    engine = sqlite_db_session.kw["bind"]
+    sqlite_client.get("/steps/recipe-1")
+    with count_queries(engine) as statements:
+        response = sqlite_client.get("/ingredient/recipe-1")
+
+    assert len(response.json()["items"]) == 3
+    assert len(statements) == 1
+    assert "recipes.slug" not in statements[0]
+
+
+def test_integration_unknown_slug_is_negatively_cached(
+    sqlite_client, sqlite_db_session
+):
+    engine = sqlite_db_session.kw["bind"]
+    assert sqlite_client.get("/recipe/pancakes").status_code == 404
+    with count_queries(engine) as statements:
+        assert sqlite_client.get("/steps/pancakes").status_code == 404
+    assert statements == []
+
+    body = {"title": "Pancakes", "slug": "pancakes", "description": "Fluffy"}
+    assert sqlite_client.post("/recipe", json=body).status_code == 201
+    assert sqlite_client.get("/steps/pancakes").status_code == 200
+    assert sqlite_client.get("/stats/slug-cache").json()["negative_hits"] == 1
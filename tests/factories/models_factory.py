@@ -24,6 +24,7 @@ def get_random_recipe_dict(id_: int = None):
         "title": faker.word(),
         "slug": faker.slug(),
         "description": faker.text(15),
+        "servings": None,
         "categories": [],
         "ingredients": [],
         "steps": [],
@@ -39,6 +40,9 @@ def get_random_ingredient_dict(id_: int = None):
         "amount": faker.text(5),
         "measurement": faker.text(10),
         "recipe_id": faker.random_int(1, 1),
+        "quantity": None,
+        "quantity_max": None,
+        "unit": None,
     }
 
 
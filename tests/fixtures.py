@@ -3,10 +3,18 @@ import os
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import create_async_engine
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from tests.utils.db_utils import migrate_to_db
 from tests.utils.docker_utils import start_db_container
 from app.main import app
+from app.routes import recipes, recipes_async
+from db.cache import slug_cache
+from db.dedupe import duplicate_index
+from db.db import AsyncSessionLocal, get_async_db_session, get_db_session
+from db.models import Base
 
 @pytest.fixture(scope="session")
 def db_session():
@@ -27,5 +35,84 @@ def db_session():
 
 @pytest.fixture(scope="function")
 def client():
+    slug_cache.clear()
     with TestClient(app) as _client:
-        yield _client
\ No newline at end of file
+        yield _client
+
+def clear_indexes():
+    # In-memory indexes load lazily from whichever database is used first.
+    duplicate_index.clear()
+
+@pytest.fixture(scope="function")
+def sqlite_db_session():
+    clear_indexes()
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+
+    SessionLocal = sessionmaker(autocommit=False, autoflush=True, bind=engine)
+
+    yield SessionLocal
+
+    engine.dispose()
+
+@pytest.fixture(scope="function")
+def sqlite_client(sqlite_db_session):
+    def _get_db_session():
+        db = sqlite_db_session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    slug_cache.clear()
+    app.dependency_overrides[get_db_session] = _get_db_session
+    with TestClient(app) as _client:
+        yield _client
+    app.dependency_overrides.clear()
+
+@pytest.fixture(scope="function")
+def sqlite_file_db_session(tmp_path):
+    clear_indexes()
+    # A file database, so the sync and the aiosqlite engine see the same data.
+    engine = create_engine(f"sqlite:///{tmp_path / 'cookbook.db'}")
+    Base.metadata.create_all(engine)
+
+    SessionLocal = sessionmaker(autocommit=False, autoflush=True, bind=engine)
+
+    yield SessionLocal
+
+    engine.dispose()
+
+@pytest.fixture(scope="function")
+def sqlite_file_clients(sqlite_file_db_session):
+    """(sync, async) clients serving the same SQLite file."""
+    url = sqlite_file_db_session.kw["bind"].url.set(drivername="sqlite+aiosqlite")
+    async_engine = create_async_engine(url)
+
+    def _get_db_session():
+        db = sqlite_file_db_session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def _get_async_db_session():
+        async with AsyncSessionLocal(bind=async_engine) as db:
+            yield db
+
+    sync_app, async_app = FastAPI(), FastAPI()
+    sync_app.include_router(recipes.router)
+    async_app.include_router(recipes_async.router)
+    sync_app.dependency_overrides[get_db_session] = _get_db_session
+    async_app.dependency_overrides[get_async_db_session] = _get_async_db_session
+    # The async bulk import runs on a worker thread with a sync session.
+    async_app.dependency_overrides[get_db_session] = _get_db_session
+
+    slug_cache.clear()
+    with TestClient(sync_app) as sync_client, TestClient(async_app) as async_client:
+        yield sync_client, async_client
+    slug_cache.clear()
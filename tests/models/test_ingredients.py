@@ -113,9 +113,9 @@ def test_model_structure_column_lengths(db_inspector):
 - [ ]  Validate the enforcement of unique constraints for columns requiring unique values.
 """
 
-# def test_model_structure_unique_constraints(db_inspector):
-#     table = "ingredients"
-#     constraints = db_inspector.get_unique_constraints(table)
+def test_model_structure_unique_constraints(db_inspector):
+    table = "ingredients"
+    constraints = db_inspector.get_unique_constraints(table)
 
-#     assert any(constraint["name"] == "uq_recipe_title" for constraint in constraints)
+    assert any(constraint["name"] == "uq_ingredient_name_recipe" for constraint in constraints)
     
@@ -29,6 +29,7 @@ def test_model_structure_column_data_types(db_inspector):
     assert isinstance(columns["description"]["type"], String)
     assert isinstance(columns["created_at"]["type"], DateTime)
     assert isinstance(columns["updated_at"]["type"], DateTime)
+    assert isinstance(columns["version"]["type"], Integer)
     
 # """
 # - [ ] Ensure that column foreign keys are correctly defined.
@@ -66,6 +67,7 @@ def test_model_structure_nullable_constraints(db_inspector):
         "directions": True,
         "created_at": False,
         "updated_at": False,
+        "version": False,
     }
 
     for column in columns:
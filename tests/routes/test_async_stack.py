@@ -0,0 +1,96 @@
+import pytest
+
+from db.models import Recipe
+from tests.utils.db_utils import seed_recipes
+
+
+PATHS = [
+    "/recipe",
+    "/recipe?limit=2&sort=-created_at",
+    "/recipe?fields=slug,title&include=steps",
+    "/recipe?category=category-0&category=category-1&limit=2",
+    "/recipe?facets=true&fields=slug",
+    "/recipe/recipe-1",
+    "/recipe/recipe-1?fields=title",
+    "/recipe/missing",
+    "/steps/recipe-1",
+    "/ingredient/recipe-2",
+    "/category/recipe-0",
+    "/category",
+    "/recipe/export",
+    "/recipe/pantry?ingredient=ingredient-0&ingredient=ingredient-1&limit=3",
+]
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_integration_async_stack_matches_sync(
+    sqlite_file_clients, sqlite_file_db_session, path
+):
+    with sqlite_file_db_session() as db:
+        seed_recipes(db, 4)
+
+    sync_client, async_client = sqlite_file_clients
+    expected = sync_client.get(path)
+    actual = async_client.get(path)
+
+    assert actual.status_code == expected.status_code
+    assert actual.content == expected.content
+    assert actual.headers.get("etag") == expected.headers.get("etag")
+
+
+def test_integration_async_conditional_get(sqlite_file_clients, sqlite_file_db_session):
+    with sqlite_file_db_session() as db:
+        seed_recipes(db, 2)
+
+    _, async_client = sqlite_file_clients
+    etag = async_client.get("/recipe/recipe-1").headers["etag"]
+
+    response = async_client.get("/recipe/recipe-1", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+
+
+def test_integration_async_writes(sqlite_file_clients, sqlite_file_db_session):
+    _, async_client = sqlite_file_clients
+
+    response = async_client.post(
+        "/recipe", json={"title": "Soup", "slug": "soup", "description": "Hot"}
+    )
+    assert response.status_code == 201
+    assert response.json()["ingredients"] == []
+
+    recipe_id = response.json()["id"]
+    response = async_client.post(
+        "/step", json={"step_number": 1, "step": "Boil", "recipe_id": recipe_id}
+    )
+    assert response.status_code == 201
+
+    duplicate = async_client.post(
+        "/recipe", json={"title": "Soup", "slug": "soup", "description": "Hot"}
+    )
+    assert duplicate.status_code == 400
+
+    with sqlite_file_db_session() as db:
+        recipe = db.query(Recipe).filter(Recipe.slug == "soup").one()
+        assert recipe.version == 2
+        assert [step.step for step in recipe.steps] == ["Boil"]
+
+
+def test_integration_async_bulk_import(sqlite_file_clients, sqlite_file_db_session):
+    _, async_client = sqlite_file_clients
+    body = "\n".join(
+        [
+            '{"title": "Soup", "slug": "soup", "description": "Hot"}',
+            '{"title": "Stew", "slug": "stew"',
+            '{"title": "Salad", "slug": "salad", "description": "Cold"}',
+        ]
+    )
+
+    response = async_client.post("/recipe/bulk", files={"file": ("recipes.ndjson", body)})
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["imported"], report["rejected"]) == (2, 1)
+    assert report["rejects"][0]["line"] == 2
+    with sqlite_file_db_session() as db:
+        assert {slug for slug, in db.query(Recipe.slug)} == {"soup", "salad"}
@@ -0,0 +1,90 @@
+import pytest
+
+from db.models import Recipe
+from tests.utils.db_utils import count_queries, seed_recipes
+
+
+def add_step(client, recipe_id, step_number=10):
+    body = {"step_number": step_number, "step": "Serve", "recipe_id": recipe_id}
+    assert client.post("/step", json=body).status_code == 201
+
+
+@pytest.mark.parametrize(
+    "path", ["/recipe/recipe-0", "/steps/recipe-0", "/ingredient/recipe-0", "/recipe"]
+)
+def test_integration_if_none_match_returns_304(sqlite_client, sqlite_db_session, path):
+    with sqlite_db_session() as db:
+        seed_recipes(db, 3)
+
+    response = sqlite_client.get(path)
+    etag = response.headers["etag"]
+    assert response.headers["last-modified"].endswith("GMT")
+
+    engine = sqlite_db_session.kw["bind"]
+    with count_queries(engine) as statements:
+        revalidated = sqlite_client.get(path, headers={"If-None-Match": etag})
+
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    assert revalidated.content == b""
+    assert len(statements) == 1
+    assert "steps" not in statements[0] and "ingredients" not in statements[0]
+
+
+@pytest.mark.parametrize("path", ["/recipe/recipe-0", "/steps/recipe-0", "/recipe"])
+def test_integration_child_insert_changes_etag(sqlite_client, sqlite_db_session, path):
+    with sqlite_db_session() as db:
+        recipe_id = seed_recipes(db, 3)[0].id
+
+    etag = sqlite_client.get(path).headers["etag"]
+    add_step(sqlite_client, recipe_id)
+
+    response = sqlite_client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_integration_child_insert_bumps_recipe_version(sqlite_client, sqlite_db_session):
+    with sqlite_db_session() as db:
+        recipe_id = seed_recipes(db, 1)[0].id
+
+    add_step(sqlite_client, recipe_id)
+    add_step(sqlite_client, recipe_id, step_number=11)
+
+    with sqlite_db_session() as db:
+        assert db.get(Recipe, recipe_id).version == 3
+
+
+def test_integration_etag_depends_on_projection(sqlite_client, sqlite_db_session):
+    with sqlite_db_session() as db:
+        seed_recipes(db, 1)
+
+    full = sqlite_client.get("/recipe/recipe-0").headers["etag"]
+    slim = sqlite_client.get("/recipe/recipe-0", params={"fields": "slug"})
+
+    assert slim.headers["etag"] != full
+    response = sqlite_client.get(
+        "/recipe/recipe-0", params={"fields": "slug"}, headers={"If-None-Match": full}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize(
+    "since, status_code",
+    [("Fri, 01 Jan 2100 00:00:00 GMT", 304), ("Sat, 01 Jan 2000 00:00:00 GMT", 200)],
+)
+def test_integration_if_modified_since(
+    sqlite_client, sqlite_db_session, since, status_code
+):
+    with sqlite_db_session() as db:
+        seed_recipes(db, 1)
+
+    response = sqlite_client.get(
+        "/recipe/recipe-0", headers={"If-Modified-Since": since}
+    )
+    assert response.status_code == status_code
+
+
+def test_integration_conditional_get_on_missing_recipe(sqlite_client):
+    response = sqlite_client.get("/recipe/nope", headers={"If-None-Match": '"x"'})
+    assert response.status_code == 404
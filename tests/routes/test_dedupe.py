@@ -0,0 +1,161 @@
+import io
+import json
+
+import pytest
+
+from app import cli
+from db.bulk import RecipeImporter, read_records
+from db.dedupe import DuplicateIndex, duplicate_index, recipe_signature, similarity
+
+
+COOKIE_INGREDIENTS = ["flour", "butter", "sugar", "eggs", "chocolate chips", "vanilla"]
+COOKIE_STEPS = [
+    "Cream the butter and sugar until pale",
+    "Beat in the eggs and vanilla",
+    "Fold in the flour and chocolate chips",
+    "Bake for 12 minutes at 180C",
+]
+
+
+def cookies(title, slug):
+    return {
+        "title": title,
+        "slug": slug,
+        "ingredients": [{"name": name, "amount": "1"} for name in COOKIE_INGREDIENTS],
+        "steps": [
+            {"step_number": number, "step": step}
+            for number, step in enumerate(COOKIE_STEPS, 1)
+        ],
+    }
+
+
+def soup(title, slug):
+    return {
+        "title": title,
+        "slug": slug,
+        "ingredients": [{"name": "leek", "amount": "2"}, {"name": "potato", "amount": "3"}],
+        "steps": [{"step_number": 1, "step": "Simmer the leeks and potatoes, then blend"}],
+    }
+
+
+@pytest.fixture
+def loaded_index(sqlite_client, sqlite_db_session):
+    response = sqlite_client.post(
+        "/recipe/nested", json=cookies("Chocolate Chip Cookies", "chocolate-chip-cookies")
+    )
+    assert response.status_code == 201
+    with sqlite_db_session() as db:
+        duplicate_index.load(db)
+    yield duplicate_index
+    duplicate_index.clear()
+
+
+def test_unit_signatures_estimate_similarity():
+    original = recipe_signature("Chocolate Chip Cookies", COOKIE_INGREDIENTS, COOKIE_STEPS)
+    variant = recipe_signature("Choc-chip cookies", COOKIE_INGREDIENTS[:-1], COOKIE_STEPS)
+    other = recipe_signature("Leek soup", ["leek", "potato"], ["Simmer, then blend"])
+
+    assert similarity(original, original) == 1.0
+    assert similarity(original, variant) >= 0.6
+    assert similarity(original, other) < 0.2
+
+
+def test_unit_duplicate_index_applies_versioned_updates():
+    index = DuplicateIndex()
+    index.loaded = True
+    signature = recipe_signature("Chocolate Chip Cookies", COOKIE_INGREDIENTS, COOKIE_STEPS)
+
+    index.apply({1: (1, "cookies", "Chocolate Chip Cookies", COOKIE_INGREDIENTS, COOKIE_STEPS)})
+    assert [match.slug for match in index.matches(signature)] == ["cookies"]
+    assert index.matches(signature, exclude_slug="cookies") == []
+
+    index.apply({1: (3, "soup", "Leek soup", ["leek", "potato"], [])})
+    index.apply({1: (2, "cookies", "Chocolate Chip Cookies", COOKIE_INGREDIENTS, COOKIE_STEPS)})
+    assert index.matches(signature) == []
+
+    index.apply({1: None})
+    assert index.stats() == {"loaded": True, "recipes": 0, "buckets": 0}
+
+
+def test_integration_create_flags_possible_duplicates(sqlite_client, loaded_index):
+    response = sqlite_client.post(
+        "/recipe/nested", json=cookies("Choc-chip cookies", "choc-chip-cookies")
+    )
+    assert response.status_code == 201
+    assert response.headers["x-possible-duplicates"] == "chocolate-chip-cookies"
+
+    response = sqlite_client.post("/recipe/nested", json=soup("Leek soup", "leek-soup"))
+    assert response.status_code == 201
+    assert "x-possible-duplicates" not in response.headers
+
+    # The index followed the first create: a third copy matches both.
+    response = sqlite_client.post(
+        "/recipe/nested", json=cookies("Chocolate chip cookie", "chocolate-chip-cookie")
+    )
+    assert set(response.headers["x-possible-duplicates"].split(",")) == {
+        "chocolate-chip-cookies",
+        "choc-chip-cookies",
+    }
+
+
+def test_integration_title_only_create_flags_similar_titles(sqlite_client, loaded_index):
+    response = sqlite_client.post(
+        "/recipe", json={"title": "Chocolate chip cookies!", "slug": "cookies-again"}
+    )
+    assert response.status_code == 201
+    assert response.headers["x-possible-duplicates"] == "chocolate-chip-cookies"
+
+    response = sqlite_client.post("/recipe", json={"title": "Leek soup", "slug": "leek-soup"})
+    assert response.status_code == 201
+    assert "x-possible-duplicates" not in response.headers
+
+    # On full signatures the title alone is too far from the recipe that
+    # has ingredients and steps: that is what the title signatures are for.
+    signature = recipe_signature("Chocolate Chip Cookies", [], [])
+    assert [match.slug for match in loaded_index.matches(signature)] == ["cookies-again"]
+
+
+def test_integration_bulk_import_reports_duplicates(sqlite_client, sqlite_db_session):
+    sqlite_client.post(
+        "/recipe/nested", json=cookies("Chocolate Chip Cookies", "chocolate-chip-cookies")
+    )
+    lines = [
+        json.dumps(cookies("Choc-chip cookies", "choc-chip-cookies")),
+        json.dumps(soup("Leek soup", "leek-soup")),
+        json.dumps(soup("Leek & potato soup", "leek-and-potato-soup")),
+    ]
+
+    flagged = []
+    with sqlite_db_session() as db:
+        report = RecipeImporter(db, on_duplicate=flagged.append).run(
+            read_records(io.StringIO("\n".join(lines)), "ndjson")
+        )
+
+    assert (report.imported, report.duplicates) == (3, 2)
+    assert [(d.line, d.slug, d.duplicate_of) for d in flagged] == [
+        (1, "choc-chip-cookies", "chocolate-chip-cookies"),
+        (3, "leek-and-potato-soup", "leek-soup"),
+    ]
+    duplicate_index.clear()
+
+
+def test_integration_dedupe_report_cli(
+    sqlite_client, sqlite_db_session, monkeypatch, capsys
+):
+    for recipe in (
+        cookies("Chocolate Chip Cookies", "chocolate-chip-cookies"),
+        soup("Leek soup", "leek-soup"),
+        cookies("Choc-chip cookies", "choc-chip-cookies"),
+    ):
+        sqlite_client.post("/recipe/nested", json=recipe)
+
+    monkeypatch.setattr(cli, "SessionLocal", sqlite_db_session)
+    cli.main(["dedupe", "report", "--workers", "1", "--batch-size", "2"])
+
+    out, err = capsys.readouterr()
+    pairs = [json.loads(line) for line in out.splitlines()]
+    assert [(p["slug"], p["duplicate_of"]) for p in pairs] == [
+        ("choc-chip-cookies", "chocolate-chip-cookies")
+    ]
+    assert pairs[0]["similarity"] >= 0.6
+    assert "1 probable duplicate pairs" in err
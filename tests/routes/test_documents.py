@@ -0,0 +1,80 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from db import documents
+from db.documents import rebuild_documents
+from db.models import Base, RecipeDocument
+from tests.utils.db_utils import count_queries, seed_recipes
+
+
+@pytest.fixture
+def documents_mode(monkeypatch):
+    monkeypatch.setattr(documents, "RECIPE_DOCUMENTS_MODE", "transactional")
+
+
+def test_integration_documents_match_live_responses(
+    sqlite_client, sqlite_db_session, monkeypatch
+):
+    with sqlite_db_session() as db:
+        seed_recipes(db, 4)
+    live_recipe = sqlite_client.get("/recipe/recipe-2")
+    live_page = sqlite_client.get("/recipe", params={"limit": 3})
+
+    monkeypatch.setattr(documents, "RECIPE_DOCUMENTS_MODE", "transactional")
+    rebuild_documents(sqlite_db_session, workers=1)
+
+    engine = sqlite_db_session.kw["bind"]
+    with count_queries(engine) as statements:
+        recipe = sqlite_client.get("/recipe/recipe-2")
+        page = sqlite_client.get("/recipe", params={"limit": 3})
+
+    assert recipe.content == live_recipe.content
+    assert recipe.headers["etag"] == live_recipe.headers["etag"]
+    assert page.content == live_page.content
+    assert page.headers["etag"] == live_page.headers["etag"]
+    assert len(statements) == 2
+
+
+def test_integration_child_write_refreshes_document(
+    sqlite_client, sqlite_db_session, documents_mode
+):
+    with sqlite_db_session() as db:
+        recipe_id = seed_recipes(db, 1)[0].id
+
+    body = {"step_number": 9, "step": "Rest", "recipe_id": recipe_id}
+    assert sqlite_client.post("/step", json=body).status_code == 201
+
+    with sqlite_db_session() as db:
+        document = db.get(RecipeDocument, recipe_id)
+        assert document.version == 2
+        assert json.loads(document.body)["steps"][-1]["step"] == "Rest"
+    assert sqlite_client.get("/recipe/recipe-0").json()["steps"][-1]["step"] == "Rest"
+
+
+def test_integration_stale_document_falls_back_to_graph(
+    sqlite_client, sqlite_db_session, documents_mode
+):
+    with sqlite_db_session() as db:
+        recipe = seed_recipes(db, 1)[0]
+        db.get(RecipeDocument, recipe.id).version = 0
+        db.commit()
+
+    response = sqlite_client.get("/recipe/recipe-0")
+    assert response.status_code == 200
+    assert response.json()["title"] == "Recipe 0"
+    assert sqlite_client.get("/recipe/nope").status_code == 404
+
+
+def test_integration_rebuild_documents_in_parallel_batches(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'documents.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        seed_recipes(db, 25)
+
+    assert rebuild_documents(Session, batch_size=4, workers=3) == 25
+    with Session() as db:
+        assert db.query(RecipeDocument).count() == 25
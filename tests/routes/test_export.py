@@ -0,0 +1,41 @@
+import json
+
+from db.export import iter_recipes_ndjson
+from tests.utils.db_utils import seed_recipes
+
+
+def test_integration_export_streams_every_recipe_as_ndjson(
+    sqlite_client, sqlite_db_session
+):
+    with sqlite_db_session() as db:
+        seed_recipes(db, 12)
+
+    response = sqlite_client.get("/recipe/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json.loads(line)["slug"] for line in lines] == [
+        f"recipe-{i}" for i in range(12)
+    ]
+    assert json.loads(lines[0]) == sqlite_client.get("/recipe/recipe-0").json()
+
+
+def test_integration_export_keeps_identity_map_bounded(sqlite_db_session):
+    with sqlite_db_session() as db:
+        seed_recipes(db, 40, children=2)
+
+    with sqlite_db_session() as db:
+        sizes = []
+        for chunk in iter_recipes_ndjson(db, batch_size=5):
+            assert len(chunk.splitlines()) == 5
+            sizes.append(len(db.identity_map))
+
+    assert len(sizes) == 8
+    assert max(sizes) == 0
+
+
+def test_integration_export_of_empty_catalog(sqlite_client):
+    response = sqlite_client.get("/recipe/export")
+    assert response.status_code == 200
+    assert response.text == ""
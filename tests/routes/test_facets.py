@@ -0,0 +1,125 @@
+from sqlalchemy import text
+
+from db.cache import facet_cache
+from db.models import Category, Recipe, RecipeCategories
+from tests.utils.db_utils import count_queries
+
+
+def seed_catalog(sqlite_db_session):
+    # soup: vegan, quick; stew: vegan; cake: dessert, quick; salad: none
+    with sqlite_db_session() as db:
+        names = ["vegan", "quick", "dessert", "brunch"]
+        categories = {name: Category(name=name) for name in names}
+        db.add_all(categories.values())
+        db.flush()
+        for slug, tags in [
+            ("soup", ["vegan", "quick"]),
+            ("stew", ["vegan"]),
+            ("cake", ["dessert", "quick"]),
+            ("salad", []),
+        ]:
+            recipe = Recipe(title=slug.title(), slug=slug, description="Good")
+            recipe.categories = [
+                RecipeCategories(category_id=categories[tag].id) for tag in tags
+            ]
+            db.add(recipe)
+        db.commit()
+
+
+def slugs(body):
+    return [recipe["slug"] for recipe in body["items"]]
+
+
+def counts(body):
+    return {facet["name"]: facet["count"] for facet in body["facets"]}
+
+
+def test_integration_category_filter_all_and_any(sqlite_client, sqlite_db_session):
+    seed_catalog(sqlite_db_session)
+
+    body = sqlite_client.get("/recipe", params={"category": ["vegan", "quick"]}).json()
+    assert slugs(body) == ["soup"]
+    assert counts(body) == {"brunch": 0, "dessert": 0, "quick": 1, "vegan": 1}
+
+    body = sqlite_client.get(
+        "/recipe", params={"category": ["vegan", "quick"], "category_match": "any"}
+    ).json()
+    assert slugs(body) == ["soup", "stew", "cake"]
+    assert counts(body) == {"brunch": 0, "dessert": 1, "quick": 2, "vegan": 2}
+
+    body = sqlite_client.get("/recipe", params={"facets": "true"}).json()
+    assert slugs(body) == ["soup", "stew", "cake", "salad"]
+    assert [facet["name"] for facet in body["facets"]] == [
+        "brunch",
+        "dessert",
+        "quick",
+        "vegan",
+    ]
+    assert "facets" not in sqlite_client.get("/recipe").json()
+
+
+def test_integration_category_filter_paginates(sqlite_client, sqlite_db_session):
+    seed_catalog(sqlite_db_session)
+    params = {"category": "vegan", "limit": 1}
+
+    first = sqlite_client.get("/recipe", params=params).json()
+    second = sqlite_client.get(
+        "/recipe", params=dict(params, cursor=first["next_cursor"])
+    ).json()
+
+    assert slugs(first) + slugs(second) == ["soup", "stew"]
+    assert second["next_cursor"] is None
+    assert counts(second)["vegan"] == 2
+
+
+def test_integration_category_filter_rejects_bad_input(sqlite_client, sqlite_db_session):
+    seed_catalog(sqlite_db_session)
+
+    response = sqlite_client.get("/recipe", params={"category": "paleo"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Category does not exist: paleo"}
+
+    response = sqlite_client.get(
+        "/recipe", params={"category": "vegan", "category_match": "most"}
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid category_match"}
+
+
+def test_integration_facet_counts_are_cached_until_commit(
+    sqlite_client, sqlite_db_session
+):
+    seed_catalog(sqlite_db_session)
+    facet_cache.clear()
+    engine = sqlite_db_session.kw["bind"]
+
+    sqlite_client.get("/recipe", params={"category": "quick"})
+    with count_queries(engine) as statements:
+        body = sqlite_client.get("/recipe", params={"category": "quick"}).json()
+    assert not [s for s in statements if "GROUP BY" in s]
+    assert counts(body)["dessert"] == 1
+
+    with sqlite_db_session() as db:
+        soup = db.query(Recipe).filter(Recipe.slug == "soup").one()
+        dessert = db.query(Category).filter(Category.name == "dessert").one()
+        soup.categories.append(RecipeCategories(category_id=dessert.id))
+        db.commit()
+
+    body = sqlite_client.get("/recipe", params={"category": "quick"}).json()
+    assert counts(body)["dessert"] == 2
+
+    response = sqlite_client.post("/category", json={"name": "autumn"})
+    assert response.status_code == 201
+    body = sqlite_client.get("/recipe", params={"category": "quick"}).json()
+    assert counts(body)["autumn"] == 0
+
+
+def test_integration_category_filter_uses_category_index(sqlite_db_session):
+    with sqlite_db_session() as db:
+        plan = db.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT recipe_id FROM recipe_categories "
+                "WHERE category_id IN (1, 2)"
+            )
+        ).all()
+    assert "ix_recipe_categories_category_recipe" in " ".join(row[-1] for row in plan)
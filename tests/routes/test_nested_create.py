@@ -0,0 +1,100 @@
+from db.models import Category, Recipe
+from tests.utils.db_utils import count_queries
+
+
+def nested_recipe(steps=15, **overrides):
+    payload = {
+        "title": "Lasagne",
+        "slug": "lasagne",
+        "description": "Layered",
+        "steps": [
+            {"step_number": n, "step": f"Step {n}"} for n in range(steps, 0, -1)
+        ],
+        "ingredients": [
+            {"name": f"ingredient-{n}", "amount": "1", "measurement": "cup"}
+            for n in range(5)
+        ],
+        "categories": ["dinner", "italian", "dinner"],
+    }
+    payload.update(overrides)
+    return payload
+
+
+def seed_categories(sqlite_db_session):
+    with sqlite_db_session() as db:
+        db.add_all([Category(name="dinner"), Category(name="italian")])
+        db.commit()
+
+
+def test_integration_nested_create_returns_graph(sqlite_client, sqlite_db_session):
+    seed_categories(sqlite_db_session)
+
+    response = sqlite_client.post("/recipe/nested", json=nested_recipe())
+
+    assert response.status_code == 201
+    body = response.json()
+    assert [step["step_number"] for step in body["steps"]] == list(range(1, 16))
+    assert len(body["ingredients"]) == 5
+    assert [category["category_id"] for category in body["categories"]] == [1, 2]
+    assert sqlite_client.get("/recipe/lasagne").json() == body
+    assert sqlite_client.get("/recipe/lasagne").headers["etag"]
+
+    with sqlite_db_session() as db:
+        assert db.query(Recipe).one().version == 1
+
+
+def test_integration_nested_create_query_count_is_constant(
+    sqlite_client, sqlite_db_session
+):
+    seed_categories(sqlite_db_session)
+    engine = sqlite_db_session.kw["bind"]
+
+    with count_queries(engine) as small:
+        sqlite_client.post("/recipe/nested", json=nested_recipe(steps=2))
+    with count_queries(engine) as large:
+        sqlite_client.post(
+            "/recipe/nested",
+            json=nested_recipe(steps=40, title="Big lasagne", slug="big-lasagne"),
+        )
+
+    def writes(statements):
+        # The search index refresh is a fixed two statements per commit.
+        return [s for s in statements if "recipe_search" not in s]
+
+    assert len(writes(large)) == len(writes(small))
+
+
+def test_integration_nested_create_rejects_unknown_category(
+    sqlite_client, sqlite_db_session
+):
+    response = sqlite_client.post("/recipe/nested", json=nested_recipe())
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Category does not exist: dinner"
+
+
+def test_integration_nested_create_is_atomic(sqlite_client, sqlite_db_session):
+    seed_categories(sqlite_db_session)
+    payload = nested_recipe()
+    payload["steps"].append({"step_number": 99, "step": ""})
+
+    response = sqlite_client.post("/recipe/nested", json=payload)
+
+    assert response.status_code == 500
+    with sqlite_db_session() as db:
+        assert db.query(Recipe).count() == 0
+
+
+def test_integration_nested_create_duplicates(sqlite_client, sqlite_db_session):
+    seed_categories(sqlite_db_session)
+    sqlite_client.post("/recipe/nested", json=nested_recipe())
+
+    duplicate = sqlite_client.post("/recipe/nested", json=nested_recipe())
+    assert duplicate.status_code == 400
+    assert duplicate.json()["detail"] == "Recipe with this title exists"
+
+    payload = nested_recipe(title="Other", slug="other")
+    payload["steps"].append({"step_number": 1, "step": "Again"})
+    response = sqlite_client.post("/recipe/nested", json=payload)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Duplicate step number"
@@ -0,0 +1,83 @@
+import pytest
+
+from db.pagination import MAX_PAGE_SIZE
+from tests.utils.db_utils import count_queries, seed_recipes
+
+
+def _walk(client, url, **params):
+    pages = []
+    cursor = None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = client.get(url, params=query)
+        assert response.status_code == 200
+        pages.append(response.json()["items"])
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("sort", ["id", "title", "created_at", "-id", "-title"])
+def test_integration_recipe_pages_cover_every_row_once(
+    sqlite_client, sqlite_db_session, sort
+):
+    with sqlite_db_session() as db:
+        seed_recipes(db, 23)
+
+    pages = _walk(sqlite_client, "/recipe", limit=5, sort=sort)
+    slugs = [recipe["slug"] for page in pages for recipe in page]
+
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    assert len(set(slugs)) == 23
+    if sort.lstrip("-") == "title":
+        titles = [recipe["title"] for page in pages for recipe in page]
+        assert titles == sorted(titles, reverse=sort.startswith("-"))
+
+
+def test_integration_deep_page_issues_same_queries_as_first(
+    sqlite_client, sqlite_db_session
+):
+    with sqlite_db_session() as db:
+        seed_recipes(db, 30)
+
+    engine = sqlite_db_session.kw["bind"]
+    first = sqlite_client.get("/recipe", params={"limit": 5})
+    cursor = first.json()["next_cursor"]
+    for _ in range(4):
+        cursor = sqlite_client.get(
+            "/recipe", params={"limit": 5, "cursor": cursor}
+        ).json()["next_cursor"]
+
+    with count_queries(engine) as statements:
+        response = sqlite_client.get("/recipe", params={"limit": 5, "cursor": cursor})
+
+    assert response.json()["next_cursor"] is None
+    assert len(statements) == 4
+
+
+def test_integration_child_collection_pages(sqlite_client, sqlite_db_session):
+    with sqlite_db_session() as db:
+        seed_recipes(db, 1, children=7)
+
+    pages = _walk(sqlite_client, "/steps/recipe-0", limit=3)
+
+    assert [step["step_number"] for page in pages for step in page] == list(
+        range(1, 8)
+    )
+
+
+def test_unit_page_size_is_capped(client):
+    response = client.get("/recipe", params={"limit": MAX_PAGE_SIZE + 1})
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "W10", "WyJ0aXRsZSIsWzFdXQ"])
+def test_unit_invalid_cursor_is_rejected(client, cursor):
+    response = client.get("/recipe", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
+def test_unit_invalid_sort_key_is_rejected(client):
+    response = client.get("/recipe", params={"sort": "description"})
+    assert response.status_code == 400
@@ -0,0 +1,111 @@
+from db.models import Ingredient, Recipe
+from db.pantry import PantryIndex, normalize_ingredient, pantry_index
+
+
+def add_recipe(db, slug, *names):
+    recipe = Recipe(title=slug.title(), slug=slug, description="Tasty")
+    recipe.ingredients = [Ingredient(name=name, amount="1") for name in names]
+    db.add(recipe)
+    db.commit()
+    return recipe.id
+
+
+def seed_pantry(sqlite_db_session):
+    with sqlite_db_session() as db:
+        add_recipe(db, "omelette", "egg", "butter", "salt")
+        add_recipe(db, "pancakes", "eggs", "flour", "milk", "butter")
+        add_recipe(db, "toast", "bread", "butter")
+        add_recipe(db, "salad", "lettuce", "tomatoes")
+
+
+def matches(response):
+    return [
+        (item["recipe"]["slug"], item["used"], item["missing"])
+        for item in response.json()["items"]
+    ]
+
+
+def test_unit_normalize_ingredient():
+    assert normalize_ingredient(" Tomatoes ") == "tomato"
+    assert normalize_ingredient("Cherries") == "cherry"
+    assert normalize_ingredient("green  beans") == "green bean"
+    assert normalize_ingredient("Swiss") == "swiss"
+    assert normalize_ingredient("gas") == "gas"
+
+
+def test_unit_pantry_index_updates_postings():
+    index = PantryIndex()
+    index.loaded = True
+    index.apply({1: (1, ["egg", "milk"]), 2: (1, ["Eggs"]), 3: (1, ["milk"])})
+
+    assert [hit.recipe_id for hit in index.search(["egg", "milk"], 10)] == [1, 2, 3]
+
+    # A stale update is ignored, a newer one replaces the postings.
+    index.apply({1: (3, ["flour"])})
+    index.apply({1: (2, ["egg", "milk"])})
+    assert [hit.recipe_id for hit in index.search(["egg"], 10)] == [2]
+
+    index.apply({2: None})
+    assert index.search(["egg"], 10) == []
+    assert index.stats() == {"loaded": True, "recipes": 2, "ingredients": 2, "postings": 2}
+
+
+def test_integration_pantry_ranks_by_coverage(sqlite_client, sqlite_db_session):
+    seed_pantry(sqlite_db_session)
+
+    response = sqlite_client.get(
+        "/recipe/pantry", params={"ingredient": ["Egg", "butter", "salt", "bread"]}
+    )
+    assert response.status_code == 200
+    assert matches(response) == [
+        ("omelette", 3, 0),
+        ("toast", 2, 0),
+        ("pancakes", 2, 2),
+    ]
+    assert response.json()["items"][2]["missing_ingredients"] == ["flour", "milk"]
+
+    response = sqlite_client.get(
+        "/recipe/pantry",
+        params={"ingredient": ["egg", "butter"], "limit": 1},
+    )
+    assert matches(response) == [("omelette", 2, 1)]
+
+    response = sqlite_client.get(
+        "/recipe/pantry", params={"ingredient": ["egg", "butter"], "max_missing": 0}
+    )
+    assert matches(response) == []
+
+
+def test_integration_pantry_follows_ingredient_writes(sqlite_client, sqlite_db_session):
+    seed_pantry(sqlite_db_session)
+    assert matches(sqlite_client.get("/recipe/pantry?ingredient=lettuce")) == [
+        ("salad", 1, 1)
+    ]
+
+    salad_id = sqlite_client.get("/recipe/salad").json()["id"]
+    response = sqlite_client.post(
+        "/ingredient", json={"name": "croutons", "amount": "1", "recipe_id": salad_id}
+    )
+    assert response.status_code == 201
+    assert matches(sqlite_client.get("/recipe/pantry?ingredient=lettuce")) == [
+        ("salad", 1, 2)
+    ]
+
+    with sqlite_db_session() as db:
+        db.delete(db.get(Recipe, salad_id))
+        db.commit()
+    assert matches(sqlite_client.get("/recipe/pantry?ingredient=lettuce")) == []
+
+
+def test_integration_pantry_index_loads_once(sqlite_client, sqlite_db_session):
+    seed_pantry(sqlite_db_session)
+
+    sqlite_client.get("/recipe/pantry?ingredient=egg")
+    assert pantry_index.loaded
+    assert sqlite_client.get("/stats/pantry-index").json() == {
+        "loaded": True,
+        "recipes": 4,
+        "ingredients": 8,
+        "postings": 11,
+    }
+    assert sqlite_client.get("/recipe/pantry").status_code == 422
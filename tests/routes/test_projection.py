@@ -0,0 +1,80 @@
+import pytest
+
+from tests.utils.db_utils import count_queries, seed_recipes
+
+
+def test_integration_fields_skip_child_collections(sqlite_client, sqlite_db_session):
+    with sqlite_db_session() as db:
+        seed_recipes(db, 5)
+
+    engine = sqlite_db_session.kw["bind"]
+    with count_queries(engine) as statements:
+        response = sqlite_client.get("/recipe", params={"fields": "slug,title"})
+
+    assert response.status_code == 200
+    assert response.json()["items"][0] == {
+        "title": "Recipe 0",
+        "slug": "recipe-0",
+        "id": 1,
+    }
+    assert len(statements) == 1
+    assert "description" not in statements[0]
+
+
+def test_integration_include_loads_only_requested_children(
+    sqlite_client, sqlite_db_session
+):
+    with sqlite_db_session() as db:
+        seed_recipes(db, 5)
+
+    engine = sqlite_db_session.kw["bind"]
+    with count_queries(engine) as statements:
+        response = sqlite_client.get(
+            "/recipe/recipe-2", params={"fields": "id,slug", "include": "steps"}
+        )
+
+    assert response.status_code == 200
+    assert set(response.json()) == {"id", "slug", "steps"}
+    assert len(response.json()["steps"]) == 3
+    assert len(statements) == 2
+
+
+def test_integration_projection_keeps_cursor_working(sqlite_client, sqlite_db_session):
+    with sqlite_db_session() as db:
+        seed_recipes(db, 7)
+
+    params = {"fields": "id", "sort": "-created_at", "limit": 4}
+    first = sqlite_client.get("/recipe", params=params).json()
+    second = sqlite_client.get(
+        "/recipe", params=dict(params, cursor=first["next_cursor"])
+    ).json()
+
+    ids = [r["id"] for r in first["items"] + second["items"]]
+    assert sorted(ids) == list(range(1, 8))
+    assert second["next_cursor"] is None
+
+
+def test_integration_no_projection_returns_full_recipe(
+    sqlite_client, sqlite_db_session
+):
+    with sqlite_db_session() as db:
+        seed_recipes(db, 1)
+
+    recipe = sqlite_client.get("/recipe/recipe-0").json()
+    assert set(recipe) == {
+        "id", "title", "slug", "description", "servings", "ingredients", "steps",
+        "categories",
+    }
+
+
+@pytest.mark.parametrize(
+    "params, detail",
+    [
+        ({"fields": "id,created_at"}, "Invalid field: created_at"),
+        ({"include": "photos"}, "Invalid include: photos"),
+    ],
+)
+def test_unit_invalid_projection_is_rejected(client, params, detail):
+    response = client.get("/recipe", params=params)
+    assert response.status_code == 400
+    assert response.json() == {"detail": detail}
@@ -0,0 +1,180 @@
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import insert
+
+from app import cli
+from app.utils import serialization
+from db.models import Ingredient, Recipe
+from db.quantities import Quantity, canonical_unit, parse_quantity
+
+
+@pytest.mark.parametrize(
+    "amount, measurement, expected",
+    [
+        ("1 1/2", "cups", Quantity(354.882355, None, "ml")),
+        ("½", None, Quantity(0.5, None, None)),
+        ("1½", "Tbsp.", Quantity(22.180147, None, "ml")),
+        ("2-3", None, Quantity(2.0, 3.0, None)),
+        ("2 to 3", "cloves", Quantity(2.0, 3.0, "clove")),
+        ("200g", None, Quantity(200.0, None, "g")),
+        ("1,5", "kg", Quantity(1500.0, None, "g")),
+        ("12/4", "pinches", Quantity(3.0, None, "pinch")),
+        ("1", "knob", Quantity(1.0, None, "knob")),
+        ("some", "salt", Quantity()),
+    ],
+)
+def test_unit_parse_quantity(amount, measurement, expected):
+    assert parse_quantity(amount, measurement) == expected
+
+
+@pytest.mark.parametrize(
+    "one, many, unit",
+    [
+        ("box", "boxes", "box"),
+        ("glass", "glasses", "glass"),
+        ("leaf", "leaves", "leaf"),
+        ("sachet", "sachets", "sachet"),
+        ("pinch", "pinches", "pinch"),
+    ],
+)
+def test_unit_plural_units_share_a_unit(one, many, unit):
+    assert canonical_unit(one) == canonical_unit(many) == (unit, 1.0)
+
+
+def create_pancakes(client, servings=4):
+    response = client.post(
+        "/recipe/nested",
+        json={
+            "title": "Pancakes",
+            "slug": "pancakes",
+            "servings": servings,
+            "ingredients": [
+                {"name": "flour", "amount": "1 1/2", "measurement": "cups"},
+                {"name": "eggs", "amount": "2-3"},
+                {"name": "salt", "amount": "some"},
+            ],
+        },
+    )
+    assert response.status_code == 201
+    return response
+
+
+def quantities(ingredients):
+    return [(i["name"], i["quantity"], i["quantity_max"], i["unit"]) for i in ingredients]
+
+
+def test_integration_creates_store_parsed_quantities(sqlite_client, sqlite_db_session):
+    created = create_pancakes(sqlite_client).json()
+    assert quantities(created["ingredients"]) == [
+        ("flour", 354.882355, None, "ml"),
+        ("eggs", 2.0, 3.0, None),
+        ("salt", None, None, None),
+    ]
+
+    recipe_id = created["id"]
+    response = sqlite_client.post(
+        "/ingredient",
+        json={"name": "milk", "amount": "300", "measurement": "ml", "recipe_id": recipe_id},
+    )
+    assert (response.json()["quantity"], response.json()["unit"]) == (300.0, "ml")
+
+    with sqlite_db_session() as db:
+        db.add(Ingredient(name="butter", amount="2", measurement="tbsp", recipe_id=recipe_id))
+        db.commit()
+        butter = db.query(Ingredient).filter(Ingredient.name == "butter").one()
+        assert (butter.quantity, butter.unit) == (29.57353, "ml")
+
+
+def test_integration_servings_scale_quantities(sqlite_client, sqlite_db_session):
+    create_pancakes(sqlite_client)
+
+    recipe = sqlite_client.get("/recipe/pancakes?servings=8").json()
+    assert recipe["servings"] == 8
+    assert quantities(recipe["ingredients"]) == [
+        ("flour", 709.765, None, "ml"),
+        ("eggs", 4.0, 6.0, None),
+        ("salt", None, None, None),
+    ]
+    assert recipe["ingredients"][0]["amount"] == "1 1/2"
+
+    page = sqlite_client.get("/ingredient/pancakes?servings=2").json()
+    assert quantities(page["items"])[:2] == [
+        ("flour", 177.441, None, "ml"),
+        ("eggs", 1.0, 1.5, None),
+    ]
+
+    # A different representation, so a different validator.
+    plain = sqlite_client.get("/recipe/pancakes")
+    scaled = sqlite_client.get("/recipe/pancakes?servings=8")
+    assert plain.json()["servings"] == 4
+    assert plain.headers["etag"] != scaled.headers["etag"]
+
+
+def test_integration_servings_fast_path_is_byte_compatible(
+    sqlite_client, sqlite_db_session, monkeypatch
+):
+    create_pancakes(sqlite_client)
+
+    for path in ("/recipe/pancakes?servings=6", "/ingredient/pancakes?servings=6"):
+        validated = sqlite_client.get(path)
+        monkeypatch.setattr(serialization, "FAST_SERIALIZATION", True)
+        fast = sqlite_client.get(path)
+        monkeypatch.setattr(serialization, "FAST_SERIALIZATION", False)
+        assert fast.status_code == validated.status_code == 200
+        assert fast.content == validated.content
+
+
+def test_integration_servings_errors(sqlite_client, sqlite_db_session):
+    sqlite_client.post("/recipe", json={"title": "Toast", "slug": "toast"})
+    create_pancakes(sqlite_client)
+
+    response = sqlite_client.get("/recipe/toast?servings=2")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Recipe has no servings to scale"
+    assert sqlite_client.get("/ingredient/toast?servings=2").status_code == 400
+    assert sqlite_client.get("/recipe/pancakes?servings=0").status_code == 422
+
+
+def test_integration_backfill_cli(sqlite_client, sqlite_db_session, monkeypatch, capsys):
+    create_pancakes(sqlite_client)
+    with sqlite_db_session() as db:
+        recipe = db.query(Recipe).one()
+        # Rows written before the quantity columns existed.
+        db.execute(
+            insert(Ingredient),
+            [
+                {"name": "sugar", "amount": "¼", "measurement": "cup", "recipe_id": recipe.id},
+                {"name": "oil", "amount": "1", "measurement": "tsp", "recipe_id": recipe.id},
+            ],
+        )
+        db.commit()
+        version = db.query(Recipe.version).scalar()
+
+    monkeypatch.setattr(cli, "SessionLocal", sqlite_db_session)
+    cli.main(["quantities", "backfill", "--batch-size", "2"])
+    assert "Updated 2 ingredient quantities" in capsys.readouterr().out
+
+    with sqlite_db_session() as db:
+        rows = db.query(Ingredient.name, Ingredient.quantity, Ingredient.unit).filter(
+            Ingredient.name.in_(["sugar", "oil"])
+        )
+        assert sorted(rows) == [("oil", 4.928922, "ml"), ("sugar", 59.147059, "ml")]
+        # Bumped once per batch that changed one of its ingredients.
+        assert db.query(Recipe.version).scalar() == version + 2
+
+    cli.main(["quantities", "backfill"])
+    assert "Updated 0 ingredient quantities" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize(
+    "command",
+    [["-m", "app.cli", "--help"], ["-c", "import db.events"], ["-c", "import db.quantities"]],
+)
+def test_integration_entry_points_import_in_a_fresh_interpreter(command):
+    # pytest imports app.main first, which hides import cycles in db.
+    result = subprocess.run(
+        [sys.executable, *command], capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
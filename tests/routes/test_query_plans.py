@@ -0,0 +1,268 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from db.cache import facet_cache, slug_cache
+from db.db import get_db_session
+from db.models import Base
+from db.pagination import encode_cursor
+from db.pantry import pantry_index
+from tests.utils.db_utils import capture_queries, explain_accesses, seed_recipes
+
+
+# Every route runs against a few thousand recipes; the plan of each statement
+# it issues is compared with the accesses below. A table scan ("SCAN table"
+# without an index) fails unless it is listed in ALLOWED_SCANS; any other
+# change of index or access is a plan regression. When a change is intended,
+# update the expected accesses in the same commit.
+SEED_RECIPES = 2000
+CHILD_PAGE = {
+    "SEARCH recipes INTEGER PRIMARY KEY",
+    "SEARCH steps sqlite_autoindex_steps_1",
+    "SEARCH ingredients ix_ingredients_recipe_id_id",
+    "SEARCH recipe_categories sqlite_autoindex_recipe_categories_1",
+}
+RECIPE_CHILDREN = CHILD_PAGE - {"SEARCH recipes INTEGER PRIMARY KEY"}
+SEARCH_REFRESH = {
+    "SCAN recipe_search VIRTUAL TABLE",
+    "SEARCH r INTEGER PRIMARY KEY",
+    "SEARCH i ix_ingredients_recipe_id_id",
+    "SEARCH s ix_steps_recipe_id_step_number",
+}
+
+CASES = {
+    "recipes": ("GET", "/recipe", None, {"SCAN recipes"} | RECIPE_CHILDREN),
+    "recipes_next_page": (
+        "GET",
+        f"/recipe?cursor={encode_cursor('id', [50])}",
+        None,
+        {"SEARCH recipes INTEGER PRIMARY KEY"} | RECIPE_CHILDREN,
+    ),
+    "recipes_by_created_at": (
+        "GET",
+        "/recipe?sort=-created_at",
+        None,
+        {"SCAN recipes ix_recipes_created_at_id"} | RECIPE_CHILDREN,
+    ),
+    "recipes_by_title": (
+        "GET",
+        "/recipe?sort=title&limit=5",
+        None,
+        {"SCAN recipes sqlite_autoindex_recipes_1"} | RECIPE_CHILDREN,
+    ),
+    "recipes_in_all_categories": (
+        "GET",
+        "/recipe?category=category-1&category=category-2",
+        None,
+        {
+            "SEARCH category sqlite_autoindex_category_1",
+            "SCAN category sqlite_autoindex_category_1",
+            "SEARCH recipe_categories ix_recipe_categories_category_recipe",
+            "SEARCH anon_1",
+        }
+        | CHILD_PAGE,
+    ),
+    "recipes_in_any_category": (
+        "GET",
+        "/recipe?category=category-1&category=category-2&category_match=any",
+        None,
+        {
+            "SEARCH category sqlite_autoindex_category_1",
+            "SCAN category sqlite_autoindex_category_1",
+            "SEARCH recipe_categories ix_recipe_categories_category_recipe",
+            "SEARCH anon_1",
+        }
+        | CHILD_PAGE,
+    ),
+    "recipe_facets": (
+        "GET",
+        "/recipe?facets=true",
+        None,
+        {
+            "SCAN recipes",
+            "SCAN category sqlite_autoindex_category_1",
+            "SCAN recipe_categories ix_recipe_categories_category_recipe",
+            "SEARCH anon_1",
+        }
+        | RECIPE_CHILDREN,
+    ),
+    "recipe": (
+        "GET",
+        "/recipe/recipe-5",
+        None,
+        {
+            "SEARCH recipes sqlite_autoindex_recipes_2",
+            "SEARCH steps ix_steps_recipe_id_step_number",
+            "SEARCH ingredients ix_ingredients_recipe_id_id",
+            "SEARCH recipe_categories sqlite_autoindex_recipe_categories_1",
+        },
+    ),
+    "search": (
+        "GET",
+        "/recipe/search?q=recipe+12",
+        None,
+        {"SCAN recipe_search VIRTUAL TABLE"} | CHILD_PAGE,
+    ),
+    "pantry": (
+        "GET",
+        "/recipe/pantry?ingredient=ingredient-1",
+        None,
+        {"SCAN recipes", "SEARCH ingredients ix_ingredients_recipe_id_id"} | CHILD_PAGE,
+    ),
+    "steps": (
+        "GET",
+        "/steps/recipe-5",
+        None,
+        {
+            "SEARCH recipes sqlite_autoindex_recipes_2",
+            "SEARCH steps ix_steps_recipe_id_step_number",
+        },
+    ),
+    "ingredients": (
+        "GET",
+        "/ingredient/recipe-5",
+        None,
+        {
+            "SEARCH recipes sqlite_autoindex_recipes_2",
+            "SEARCH ingredients ix_ingredients_recipe_id_id",
+        },
+    ),
+    "recipe_categories": (
+        "GET",
+        "/category/recipe-5",
+        None,
+        {
+            "SEARCH recipes sqlite_autoindex_recipes_2",
+            "SEARCH recipe_categories sqlite_autoindex_recipe_categories_1",
+        },
+    ),
+    "categories": ("GET", "/category", None, {"SCAN category"}),
+    "categories_by_name": (
+        "GET",
+        "/category?sort=name",
+        None,
+        {"SCAN category sqlite_autoindex_category_1"},
+    ),
+    "create_recipe": (
+        "POST",
+        "/recipe",
+        {"title": "Plan soup", "slug": "plan-soup", "description": "Hot"},
+        SEARCH_REFRESH,
+    ),
+    "create_step": (
+        "POST",
+        "/step",
+        {"step_number": 9, "step": "Rest", "recipe_id": 7},
+        {"SEARCH recipes INTEGER PRIMARY KEY"} | SEARCH_REFRESH,
+    ),
+    "create_ingredient": (
+        "POST",
+        "/ingredient",
+        {"name": "saffron", "amount": "1", "recipe_id": 7},
+        {"SEARCH recipes INTEGER PRIMARY KEY"} | SEARCH_REFRESH,
+    ),
+    "similar": (
+        "GET",
+        "/recipe/recipe-5/similar",
+        None,
+        {
+            "SEARCH recipes sqlite_autoindex_recipes_2",
+            "SEARCH recipe_neighbors sqlite_autoindex_recipe_neighbors_1",
+            "SEARCH recipes INTEGER PRIMARY KEY",
+        },
+    ),
+    "shopping_list": (
+        "POST",
+        "/shopping-list",
+        {"recipes": [{"slug": f"recipe-{i}"} for i in range(0, 700, 14)]},
+        {
+            "SEARCH recipes sqlite_autoindex_recipes_2",
+            "SEARCH ingredients ix_ingredients_recipe_id_id",
+        },
+    ),
+}
+
+# Table scans that are intended, with the reason.
+ALLOWED_SCANS = {
+    # First page in primary key order: the scan stops after LIMIT rows.
+    "recipes": {"SCAN recipes"},
+    "recipe_facets": {"SCAN recipes"},
+    "categories": {"SCAN category"},
+    # The FTS5 table is searched through its own index (MATCH / rowid).
+    "search": {"SCAN recipe_search VIRTUAL TABLE"},
+    "create_recipe": {"SCAN recipe_search VIRTUAL TABLE"},
+    "create_step": {"SCAN recipe_search VIRTUAL TABLE"},
+    "create_ingredient": {"SCAN recipe_search VIRTUAL TABLE"},
+    # Loading the pantry index reads every recipe once per process.
+    "pantry": {"SCAN recipes"},
+}
+
+
+@pytest.fixture(scope="module")
+def seeded_engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        seed_recipes(db, SEED_RECIPES, children=5)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def plan_client(seeded_engine):
+    SessionLocal = sessionmaker(autocommit=False, autoflush=True, bind=seeded_engine)
+
+    def _get_db_session():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db_session] = _get_db_session
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def plan_of(engine, queries):
+    accesses, scans = set(), set()
+    with engine.connect() as connection:
+        for statement, parameters in queries:
+            found, subqueries = explain_accesses(connection, statement, parameters)
+            accesses |= found
+            scans |= {
+                access
+                for access in found
+                if access.endswith("VIRTUAL TABLE")
+                or (
+                    access.startswith("SCAN ")
+                    and len(access.split()) == 2
+                    and access.split()[1] not in subqueries
+                )
+            }
+    return accesses, scans
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_integration_query_plans(plan_client, seeded_engine, case):
+    method, path, body, expected = CASES[case]
+    slug_cache.clear()
+    facet_cache.clear()
+    pantry_index.clear()
+
+    with capture_queries(seeded_engine) as queries:
+        response = plan_client.request(method, path, json=body)
+    assert response.status_code in (200, 201), response.text
+
+    accesses, scans = plan_of(seeded_engine, queries)
+    assert scans <= ALLOWED_SCANS.get(case, set()), f"table scans in {case}"
+    assert accesses == expected, f"query plan of {case} changed"
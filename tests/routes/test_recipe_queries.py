@@ -0,0 +1,67 @@
+import pytest
+
+from tests.utils.db_utils import count_queries, seed_recipes
+
+
+@pytest.mark.parametrize("recipe_count", [1, 10, 50])
+def test_integration_get_all_recipes_query_count_is_bounded(
+    sqlite_client, sqlite_db_session, recipe_count
+):
+    with sqlite_db_session() as db:
+        seed_recipes(db, recipe_count)
+
+    engine = sqlite_db_session.kw["bind"]
+    with count_queries(engine) as statements:
+        response = sqlite_client.get("/recipe")
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == recipe_count
+    assert all(len(recipe["steps"]) == 3 for recipe in response.json()["items"])
+    # one query for the recipes and one per eagerly loaded relationship
+    assert len(statements) == 4
+
+
+def test_integration_get_recipe_by_slug_loads_graph_eagerly(
+    sqlite_client, sqlite_db_session
+):
+    with sqlite_db_session() as db:
+        seed_recipes(db, 5)
+
+    engine = sqlite_db_session.kw["bind"]
+    with count_queries(engine) as statements:
+        response = sqlite_client.get("/recipe/recipe-3")
+
+    assert response.status_code == 200
+    assert response.json()["title"] == "Recipe 3"
+    assert [step["step_number"] for step in response.json()["steps"]] == [1, 2, 3]
+    assert len(statements) == 4
+
+
+@pytest.mark.parametrize("path", ["ingredient", "steps", "category"])
+def test_integration_child_lookup_is_single_round_trip(
+    sqlite_client, sqlite_db_session, path
+):
+    with sqlite_db_session() as db:
+        seed_recipes(db, 3)
+
+    engine = sqlite_db_session.kw["bind"]
+    with count_queries(engine) as statements:
+        response = sqlite_client.get(f"/{path}/recipe-1")
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 3
+    assert len(statements) == 1
+
+
+@pytest.mark.parametrize("path", ["ingredient", "steps", "category"])
+def test_integration_child_lookup_tells_missing_from_empty(
+    sqlite_client, sqlite_db_session, path
+):
+    with sqlite_db_session() as db:
+        seed_recipes(db, 1, children=0)
+
+    assert sqlite_client.get(f"/{path}/recipe-0").json() == {
+        "items": [],
+        "next_cursor": None,
+    }
+    assert sqlite_client.get(f"/{path}/no-such-recipe").status_code == 404
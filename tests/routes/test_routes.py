@@ -1,6 +1,7 @@
 import json
+from datetime import datetime
+
 import pytest
-from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from app.main import app
 from db.models import Recipe, Ingredient, RecipeCategories, Step, Category
@@ -19,6 +20,14 @@ class Dict2Class(object):
             setattr(self, key, my_dict[key])
 
 
+def recipe_row(recipe):
+    return Dict2Class(dict(recipe, version=1, updated_at=datetime(2024, 1, 1)))
+
+
+def validators(recipe):
+    return (recipe["id"], 1, datetime(2024, 1, 1))
+
+
 client = TestClient(app)
 
 
@@ -33,7 +42,7 @@ def test_read_main():
 
 @pytest.mark.parametrize("recipe", [get_random_recipe_dict() for _ in range(3)])
 def test_unit_get_single_recipe_sucessfully(client, monkeypatch, recipe):
-    monkeypatch.setattr("sqlalchemy.orm.Query.first", mock_output(recipe))
+    monkeypatch.setattr("sqlalchemy.orm.Query.first", mock_output(recipe_row(recipe)))
     response = client.get(f"/recipe/{recipe['slug']}")
     assert response.status_code == 200
     assert response.json() == recipe
@@ -59,10 +68,11 @@ def test_unit_get_single_recipe_with_internal_server_error(client, monkeypatch,
 
 def test_unit_get_all_recipe_sucessfully(client, monkeypatch):
     recipe = [get_random_recipe_dict(i) for i in range(5)]
-    monkeypatch.setattr("sqlalchemy.orm.Query.all", mock_output(recipe))
+    rows = [recipe_row(r) for r in recipe]
+    monkeypatch.setattr("sqlalchemy.orm.Query.all", mock_output(rows))
     response = client.get("/recipe")
     assert response.status_code == 200
-    assert response.json() == recipe
+    assert response.json() == {"items": recipe, "next_cursor": None}
 
 
 def test_unit_get_all_recipe_returns_empty(client, monkeypatch):
@@ -70,7 +80,7 @@ def test_unit_get_all_recipe_returns_empty(client, monkeypatch):
     monkeypatch.setattr("sqlalchemy.orm.Query.all", mock_output(recipe))
     response = client.get("/recipe")
     assert response.status_code == 200
-    assert response.json() == recipe
+    assert response.json() == {"items": recipe, "next_cursor": None}
 
 
 def test_unit_get_recipe_all_with_internal_server_error(client, monkeypatch):
@@ -85,13 +95,10 @@ def test_unit_get_recipe_all_with_internal_server_error(client, monkeypatch):
 def test_unit_create_new_recipe_successfully(client, monkeypatch):
     recipe = get_random_recipe_dict()
 
-    Recipe()
-    for key, value in recipe.items():
-        monkeypatch.setattr(Recipe, key, value)
-
-    monkeypatch.setattr("sqlalchemy.orm.Query.first", mock_output())
+    monkeypatch.setattr(
+        "app.routes.recipes.insert_unique", mock_output(Dict2Class(recipe))
+    )
     monkeypatch.setattr("sqlalchemy.orm.Session.commit", mock_output())
-    monkeypatch.setattr("sqlalchemy.orm.Session.refresh", mock_output())
 
     body = recipe.copy()
     body.pop("id")
@@ -101,25 +108,21 @@ def test_unit_create_new_recipe_successfully(client, monkeypatch):
 
 
 @pytest.mark.parametrize(
-    "existing_recipe, recipe_data, expected_detail",
+    "existing_title, recipe_data, expected_detail",
     [
         (True, get_random_recipe_dict(), "Recipe with this title exists"),
-        (True, get_random_recipe_dict(), "Recipe with this slug exists"),
+        (False, get_random_recipe_dict(), "Recipe with this Slug exists"),
     ],
 )
 def test_unit_create_new_recipe_existing(
-    client, monkeypatch, existing_recipe, recipe_data, expected_detail
+    client, monkeypatch, existing_title, recipe_data, expected_detail
 ):
-    def mock_check_existing_recipe(db, recipe_data):
-        if existing_recipe:
-            raise HTTPException(status_code=400, detail=expected_detail)
-
+    # The insert hit a unique constraint; the title lookup picks the message.
+    monkeypatch.setattr("app.routes.recipes.insert_unique", mock_output())
     monkeypatch.setattr(
-        "app.routes.recipes.check_existing_recipe",
-        mock_check_existing_recipe,
+        "sqlalchemy.orm.Query.first",
+        mock_output((recipe_data["id"],) if existing_title else None),
     )
-
-    monkeypatch.setattr("sqlalchemy.orm.Query.first", mock_output())
     body = recipe_data.copy()
     body.pop("id")
     response = client.post("/recipe", json=body)
@@ -132,15 +135,12 @@ def test_unit_create_new_recipe_existing(
 def test_unit_create_new_recipe_with_internal_server_error(client, monkeypatch):
     recipe = get_random_recipe_dict()
 
-    Recipe()
-
     def mock_create_recipe_exception(*args, **kwargs):
         raise Exception("Internal server error")
 
-    for key, value in recipe.items():
-        monkeypatch.setattr(Recipe, key, value)
-
-    monkeypatch.setattr("sqlalchemy.orm.Query.first", mock_output())
+    monkeypatch.setattr(
+        "app.routes.recipes.insert_unique", mock_output(Dict2Class(recipe))
+    )
     monkeypatch.setattr("sqlalchemy.orm.Session.commit", mock_create_recipe_exception)
 
     body = recipe.copy()
@@ -155,22 +155,21 @@ def test_unit_get_ingredient_by_recipe_successfully(
 ):
     slug = recipe.get("slug")
     ingredients = [get_random_ingredient_dict(i) for i in range(5)]
-    recipe = Dict2Class(recipe)
-    monkeypatch.setattr("sqlalchemy.orm.Query.first", mock_output(recipe))
-    monkeypatch.setattr("sqlalchemy.orm.Query.all", mock_output(ingredients))
+    rows = [(*validators(recipe), child) for child in ingredients]
+    monkeypatch.setattr("sqlalchemy.orm.Query.all", mock_output(rows))
 
     response = client.get(f"/ingredient/{slug}")
     assert response.status_code == 200
-    assert response.json() == ingredients
+    assert response.json() == {"items": ingredients, "next_cursor": None}
 
 
 @pytest.mark.parametrize("recipe", [get_random_recipe_dict()])
 def test_unit_get_ingredients_by_recipe_not_found(client, monkeypatch, recipe: Recipe):
     slug = recipe.get("slug")
-    monkeypatch.setattr("sqlalchemy.orm.Query.first", mock_output(Dict2Class(recipe)))
+    monkeypatch.setattr("sqlalchemy.orm.Query.all", mock_output([(*validators(recipe), None)]))
     response = client.get(f"/ingredient/{slug}")
     assert response.status_code == 200
-    assert len(response.json()) == 0
+    assert len(response.json()["items"]) == 0
 
 
 @pytest.mark.parametrize("recipe", [get_random_recipe_dict()])
@@ -190,13 +189,10 @@ def test_unit_get_ingredient_all_with_internal_server_error(
 def test_unit_create_new_ingredient_successfully(client, monkeypatch):
     ingredient = get_random_ingredient_dict()
 
-    Ingredient()
-    for key, value in ingredient.items():
-        monkeypatch.setattr(Ingredient, key, value)
-
-    monkeypatch.setattr("sqlalchemy.orm.Query.first", mock_output())
+    monkeypatch.setattr(
+        "app.routes.recipes.insert_unique", mock_output(Dict2Class(ingredient))
+    )
     monkeypatch.setattr("sqlalchemy.orm.Session.commit", mock_output())
-    monkeypatch.setattr("sqlalchemy.orm.Session.refresh", mock_output())
 
     body = ingredient.copy()
     body.pop("id")
@@ -210,26 +206,25 @@ def test_unit_get_all_categories_sucessfully(client, monkeypatch):
     monkeypatch.setattr("sqlalchemy.orm.Query.all", mock_output(category))
     response = client.get("/category")
     assert response.status_code == 200
-    assert response.json() == category
+    assert response.json() == {"items": category, "next_cursor": None}
 
 
 @pytest.mark.parametrize("recipe", [get_random_recipe_dict()])
 def test_unit_get_category_by_recipe_successfully(client, monkeypatch, recipe: Recipe):
     slug = recipe.get("slug")
     categories = [get_random_recipe_categories_dict(i) for i in range(5)]
-    recipe = Dict2Class(recipe)
-    monkeypatch.setattr("sqlalchemy.orm.Query.first", mock_output(recipe))
-    monkeypatch.setattr("sqlalchemy.orm.Query.all", mock_output(categories))
+    rows = [(*validators(recipe), child) for child in categories]
+    monkeypatch.setattr("sqlalchemy.orm.Query.all", mock_output(rows))
 
     response = client.get(f"/category/{slug}")
     assert response.status_code == 200
-    assert response.json() == categories
+    assert response.json() == {"items": categories, "next_cursor": None}
 
 
 @pytest.mark.parametrize("recipe", [get_random_recipe_dict()])
 def test_unit_get_category_by_recipe_not_found(client, monkeypatch, recipe: Recipe):
     slug = recipe.get("slug")
-    monkeypatch.setattr("sqlalchemy.orm.Query.first", mock_output())
+    monkeypatch.setattr("sqlalchemy.orm.Query.all", mock_output([]))
     response = client.get(f"/category/{slug}")
     assert response.status_code == 404
     
@@ -253,13 +248,10 @@ def test_unit_get_category_by_recipe_with_internal_server_error(
 def test_unit_create_new_category_successfully(client, monkeypatch):
     category = get_random_category_dict()
 
-    Category()
-    for key, value in category.items():
-        monkeypatch.setattr(Category, key, value)
-
-    monkeypatch.setattr("sqlalchemy.orm.Query.first", mock_output())
+    monkeypatch.setattr(
+        "app.routes.recipes.insert_unique", mock_output(Dict2Class(category))
+    )
     monkeypatch.setattr("sqlalchemy.orm.Session.commit", mock_output())
-    monkeypatch.setattr("sqlalchemy.orm.Session.refresh", mock_output())
 
     body = category.copy()
     response = client.post("/category", json=body)
@@ -273,22 +265,21 @@ def test_unit_get_steps_by_recipe_successfully(
 ):
     slug = recipe.get("slug")
     steps = [get_random_step_dict(i) for i in range(5)]
-    recipe = Dict2Class(recipe)
-    monkeypatch.setattr("sqlalchemy.orm.Query.first", mock_output(recipe))
-    monkeypatch.setattr("sqlalchemy.orm.Query.all", mock_output(steps))
+    rows = [(*validators(recipe), child) for child in steps]
+    monkeypatch.setattr("sqlalchemy.orm.Query.all", mock_output(rows))
 
     response = client.get(f"/steps/{slug}")
     assert response.status_code == 200
-    assert response.json() == steps
+    assert response.json() == {"items": steps, "next_cursor": None}
 
 
 @pytest.mark.parametrize("recipe", [get_random_recipe_dict()])
 def test_unit_get_steps_by_recipe_not_found(client, monkeypatch, recipe: Recipe):
     slug = recipe.get("slug")
-    monkeypatch.setattr("sqlalchemy.orm.Query.first", mock_output(Dict2Class(recipe)))
+    monkeypatch.setattr("sqlalchemy.orm.Query.all", mock_output([(*validators(recipe), None)]))
     response = client.get(f"/steps/{slug}")
     assert response.status_code == 200
-    assert len(response.json()) == 0
+    assert len(response.json()["items"]) == 0
 
 
 @pytest.mark.parametrize("recipe", [get_random_recipe_dict()])
@@ -308,13 +299,10 @@ def test_unit_get_steps_all_with_internal_server_error(
 def test_unit_create_new_step_successfully(client, monkeypatch):
     step = get_random_step_dict()
 
-    Step()
-    for key, value in step.items():
-        monkeypatch.setattr(Step, key, value)
-
-    monkeypatch.setattr("sqlalchemy.orm.Query.first", mock_output())
+    monkeypatch.setattr(
+        "app.routes.recipes.insert_unique", mock_output(Dict2Class(step))
+    )
     monkeypatch.setattr("sqlalchemy.orm.Session.commit", mock_output())
-    monkeypatch.setattr("sqlalchemy.orm.Session.refresh", mock_output())
 
     body = step.copy()
     body.pop("id")
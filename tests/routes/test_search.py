@@ -0,0 +1,121 @@
+from sqlalchemy import text
+
+from app import cli
+from db.models import Ingredient, Recipe, Step
+from db.pagination import PageParams
+from db.search import search_recipe_ids
+
+
+def seed_search(sqlite_db_session):
+    with sqlite_db_session() as db:
+        soup = Recipe(title="Tomato soup", slug="tomato-soup", description="Warm")
+        soup.steps = [Step(step_number=1, step="Simmer slowly")]
+        pesto = Recipe(title="Basil pesto", slug="basil-pesto", description="Green")
+        pesto.ingredients = [Ingredient(name="dried tomatoes", amount="2")]
+        tart = Recipe(title="Lemon tart", slug="lemon-tart", description="Sharp")
+        tart.steps = [Step(step_number=1, step="Add a tomato garnish")]
+        db.add_all([soup, pesto, tart])
+        db.commit()
+
+
+def slugs(response):
+    return [recipe["slug"] for recipe in response.json()["items"]]
+
+
+def test_integration_search_ranks_and_matches_prefixes(sqlite_client, sqlite_db_session):
+    seed_search(sqlite_db_session)
+
+    response = sqlite_client.get("/recipe/search?q=tomato")
+    assert response.status_code == 200
+    assert slugs(response) == ["tomato-soup", "basil-pesto", "lemon-tart"]
+    assert response.json()["items"][0]["steps"][0]["step"] == "Simmer slowly"
+
+    assert slugs(sqlite_client.get("/recipe/search?q=simm")) == ["tomato-soup"]
+    assert slugs(sqlite_client.get("/recipe/search?q=Tomato+GREEN")) == ["basil-pesto"]
+    assert slugs(sqlite_client.get("/recipe/search?q=chocolate")) == []
+
+
+def test_integration_search_paginates(sqlite_client, sqlite_db_session):
+    seed_search(sqlite_db_session)
+
+    seen, cursor = [], None
+    while True:
+        params = {"q": "tomato", "limit": 1}
+        if cursor:
+            params["cursor"] = cursor
+        body = sqlite_client.get("/recipe/search", params=params).json()
+        seen += [recipe["slug"] for recipe in body["items"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == ["tomato-soup", "basil-pesto", "lemon-tart"]
+    other_query = sqlite_client.get(
+        "/recipe/search", params={"q": "lemon", "cursor": cursor or "x"}
+    )
+    assert other_query.status_code == 400
+
+
+def test_integration_postgres_search_pages_keep_tied_ranks(db_session):
+    # A lone step match ranks 0.2, which float4 cannot hold exactly.
+    with db_session() as db:
+        stews = [
+            Recipe(title=f"Stew {n}", slug=f"pg-stew-{n}", description="Hearty")
+            for n in range(5)
+        ]
+        for stew in stews:
+            stew.steps = [Step(step_number=1, step="Stir in the zucchini")]
+        db.add_all(stews)
+        db.commit()
+        expected = sorted(stew.id for stew in stews)
+
+    try:
+        seen, cursor = [], None
+        with db_session() as db:
+            while True:
+                page = search_recipe_ids(db, "zucchini", PageParams(cursor=cursor, limit=2))
+                seen += [row.recipe_id for row in page["items"]]
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+        assert seen == expected
+    finally:
+        with db_session() as db:
+            for recipe in db.query(Recipe).filter(Recipe.slug.like("pg-stew-%")):
+                db.delete(recipe)
+            db.commit()
+
+
+def test_integration_search_follows_writes(sqlite_client, sqlite_db_session):
+    seed_search(sqlite_db_session)
+    tart_id = sqlite_client.get("/recipe/lemon-tart").json()["id"]
+
+    response = sqlite_client.post(
+        "/step", json={"step_number": 2, "step": "Dust with saffron", "recipe_id": tart_id}
+    )
+    assert response.status_code == 201
+    assert slugs(sqlite_client.get("/recipe/search?q=saffron")) == ["lemon-tart"]
+
+    with sqlite_db_session() as db:
+        db.delete(db.get(Recipe, tart_id))
+        db.commit()
+    assert slugs(sqlite_client.get("/recipe/search?q=saffron")) == []
+
+
+def test_integration_search_rejects_empty_queries(sqlite_client):
+    assert sqlite_client.get("/recipe/search?q=%21%3F").status_code == 400
+    assert sqlite_client.get("/recipe/search?q=").status_code == 422
+
+
+def test_integration_search_rebuild_cli(sqlite_client, sqlite_db_session, monkeypatch, capsys):
+    seed_search(sqlite_db_session)
+    with sqlite_db_session() as db:
+        db.execute(text("DELETE FROM recipe_search"))
+        db.commit()
+    assert slugs(sqlite_client.get("/recipe/search?q=tomato")) == []
+
+    monkeypatch.setattr(cli, "SessionLocal", sqlite_db_session)
+    cli.main(["search", "rebuild", "--batch-size", "2"])
+
+    assert "Reindexed 3 recipes" in capsys.readouterr().out
+    assert len(slugs(sqlite_client.get("/recipe/search?q=tomato"))) == 3
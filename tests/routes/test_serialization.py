@@ -0,0 +1,46 @@
+import pytest
+
+from app.utils import serialization
+from db.models import Recipe, Step
+from tests.utils.db_utils import seed_recipes
+
+
+PATHS = [
+    "/recipe",
+    "/recipe?limit=2",
+    "/recipe?fields=slug,title&include=steps",
+    "/recipe?category=category-0&category=category-1&limit=2",
+    "/recipe?facets=true&fields=slug",
+    "/recipe/creme-brulee",
+    "/recipe/creme-brulee?fields=title",
+    "/steps/creme-brulee",
+    "/ingredient/recipe-1",
+    "/category/recipe-1",
+    "/category",
+    "/recipe/pantry?ingredient=ingredient-0&ingredient=ingredient-2",
+]
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_integration_fast_path_is_byte_compatible(
+    sqlite_client, sqlite_db_session, monkeypatch, path
+):
+    with sqlite_db_session() as db:
+        seed_recipes(db, 3)
+        recipe = Recipe(
+            title="Crème brûlée",
+            slug="creme-brulee",
+            description='Torch the "sugar" \\ serve',
+        )
+        recipe.steps = [Step(step_number=1, step="Chill\nthen 🔥 torch ")]
+        db.add(recipe)
+        db.commit()
+
+    validated = sqlite_client.get(path)
+    monkeypatch.setattr(serialization, "FAST_SERIALIZATION", True)
+    fast = sqlite_client.get(path)
+
+    assert fast.status_code == validated.status_code == 200
+    assert fast.content == validated.content
+    assert fast.headers["content-type"] == validated.headers["content-type"]
+    assert fast.headers.get("etag") == validated.headers.get("etag")
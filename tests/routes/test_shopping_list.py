@@ -0,0 +1,125 @@
+import pytest
+
+from tests.utils.db_utils import count_queries, seed_recipes
+
+
+def create(client, title, servings, ingredients):
+    response = client.post(
+        "/recipe/nested",
+        json={
+            "title": title,
+            "slug": title.lower(),
+            "servings": servings,
+            "ingredients": [
+                {"name": name, "amount": amount, "measurement": measurement}
+                for name, amount, measurement in ingredients
+            ],
+        },
+    )
+    assert response.status_code == 201
+
+
+def seed_plan(client):
+    create(
+        client,
+        "Pancakes",
+        4,
+        [("flour", "200", "g"), ("Eggs", "2", None), ("milk", "300", "ml"), ("salt", "some", None)],
+    )
+    create(
+        client,
+        "Omelette",
+        1,
+        [("egg", "2-3", None), ("milk", "2", "tbsp"), ("salt", "pinch", None)],
+    )
+    create(client, "Bread", None, [("flour", "0.5", "kg"), ("water", "1", "cup")])
+
+
+def items(response):
+    assert response.status_code == 200
+    return [
+        (i["name"], i["unit"], i["quantity"], i["quantity_max"], i["recipes"], i["unquantified"])
+        for i in response.json()["items"]
+    ]
+
+
+def test_integration_shopping_list_sums_ingredients(sqlite_client, sqlite_db_session):
+    seed_plan(sqlite_client)
+
+    response = sqlite_client.post(
+        "/shopping-list",
+        json={
+            "recipes": [
+                {"slug": "pancakes", "servings": 2},
+                {"slug": "omelette", "servings": 2},
+                {"slug": "bread"},
+                # Listed twice: bought twice.
+                {"slug": "bread"},
+            ]
+        },
+    )
+    assert items(response) == [
+        ("egg", None, 5.0, 7.0, 2, 0),
+        ("flour", "g", 1100.0, None, 2, 0),
+        ("milk", "ml", 209.147, None, 2, 0),
+        ("salt", None, None, None, 2, 2),
+        ("water", "ml", 473.176, None, 1, 0),
+    ]
+
+
+def test_integration_shopping_list_query_count_is_constant(
+    sqlite_client, sqlite_db_session
+):
+    with sqlite_db_session() as db:
+        seed_recipes(db, 50)
+    engine = sqlite_db_session.kw["bind"]
+
+    with count_queries(engine) as small:
+        two = sqlite_client.post(
+            "/shopping-list", json={"recipes": [{"slug": "recipe-0"}, {"slug": "recipe-1"}]}
+        )
+    with count_queries(engine) as large:
+        week = sqlite_client.post(
+            "/shopping-list",
+            json={"recipes": [{"slug": f"recipe-{i}"} for i in range(50)]},
+        )
+
+    assert len(large) == len(small) == 2
+    assert items(two)[0] == ("ingredient-0", "ml", 473.176, None, 2, 0)
+    assert items(week)[0] == ("ingredient-0", "ml", 11829.412, None, 50, 0)
+
+
+@pytest.mark.parametrize(
+    "body, status, detail",
+    [
+        ({"recipes": [{"slug": "missing"}]}, 400, "Recipe does not exist: missing"),
+        (
+            {"recipes": [{"slug": "bread", "servings": 4}]},
+            400,
+            "Recipe has no servings to scale: bread",
+        ),
+        ({"recipes": [{"slug": "bread"}] * 101}, 400, "Too many recipes"),
+        ({"recipes": []}, 422, None),
+        ({"recipes": [{"slug": "pancakes", "servings": 0}]}, 422, None),
+    ],
+)
+def test_integration_shopping_list_errors(sqlite_client, sqlite_db_session, body, status, detail):
+    seed_plan(sqlite_client)
+
+    response = sqlite_client.post("/shopping-list", json=body)
+
+    assert response.status_code == status
+    if detail:
+        assert response.json()["detail"] == detail
+
+
+def test_integration_async_shopping_list_matches_sync(sqlite_file_clients):
+    sync_client, async_client = sqlite_file_clients
+    seed_plan(sync_client)
+    body = {"recipes": [{"slug": "pancakes", "servings": 8}, {"slug": "omelette"}]}
+
+    expected = sync_client.post("/shopping-list", json=body)
+    actual = async_client.post("/shopping-list", json=body)
+
+    assert actual.status_code == expected.status_code == 200
+    assert actual.content == expected.content
@@ -0,0 +1,196 @@
+import numpy as np
+import pytest
+
+from app import cli
+from db.models import Ingredient, Recipe, RecipeNeighbor
+from db.similar import build_vectors, recipe_terms, refresh_similar, score_rows
+
+
+RECIPES = {
+    "pancakes": (
+        "Pancakes",
+        ["flour", "eggs", "milk", "butter"],
+        ["Whisk the flour, eggs and milk into a batter", "Fry in butter"],
+    ),
+    "crepes": (
+        "Crepes",
+        ["flour", "egg", "milk", "sugar"],
+        ["Whisk the flour, eggs and milk into a thin batter", "Fry in a hot pan"],
+    ),
+    "waffles": (
+        "Waffles",
+        ["flour", "eggs", "milk", "baking powder"],
+        ["Whisk into a thick batter", "Cook in the waffle iron"],
+    ),
+    "leek-soup": (
+        "Leek soup",
+        ["leek", "potato", "butter", "stock"],
+        ["Soften the leeks in butter", "Simmer with potato and stock, then blend"],
+    ),
+    "potato-soup": (
+        "Potato soup",
+        ["potato", "onion", "stock", "cream"],
+        ["Soften the onion", "Simmer with potato and stock, then blend with cream"],
+    ),
+}
+
+
+def create(client, slug):
+    title, ingredients, steps = RECIPES[slug]
+    response = client.post(
+        "/recipe/nested",
+        json={
+            "title": title,
+            "slug": slug,
+            "ingredients": [{"name": name, "amount": "1"} for name in ingredients],
+            "steps": [
+                {"step_number": number, "step": step}
+                for number, step in enumerate(steps, 1)
+            ],
+        },
+    )
+    assert response.status_code == 201
+
+
+@pytest.fixture
+def catalog(sqlite_client, sqlite_db_session):
+    for slug in RECIPES:
+        create(sqlite_client, slug)
+    return sqlite_client
+
+
+def neighbors(client, slug, **params):
+    response = client.get(f"/recipe/{slug}/similar", params=params)
+    assert response.status_code == 200
+    return [(item["slug"], item["score"]) for item in response.json()["items"]]
+
+
+def stored_lists(session_factory):
+    with session_factory() as db:
+        rows = db.query(
+            RecipeNeighbor.recipe_id, RecipeNeighbor.neighbor_id, RecipeNeighbor.score
+        ).order_by(RecipeNeighbor.recipe_id, RecipeNeighbor.rank)
+        lists = {}
+        for recipe_id, neighbor_id, score in rows:
+            lists.setdefault(recipe_id, []).append((neighbor_id, score))
+        return lists
+
+
+def test_unit_score_rows_matches_dense_cosine():
+    rng = np.random.default_rng(7)
+    words = [f"word{chr(97 + i)}" for i in range(12)]
+    terms = [
+        recipe_terms(
+            "",
+            " ".join(rng.choice(words, rng.integers(0, 8))),
+            list(rng.choice(words, rng.integers(0, 5), replace=False)),
+            [],
+        )
+        for _ in range(40)
+    ]
+    vectors = build_vectors(terms, ingredient_weight=0.6)
+
+    dense = np.zeros((vectors.size, vectors.indices.max() + 1))
+    for row in range(vectors.size):
+        span = slice(vectors.indptr[row], vectors.indptr[row + 1])
+        dense[row, vectors.indices[span]] = vectors.data[span]
+    expected = dense @ dense.T
+    np.fill_diagonal(expected, 0)
+
+    rows = [0, 5, 17, 39]
+    found, _ = score_rows(vectors, rows, top_k=5)
+    for row, pairs in zip(rows, found):
+        best = sorted(
+            (j for j in range(vectors.size) if expected[row, j] > 0),
+            key=lambda j: (-expected[row, j], j),
+        )[:5]
+        assert [j for j, _ in pairs] == best
+        assert [score for _, score in pairs] == pytest.approx(expected[row, best])
+
+
+def test_integration_similar_recipes(catalog, sqlite_db_session, monkeypatch, capsys):
+    assert neighbors(catalog, "pancakes") == []
+
+    monkeypatch.setattr(cli, "SessionLocal", sqlite_db_session)
+    cli.main(["similar", "refresh", "--workers", "1"])
+    assert "Refreshed 5 similar recipe lists" in capsys.readouterr().out
+
+    pancakes = neighbors(catalog, "pancakes")
+    assert [slug for slug, _ in pancakes][:2] == ["crepes", "waffles"]
+    assert [slug for slug, _ in neighbors(catalog, "leek-soup")][0] == "potato-soup"
+    assert neighbors(catalog, "pancakes", limit=1) == pancakes[:1]
+    assert all(0 < score <= 1 for _, score in pancakes)
+
+    assert catalog.get("/recipe/missing/similar").status_code == 404
+    assert catalog.get("/recipe/pancakes/similar?limit=0").status_code == 422
+
+    # Nothing changed: nothing to recompute.
+    cli.main(["similar", "refresh", "--workers", "1"])
+    assert "Refreshed 0 similar recipe lists" in capsys.readouterr().out
+
+
+def test_integration_incremental_refresh_matches_full(catalog, sqlite_db_session):
+    refresh_similar(sqlite_db_session, workers=1)
+    with sqlite_db_session() as db:
+        ids = dict(db.query(Recipe.slug, Recipe.id))
+        # Waffles turn into a soup: its old neighbors must drop it.
+        db.query(Ingredient).filter(Ingredient.recipe_id == ids["waffles"]).delete()
+        db.add_all(
+            Ingredient(name=name, amount="1", recipe_id=ids["waffles"])
+            for name in ("leek", "potato", "stock")
+        )
+        db.commit()
+
+    assert refresh_similar(sqlite_db_session, workers=1) == 5
+    incremental = stored_lists(sqlite_db_session)
+    refresh_similar(sqlite_db_session, full=True, workers=1)
+    full = stored_lists(sqlite_db_session)
+
+    # Rescored lists use the current IDF weights in both runs.
+    assert incremental[ids["waffles"]] == full[ids["waffles"]]
+    assert ids["waffles"] not in [j for j, _ in incremental[ids["crepes"]]][:1]
+    for recipe_id, pairs in incremental.items():
+        assert [j for j, _ in pairs] == [j for j, _ in full[recipe_id]]
+
+
+def test_integration_refresh_top_k_and_deletes(catalog, sqlite_db_session):
+    refresh_similar(sqlite_db_session, top_k=2, workers=1)
+    assert {len(pairs) for pairs in stored_lists(sqlite_db_session).values()} == {2}
+
+    with sqlite_db_session() as db:
+        crepes = db.query(Recipe).filter(Recipe.slug == "crepes").one()
+        crepes_id = crepes.id
+        db.delete(crepes)
+        db.commit()
+
+    assert crepes_id not in [
+        item["id"] for item in catalog.get("/recipe/pancakes/similar").json()["items"]
+    ]
+    refresh_similar(sqlite_db_session, top_k=2, workers=1)
+    lists = stored_lists(sqlite_db_session)
+    assert crepes_id not in lists
+    assert all(crepes_id not in [j for j, _ in pairs] for pairs in lists.values())
+    assert {len(pairs) for pairs in lists.values()} == {2}
+
+
+def test_integration_refresh_in_worker_processes(catalog, sqlite_db_session):
+    refresh_similar(sqlite_db_session, full=True, workers=1)
+    expected = stored_lists(sqlite_db_session)
+
+    refresh_similar(sqlite_db_session, full=True, chunk_size=2, workers=2)
+
+    assert stored_lists(sqlite_db_session) == expected
+
+
+def test_integration_async_similar_matches_sync(sqlite_file_clients, sqlite_file_db_session):
+    sync_client, async_client = sqlite_file_clients
+    for slug in RECIPES:
+        create(sync_client, slug)
+    refresh_similar(sqlite_file_db_session, workers=1)
+
+    expected = sync_client.get("/recipe/crepes/similar?limit=3")
+    actual = async_client.get("/recipe/crepes/similar?limit=3")
+
+    assert actual.status_code == expected.status_code == 200
+    assert len(expected.json()["items"]) == 3
+    assert actual.content == expected.content
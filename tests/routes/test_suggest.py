@@ -0,0 +1,162 @@
+import random
+
+import pytest
+
+from db.models import Ingredient, Recipe
+from db.suggest import PrefixIndex, Suggester, suggester
+
+
+def seed_suggestions(sqlite_db_session):
+    with sqlite_db_session() as db:
+        for title, names in [
+            ("Tomato soup", ["tomato", "onion", "salt"]),
+            ("Roast tomatoes", ["Tomato", "olive oil", "salt"]),
+            ("Toad in the hole", ["sausage", "egg", "salt"]),
+            ("Onion tart", ["onion", "egg"]),
+            ("100% rye bread", ["rye flour", "salt"]),
+        ]:
+            recipe = Recipe(title=title, slug=title.lower().replace(" ", "-"))
+            recipe.ingredients = [Ingredient(name=name, amount="1") for name in names]
+            db.add(recipe)
+        db.commit()
+
+
+@pytest.fixture
+def loaded_suggester(sqlite_client, sqlite_db_session):
+    seed_suggestions(sqlite_db_session)
+    with sqlite_db_session() as db:
+        suggester.load(db)
+    yield suggester
+    suggester.clear()
+
+
+def titles(response):
+    return [item["title"] for item in response.json()["items"]]
+
+
+def names(response):
+    return [(item["name"], item["count"]) for item in response.json()["items"]]
+
+
+def test_unit_prefix_index_matches_word_starts():
+    index = PrefixIndex()
+    index.add(1, "tomato soup")
+    index.add(2, "roast tomatoes")
+    index.add(3, "toad in the hole")
+
+    assert index.matches("tom") == {1, 2}
+    assert index.matches("to") == {1, 2, 3}
+    assert index.matches("soup") == {1}
+    assert index.matches("mato") == set()
+
+    index.remove(1, "tomato soup")
+    assert index.matches("tom") == {2}
+    assert len(index) == 6
+
+
+def test_unit_suggester_applies_versioned_updates():
+    index = Suggester()
+    index.loaded = True
+    index.apply({1: (1, "Apple pie", "apple-pie", ["apple", "flour"])})
+    index.apply({2: (1, "Apple crumble", "apple-crumble", ["apple"])})
+    assert [s.name for s in index.ingredients("a", 5)] == ["apple"]
+    assert index.ingredients("a", 5)[0].count == 2
+
+    # Out of order: the older version of recipe 1 is ignored.
+    index.apply({1: (3, "Pear pie", "pear-pie", ["pear", "flour"])})
+    index.apply({1: (2, "Apple pie", "apple-pie", ["apple", "flour"])})
+    assert [s.title for s in index.titles("p", 5)] == ["Pear pie"]
+    assert index.ingredients("apple", 5)[0].count == 1
+
+    index.apply({2: None})
+    assert index.ingredients("apple", 5) == []
+    assert index.titles("apple", 5) == []
+
+
+def test_unit_suggester_kept_lists_match_recompute():
+    rng = random.Random(7)
+    words = ["tomato", "toast", "tofu", "onion", "oat", "olive", "soup", "salt"]
+    index = Suggester()
+    index.loaded = True
+    prefixes = ["t", "to", "tom", "o", "ol", "s", "so"]
+    for version in range(1, 300):
+        recipe_id = rng.randrange(40)
+        if rng.random() < 0.2:
+            update = None
+        else:
+            title = " ".join(rng.sample(words, 2)) + f" {recipe_id}"
+            update = (version, title, f"r-{recipe_id}", rng.sample(words, 3))
+        index.apply({recipe_id: update})
+        for prefix in prefixes:
+            index.titles(prefix, 3)
+            index.ingredients(prefix, 3)
+
+    fresh = Suggester()
+    fresh.loaded = True
+    fresh.apply({rid: (1, *index._recipes[rid]) for rid in index._recipes})
+    for prefix in prefixes:
+        assert index.titles(prefix, 20) == fresh.titles(prefix, 20)
+        assert index.ingredients(prefix, 20) == fresh.ingredients(prefix, 20)
+
+
+def test_integration_suggest_from_memory(sqlite_client, loaded_suggester):
+    assert titles(sqlite_client.get("/suggest/recipes?prefix=to")) == [
+        "Tomato soup",
+        "Toad in the hole",
+        "Roast tomatoes",
+    ]
+    assert titles(sqlite_client.get("/suggest/recipes?prefix=TOM&limit=1")) == [
+        "Tomato soup"
+    ]
+    assert names(sqlite_client.get("/suggest/ingredients?prefix=o")) == [
+        ("onion", 2),
+        ("olive oil", 1),
+    ]
+    assert names(sqlite_client.get("/suggest/ingredients?prefix=s")) == [
+        ("salt", 4),
+        ("sausage", 1),
+    ]
+
+
+def test_integration_suggest_follows_writes(sqlite_client, loaded_suggester):
+    response = sqlite_client.post(
+        "/recipe", json={"title": "Tomatillo salsa", "slug": "salsa"}
+    )
+    assert response.status_code == 201
+    recipe_id = response.json()["id"]
+    sqlite_client.post(
+        "/ingredient", json={"name": "Olive oil", "amount": "1", "recipe_id": recipe_id}
+    )
+
+    assert "Tomatillo salsa" in titles(sqlite_client.get("/suggest/recipes?prefix=tomat"))
+    assert names(sqlite_client.get("/suggest/ingredients?prefix=ol")) == [
+        ("olive oil", 2)
+    ]
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/suggest/recipes?prefix=to",
+        "/suggest/recipes?prefix=tart",
+        "/suggest/recipes?prefix=100%25",
+        "/suggest/ingredients?prefix=o",
+        "/suggest/ingredients?prefix=s&limit=1",
+        "/suggest/ingredients?prefix=flo",
+    ],
+)
+def test_integration_sql_fallback_matches_memory(sqlite_client, loaded_suggester, path):
+    from_memory = sqlite_client.get(path).json()
+    loaded_suggester.clear()
+    from_sql = sqlite_client.get(path).json()
+
+    assert from_sql == from_memory
+    assert from_sql["items"]
+
+
+def test_integration_sql_fallback_escapes_like(sqlite_client, sqlite_db_session):
+    seed_suggestions(sqlite_db_session)
+
+    assert titles(sqlite_client.get("/suggest/recipes?prefix=%25")) == []
+    assert titles(sqlite_client.get("/suggest/recipes?prefix=_")) == []
+    assert sqlite_client.get("/suggest/recipes?prefix=").status_code == 422
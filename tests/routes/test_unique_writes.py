@@ -0,0 +1,126 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+from app.routes import recipes
+from db.models import Category, Ingredient, Recipe
+from db.schemas import CategoryCreate, IngredientCreate, StepCreate
+from tests.utils.db_utils import count_queries
+
+
+@pytest.fixture
+def recipe_id(sqlite_db_session):
+    with sqlite_db_session() as db:
+        recipe = Recipe(title="Soup", slug="soup", description="Hot")
+        other = Recipe(title="Stew", slug="stew", description="Thick")
+        db.add_all([recipe, other])
+        db.commit()
+        return recipe.id
+
+
+def test_integration_create_conflicts_map_to_400(sqlite_client, recipe_id):
+    ingredient = {"name": "salt", "amount": "1", "recipe_id": recipe_id}
+    step = {"step_number": 1, "step": "Boil", "recipe_id": recipe_id}
+    cases = [
+        ("/recipe", {"title": "Soup", "slug": "new"}, "Recipe with this title exists"),
+        ("/recipe", {"title": "New", "slug": "soup"}, "Recipe with this Slug exists"),
+        ("/ingredient", ingredient, "Ingredient exists for recipe ID"),
+        ("/step", step, "Step exists for recipe ID"),
+        ("/category", {"name": "dinner"}, "Category exists"),
+    ]
+    for path, body, detail in cases:
+        sqlite_client.post(path, json=body)
+        response = sqlite_client.post(path, json=body)
+        assert response.status_code == 400, path
+        assert response.json() == {"detail": detail}
+
+    response = sqlite_client.post("/categorysoup?category_name=dinner")
+    assert response.status_code == 201
+    response = sqlite_client.post("/categorysoup?category_name=dinner")
+    assert response.json() == {"detail": "Category exists for recipe ID"}
+
+
+def test_integration_ingredient_uniqueness_is_per_recipe(sqlite_client, recipe_id):
+    for target in (recipe_id, recipe_id + 1):
+        response = sqlite_client.post(
+            "/ingredient", json={"name": "salt", "amount": "1", "recipe_id": target}
+        )
+        assert response.status_code == 201
+
+    response = sqlite_client.post(
+        "/ingredient", json={"name": "pepper", "amount": "1", "recipe_id": recipe_id}
+    )
+    assert response.status_code == 201
+
+
+def test_integration_create_checks_in_the_insert(sqlite_client, sqlite_db_session, recipe_id):
+    body = {"step_number": 1, "step": "Boil", "recipe_id": recipe_id}
+
+    with count_queries(sqlite_db_session.kw["bind"]) as statements:
+        response = sqlite_client.post("/step", json=body)
+
+    assert response.status_code == 201
+    assert statements[0].startswith("INSERT INTO steps")
+    assert "ON CONFLICT DO NOTHING" in statements[0]
+
+
+def test_integration_concurrent_creates_of_the_same_key(sqlite_file_db_session):
+    with sqlite_file_db_session() as db:
+        recipe = Recipe(title="Soup", slug="soup", description="Hot")
+        db.add(recipe)
+        db.commit()
+        recipe_id = recipe.id
+
+    writes = [
+        (recipes.create_category, {"category_data": CategoryCreate(name="dinner")}),
+        (
+            recipes.create_ingredient,
+            {"ingredient_data": IngredientCreate(name="salt", amount="1", recipe_id=recipe_id)},
+        ),
+        (
+            recipes.create_step,
+            {"step_data": StepCreate(step_number=1, step="Boil", recipe_id=recipe_id)},
+        ),
+    ]
+
+    for handler, kwargs in writes:
+
+        def attempt(_):
+            with sqlite_file_db_session() as db:
+                try:
+                    handler(db=db, **kwargs)
+                    return 201
+                except HTTPException as e:
+                    return e.status_code
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            statuses = list(pool.map(attempt, range(64)))
+
+        assert statuses.count(201) == 1, handler.__name__
+        assert statuses.count(400) == 63, handler.__name__
+
+    with sqlite_file_db_session() as db:
+        assert db.query(Category).count() == 1
+        assert db.query(Ingredient).count() == 1
+        assert db.query(Recipe).one().version == 3
+
+
+def test_integration_create_does_not_reload_after_commit(
+    sqlite_client, sqlite_db_session, recipe_id
+):
+    engine = sqlite_db_session.kw["bind"]
+
+    with count_queries(engine) as statements:
+        recipe = sqlite_client.post("/recipe", json={"title": "Pie", "slug": "pie"})
+        step = sqlite_client.post(
+            "/step", json={"step_number": 1, "step": "Bake", "recipe_id": recipe_id}
+        )
+
+    assert recipe.status_code == step.status_code == 201
+    assert recipe.json()["steps"] == []
+    assert step.json()["step"] == "Bake"
+    writes = [s for s in statements if "recipe_search" not in s]
+    assert not [s for s in writes if s.startswith("SELECT")]
+    # The step bumps its recipe's version in the same transaction.
+    assert len(writes) == 3
@@ -1,5 +1,12 @@
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
 import alembic.config
 from alembic import command
+from sqlalchemy import event
+
+from db.models import Recipe, Ingredient, RecipeCategories, Step, Category
 
 
 
@@ -7,4 +14,100 @@ def migrate_to_db(script_location, alembic_ini_path="alembic.ini", connection=No
     config = alembic.config.Config(alembic_ini_path)
     if connection is not None:
         config.config_ini_section = "testdb"
-        command.upgrade(config, revision)
\ No newline at end of file
+        command.upgrade(config, revision)
+
+
+@contextmanager
+def count_queries(engine):
+    statements = []
+
+    def _before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+@contextmanager
+def capture_queries(engine):
+    """Like count_queries, collecting (statement, parameters) pairs.
+
+    executemany batches are left out: their plans are plain inserts.
+    """
+    queries = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            queries.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+PLAN_ACCESS = re.compile(
+    r"^(SCAN|SEARCH) (\w+)"
+    r"(?: USING (?:COVERING |AUTOMATIC COVERING )?INDEX (\w+)"
+    r"| USING (INTEGER PRIMARY KEY)| (VIRTUAL TABLE))?"
+)
+PLAN_SUBQUERY = re.compile(r"^(?:MATERIALIZE|CO-ROUTINE) (\w+)")
+
+
+def explain_accesses(connection, statement, parameters=()):
+    """Table accesses in the SQLite query plan of ``statement``.
+
+    Returns (accesses, subqueries): accesses are strings such as
+    "SEARCH steps ix_steps_recipe_id_step_number" or "SCAN recipes" (no
+    index: a full table scan); subqueries are the names of materialized
+    subqueries, whose scans read a temporary result and not a table.
+    """
+    if not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return set(), set()
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+    accesses, subqueries = set(), set()
+    for *_, detail in rows:
+        subquery = PLAN_SUBQUERY.match(detail)
+        if subquery:
+            subqueries.add(subquery.group(1))
+        access = PLAN_ACCESS.match(detail)
+        if access:
+            operation, table, *how = access.groups()
+            accesses.add(" ".join([operation, table, *filter(None, how)]))
+    return accesses, subqueries
+
+
+def seed_recipes(db, count, children=3):
+    categories = [Category(name=f"category-{i}") for i in range(children)]
+    db.add_all(categories)
+    db.flush()
+
+    created_at = datetime(2024, 1, 1)
+    recipes = []
+    for i in range(count):
+        recipe = Recipe(
+            title=f"Recipe {i}",
+            slug=f"recipe-{i}",
+            description=f"Description {i}",
+            created_at=created_at + timedelta(minutes=i % 7),
+        )
+        recipe.steps = [
+            Step(step_number=n, step=f"Step {n}") for n in range(1, children + 1)
+        ]
+        recipe.ingredients = [
+            Ingredient(name=f"ingredient-{n}", amount="1", measurement="cup")
+            for n in range(children)
+        ]
+        recipe.categories = [
+            RecipeCategories(category_id=category.id) for category in categories
+        ]
+        recipes.append(recipe)
+
+    db.add_all(recipes)
+    db.commit()
+    return recipes
@@ -13,3 +13,5 @@ def pytest_collection_modifyitems(items):
             item.add_marker(pytest.mark.unit_schema)
         if "integration" in item.name:
             item.add_marker(pytest.mark.integration)
+        if "postgres" in item.name:
+            item.add_marker(pytest.mark.postgres)